@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List
+
+from .pipeline import run_tailor_pipeline
+from .schemas import TailorRequest
+from .services.compile_pool import CompileQueueFull
+from .services.job_store import JobStore, get_job_store
+from .services.lazy import Lazy
+from .services.telemetry import IN_FLIGHT
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(RuntimeError):
+    """
+    Raised when too many jobs are already waiting for a worker.
+    """
+
+
+class JobWorkers:
+    """
+    Fixed pool of background workers that claim jobs from the JobStore and
+    run the tailoring pipeline on them.
+
+    Workers wake up as soon as a job is submitted in this process and poll
+    every `poll_s` otherwise, so jobs submitted through other uvicorn workers
+    sharing the store are picked up too. Each adopted pass is written to the
+    store as it arrives (a discarded speculative pass never reports), and a
+    heartbeat keeps the job's lease alive. A job that finds the compile
+    queue full goes back to the queue for `overload_delay_s` times its
+    attempt count; once out of attempts it fails with 503.
+    """
+
+    def __init__(self, store: JobStore, workers: int, max_queued: int, poll_s: float, overload_delay_s: float):
+        self.store = store
+        self.workers = max(1, int(workers))
+        self.max_queued = max(1, int(max_queued))
+        self.poll_s = float(poll_s)
+        self.overload_delay_s = float(overload_delay_s)
+        self._wake = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self.name = f"pid-{os.getpid()}"
+
+    async def submit(self, req: TailorRequest) -> str:
+        if await asyncio.to_thread(self.store.queued_count) >= self.max_queued:
+            raise JobQueueFull(f"Job queue full ({self.max_queued} waiting).")
+        job_id = await asyncio.to_thread(self.store.submit, req.model_dump())
+        self._wake.set()
+        return job_id
+
+    async def start(self) -> None:
+        # Jobs left running by a previous process are reclaimed once their lease runs out
+        recovered = await asyncio.to_thread(self.store.recover_stale)
+        if recovered:
+            logger.warning("Requeued %d stale job(s)", recovered)
+        self._tasks = [
+            asyncio.create_task(self._work(f"{self.name}-{i}")) for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _work(self, worker: str) -> None:
+        while True:
+            try:
+                await self._step(worker)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # A store error (locked or unreadable database) must not kill the worker
+                logger.exception("Job worker %s failed; retrying in %.1fs", worker, self.poll_s)
+                await asyncio.sleep(self.poll_s)
+
+    async def _step(self, worker: str) -> None:
+        claimed = await asyncio.to_thread(self.store.claim, worker)
+        if claimed is None:
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_s)
+            except asyncio.TimeoutError:
+                await asyncio.to_thread(self.store.recover_stale)
+            return
+
+        job_id, payload = claimed
+        with IN_FLIGHT.in_flight(kind="job"):
+            await self._run(job_id, payload)
+
+    async def _run(self, job_id: str, payload: Dict[str, Any]) -> None:
+        async def emit(event: str, data: Dict[str, Any]) -> None:
+            if event == "metrics_ready":
+                await asyncio.to_thread(self.store.add_pass, job_id, data["result"])
+
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            resp = await run_tailor_pipeline(TailorRequest(**payload), emit)
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back so the next worker start resumes it
+            await asyncio.to_thread(self.store.requeue, job_id)
+            raise
+        except CompileQueueFull as e:
+            # Back off instead of claiming it straight back into the same overload
+            attempts = (await asyncio.to_thread(self.store.get, job_id) or {}).get("attempts", 1)
+            await asyncio.to_thread(
+                self.store.requeue, job_id, str(e), self.overload_delay_s * attempts, 503
+            )
+        except Exception as e:
+            await asyncio.to_thread(self.store.fail, job_id, str(e))
+        else:
+            await asyncio.to_thread(self.store.succeed, job_id, resp.model_dump())
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.store.lease_s / 3)
+            await asyncio.to_thread(self.store.heartbeat, job_id)
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "max_queued": self.max_queued, **self.store.stats()}
+
+
+def _workers_from_env() -> JobWorkers:
+    """
+    JOB_WORKERS (default 2) pipelines run at once by this process; submits get
+    503 beyond JOB_MAX_QUEUED (default 100) queued jobs; JOB_POLL_S (default
+    1.0); JOB_OVERLOAD_DELAY_S (default 5.0) is the requeue delay per attempt
+    when compiles are saturated.
+    """
+    return JobWorkers(
+        store=get_job_store(),
+        workers=int(os.getenv("JOB_WORKERS", "2")),
+        max_queued=int(os.getenv("JOB_MAX_QUEUED", "100")),
+        poll_s=float(os.getenv("JOB_POLL_S", "1.0")),
+        overload_delay_s=float(os.getenv("JOB_OVERLOAD_DELAY_S", "5.0")),
+    )
+
+
+get_job_workers = Lazy(_workers_from_env)
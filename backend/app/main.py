@@ -1,10 +1,24 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-
-from .schemas import TailorRequest, TailorResponse, TailorResult, Metrics
-from .services.llm import generate_tailored_resume
-from .services.metrics import compute_metrics
-from .services.pdf_compile import compile_latex_to_pdf_bytes, count_pdf_pages
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+from .jobs import JobQueueFull, get_job_workers
+from .pipeline import Emit, run_tailor_pipeline
+from .schemas import BatchTailorRequest, JobStatus, TailorRequest, TailorResponse
+from .services.metrics import extract_resume_features, metrics_cache_stats
+from .services.llm import close_openai_client, get_llm_scheduler, start_openai_client
+from .services.compile_pool import CompileQueueFull, close_compile_pool, get_compile_pool
+from .services.compile_cache import get_compile_cache
+from .services.job_store import get_job_store
+from .services.llm_cache import get_llm_cache
+from .services.lru import content_key
+from .services.single_flight import SingleFlight
+from .services.telemetry import IN_FLIGHT, render_metrics, start_loop_lag_monitor
 
 import os
 from pathlib import Path
@@ -17,7 +31,31 @@ print("OPENAI_API_KEY loaded:", bool(os.getenv("OPENAI_API_KEY")))
 print("OPENAI_MODEL:", os.getenv("OPENAI_MODEL"))
 
 
-app = FastAPI(title="AI Resume Tailor Backend", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_openai_client()
+    lag_monitor = start_loop_lag_monitor()
+
+    # Warm tectonic (bundle files, format file, font cache) before taking traffic
+    if os.getenv("COMPILE_WARMUP", "1") == "1":
+        try:
+            await get_compile_pool().warm_up()
+        except Exception as e:
+            print("Compile warm-up failed:", str(e)[:200])
+
+    await get_job_workers().start()
+
+    try:
+        yield
+    finally:
+        await get_job_workers().stop()
+        close_compile_pool()
+        if lag_monitor is not None:
+            lag_monitor.cancel()
+        await close_openai_client()
+
+
+app = FastAPI(title="AI Resume Tailor Backend", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -33,168 +71,168 @@ def health():
     return {"ok": True}
 
 
-def passes_require_regen(metrics: dict, req: TailorRequest) -> bool:
-    return (
-        metrics["signal_density"] < req.min_signal_density
-        or metrics["keyword_alignment"] < req.min_keyword_alignment
-    )
+@app.get("/cache/stats")
+def cache_stats():
+    return {
+        "compile": get_compile_cache().stats(),
+        "compile_pool": get_compile_pool().stats(),
+        "llm": get_llm_cache().stats(),
+        "metrics": metrics_cache_stats(),
+        "jobs": get_job_workers().stats(),
+        "single_flight": _tailor_flights.stats(),
+        "llm_scheduler": get_llm_scheduler().stats(),
+    }
 
 
-def choose_best(results: list[TailorResult]) -> TailorResult:
-    def score(r: TailorResult) -> float:
-        red_penalty = 0.0
-        if r.metrics.redundancy == "High":
-            red_penalty = 0.8
-        elif r.metrics.redundancy == "Med":
-            red_penalty = 0.3
-        return (r.metrics.keyword_alignment * 0.65) + (r.metrics.signal_density * 3.5) - red_penalty
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    # Queue depth is sampled at scrape time; everything else is recorded as it happens
+    IN_FLIGHT.set(get_compile_pool().stats()["waiting"], kind="compile_waiting")
+    IN_FLIGHT.set(_tailor_flights.waiters(), kind="tailor_waiters")
+    IN_FLIGHT.set(get_llm_scheduler().stats()["queued"], kind="llm_queued")
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
 
-    return sorted(results, key=score, reverse=True)[0]
+
+# Identical /tailor requests in flight at the same time share one pipeline run
+_tailor_flights = SingleFlight()
 
 
 @app.post("/tailor", response_model=TailorResponse)
 async def tailor(req: TailorRequest):
+    key = content_key(req.model_dump_json())
     try:
-        all_results: list[TailorResult] = []
-
-        decision = {
-            "ran_second_pass": False,
-            "reason": None,
-            "thresholds": {
-                "min_signal_density": req.min_signal_density,
-                "min_keyword_alignment": req.min_keyword_alignment,
-            },
-            "page_limit": 1,
-            "page_count": None,
-            "tighten_attempts": 0,
-        }
-
-        # PASS 1 (default)
-        mode1 = "default"
-        latex1 = await generate_tailored_resume(req.resume_latex, req.job_description, mode=mode1)
-
-        # Enforce one-page by compile + count + tighten loop
-        pages_limit = 1
-        tighten_attempts_max = 2
-        latex_current = latex1
-        last_good_latex = latex_current
-        pages_current = None
-
-        for attempt in range(0, tighten_attempts_max + 1):
-            # attempt=0 means compile original pass1; attempt>=1 means tightened versions
-            try:
-                pdf_bytes = compile_latex_to_pdf_bytes(latex_current)
-                pages_current = count_pdf_pages(pdf_bytes)
-                last_good_latex = latex_current
-            except Exception as e:
-                # If a tightened output breaks compilation, revert and stop tightening
-                latex_current = last_good_latex
-                decision["reason"] = f"Compile failed during tighten attempt {attempt}: {str(e)[:200]}"
-                break
-
-            if pages_current <= pages_limit:
-                break
-
-            # Too many pages → tighten
-            decision["tighten_attempts"] = attempt + 1
-            latex_current = await generate_tailored_resume(
-                latex_current,
-                req.job_description,
-                mode="tighten_to_one_page",
-            )
-
-        decision["page_count"] = pages_current
-
-        MIN_WORDS = 600
-        MAX_EXPAND_ATTEMPTS = 1
-
-        from .services.text_extract import strip_latex_commands
-
-        # Always try to expand if underfilled (but only if we fit on 1 page)
-        if pages_current == 1:
-            resume_plain = strip_latex_commands(latex_current)
-            word_count = len(resume_plain.split())
-
-            if word_count < MIN_WORDS:
-                for _ in range(MAX_EXPAND_ATTEMPTS):
-                    latex_try = await generate_tailored_resume(
-                        latex_current,
-                        req.job_description,
-                        mode="expand_to_fill_one_page",
-                    )
-
-                    try:
-                        pdf_try = compile_latex_to_pdf_bytes(latex_try)
-                        if count_pdf_pages(pdf_try) == 1:
-                            latex_current = latex_try
-                            decision["expanded_to_fill"] = True
-                        else:
-                            break
-                    except Exception:
-                        break
-
-        # PASS 1: Compute metrics on the final latex_current (after tighten/expand)
-        latex1 = latex_current
-        m1 = compute_metrics(latex1, req.job_description)
-
-        r1 = TailorResult(
-            pass_index=1,
-            mode=mode1,
-            tailored_resume_latex=latex1,
-            metrics=Metrics(**m1),
-        )
-        all_results.append(r1)
-
-        # PASS 2 (conditional technical depth)
-        mode2 = "default"  # default fallback
-        if req.max_passes >= 2 and passes_require_regen(m1, req):
-            decision["ran_second_pass"] = True
-            decision["reason"] = "Below thresholds; regenerating with increase_technical_depth mode."
-
-            mode2 = "increase_technical_depth"
-            latex2 = await generate_tailored_resume(req.resume_latex, req.job_description, mode=mode2)
-
-            # Enforce one-page for pass 2 as well
-            latex_current = latex2
-            last_good_latex = latex_current
-            pages_current = None
-
-            for attempt in range(0, tighten_attempts_max + 1):
+        return await _tailor_flights.do(key, lambda: run_tailor_pipeline(req))
+    except CompileQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/tailor/jobs", response_model=JobStatus, status_code=202)
+async def submit_tailor_job(req: TailorRequest):
+    """
+    Queue the pipeline for a background worker; poll GET /tailor/jobs/{id}.
+    """
+    try:
+        job_id = await get_job_workers().submit(req)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return await asyncio.to_thread(get_job_store().get, job_id)
+
+
+@app.get("/tailor/jobs/{job_id}", response_model=JobStatus)
+async def get_tailor_job(job_id: str):
+    job = await asyncio.to_thread(get_job_store().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id.")
+    return job
+
+
+SSE_KEEPALIVE_S = 15.0
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _event_stream(produce: Callable[[Emit], Awaitable[None]]) -> StreamingResponse:
+    """
+    Run `produce(emit)` in a task and relay everything it emits as SSE.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def emit(event: str, data: dict) -> None:
+        await queue.put((event, data))
+
+    async def run() -> None:
+        try:
+            await produce(emit)
+        except CompileQueueFull as e:
+            await queue.put(("error", {"status": 503, "detail": str(e)}))
+        except Exception as e:
+            await queue.put(("error", {"status": 500, "detail": str(e)}))
+        finally:
+            await queue.put(None)
+
+    async def events():
+        task = asyncio.create_task(run())
+        try:
+            while True:
                 try:
-                    pdf_bytes = compile_latex_to_pdf_bytes(latex_current)
-                    pages_current = count_pdf_pages(pdf_bytes)
-                    last_good_latex = latex_current
-                except Exception:
-                    latex_current = last_good_latex
+                    item = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_S)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream mid-LLM call
+                    yield ": keep-alive\n\n"
+                    continue
+                if item is None:
                     break
+                yield _sse(*item)
+        finally:
+            # Client went away: stop spending LLM calls and compiles on it
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-                if pages_current <= pages_limit:
-                    break
 
-                latex_current = await generate_tailored_resume(
-                    latex_current,
-                    req.job_description,
-                    mode="tighten_to_one_page",
-                )
+@app.post("/tailor/stream")
+async def tailor_stream(req: TailorRequest):
+    """
+    Same pipeline as /tailor, streamed as Server-Sent Events:
+    pass_started, llm_done, compile_done, tighten_attempt, expand_attempt,
+    metrics_ready (a full TailorResult), best_chosen (the TailorResponse) or error.
+    """
 
-            latex2 = latex_current
-            m2 = compute_metrics(latex2, req.job_description)
+    async def produce(emit: Emit) -> None:
+        await run_tailor_pipeline(req, emit)
 
-            r2 = TailorResult(
-                pass_index=2,
-                mode=mode2,
-                tailored_resume_latex=latex2,
-                metrics=Metrics(**m2),
-            )
-            all_results.append(r2)
+    return _event_stream(produce)
 
-        best = choose_best(all_results)
 
-        return TailorResponse(
-            best=best,
-            all_passes=all_results,
-            decision=decision,
-        )
+_batch_slots: Optional[asyncio.Semaphore] = None
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+
+def _get_batch_slots() -> asyncio.Semaphore:
+    # Process-wide cap on batch pipelines running at once (BATCH_MAX_CONCURRENCY)
+    global _batch_slots
+    if _batch_slots is None:
+        _batch_slots = asyncio.Semaphore(int(os.getenv("BATCH_MAX_CONCURRENCY", "4")))
+    return _batch_slots
+
+
+@app.post("/tailor/batch")
+async def tailor_batch(req: BatchTailorRequest):
+    """
+    Tailor one resume against many job descriptions, streamed as SSE.
+
+    The resume is parsed and its JD-independent metric features extracted once.
+    Emits job_result {index, response} or job_error {index, status, detail} as
+    each job finishes, then batch_done.
+    """
+    baseline = await asyncio.to_thread(extract_resume_features, req.resume_latex)
+    knobs = req.model_dump(exclude={"resume_latex", "job_descriptions"})
+    slots = _get_batch_slots()
+
+    async def produce(emit: Emit) -> None:
+        async def one(index: int, job_description: str) -> bool:
+            sub = TailorRequest(resume_latex=req.resume_latex, job_description=job_description, **knobs)
+            async with slots:
+                try:
+                    resp = await run_tailor_pipeline(sub, baseline=baseline)
+                except CompileQueueFull as e:
+                    await emit("job_error", {"index": index, "status": 503, "detail": str(e)})
+                    return False
+                except Exception as e:
+                    await emit("job_error", {"index": index, "status": 500, "detail": str(e)})
+                    return False
+            await emit("job_result", {"index": index, "response": resp.model_dump()})
+            return True
+
+        ok = await asyncio.gather(*(one(i, jd) for i, jd in enumerate(req.job_descriptions)))
+        await emit("batch_done", {"total": len(ok), "failed": ok.count(False)})
+
+    return _event_stream(produce)
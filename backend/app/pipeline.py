@@ -0,0 +1,417 @@
+import asyncio
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .schemas import TailorRequest, TailorResponse, TailorResult, Metrics
+from .services.bullet_edits import BULLET_EDIT_MODES
+from .services.llm import LatexStreamAborted, generate_bullet_edits, generate_tailored_resume
+from .services.metrics import ResumeFeatures, compute_metrics, compute_metrics_from_features, extract_resume_features
+from .services.compile_pool import CompilePool, CompileQueueFull, get_compile_pool
+from .services.jd_digest import jd_digest
+from .services.local_tighten import tighten_locally
+from .services.pdf_compile import CompileResult
+from .services.telemetry import IN_FLIGHT, RequestTimings, request_timings, span
+from .services.latex_doc import parse_resume
+
+# Progress callback: emit(event_name, payload)
+Emit = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+PAGES_LIMIT = 1
+TIGHTEN_ATTEMPTS_MAX = 2
+MIN_WORDS = 600  # fallback when the compiler reports no layout
+EXPAND_BELOW_FILL = 0.85  # expand only if the page's text block is less full than this
+MAX_EXPAND_ATTEMPTS = 1
+
+
+async def _no_emit(event: str, data: Dict[str, Any]) -> None:
+    return None
+
+
+class HeldEvents:
+    """
+    Emit target for a speculative pass: events are held until `release()`
+    replays them to the real emit, after which new events go straight through.
+    The pass's decision entries and LLM calls are kept here too until the
+    run adopts it.
+    """
+
+    def __init__(self) -> None:
+        self.events: List[Tuple[str, Dict[str, Any]]] = []
+        self.target: Optional[Emit] = None
+        self.decision: Dict[str, Any] = {}
+        self.llm_calls: List[Dict[str, Any]] = []
+
+    async def __call__(self, event: str, data: Dict[str, Any]) -> None:
+        if self.target is None:
+            self.events.append((event, data))
+        else:
+            await self.target(event, data)
+
+    async def release(self, target: Emit) -> None:
+        while self.events:
+            await target(*self.events.pop(0))
+        self.target = target
+
+
+# Set inside a speculative pass task so its stages report to a HeldEvents
+_pass_emit: ContextVar[Optional[HeldEvents]] = ContextVar("pass_emit", default=None)
+
+
+def passes_require_regen(metrics: dict, req: TailorRequest) -> bool:
+    return (
+        metrics["signal_density"] < req.min_signal_density
+        or metrics["keyword_alignment"] < req.min_keyword_alignment
+    )
+
+
+def choose_best(results: list[TailorResult]) -> TailorResult:
+    def score(r: TailorResult) -> float:
+        red_penalty = 0.0
+        if r.metrics.redundancy == "High":
+            red_penalty = 0.8
+        elif r.metrics.redundancy == "Med":
+            red_penalty = 0.3
+        return (r.metrics.keyword_alignment * 0.65) + (r.metrics.signal_density * 3.5) - red_penalty
+
+    return sorted(results, key=score, reverse=True)[0]
+
+
+def usage_summary(calls: List[Dict[str, Any]]) -> dict:
+    return {
+        "calls": calls,
+        "prompt_tokens": sum(c["prompt_tokens"] or 0 for c in calls),
+        "completion_tokens": sum(c["completion_tokens"] or 0 for c in calls),
+        "retries": sum(c.get("retries", 0) for c in calls),
+    }
+
+
+@dataclass
+class PipelineRun:
+    """
+    Per-request state shared by every stage of one tailoring run.
+    """
+
+    req: TailorRequest
+    emit: Emit = _no_emit
+    compile_pool: CompilePool = field(default_factory=get_compile_pool)
+    decision: Dict[str, Any] = field(default_factory=dict)
+    llm_stats: Dict[str, int] = field(default_factory=lambda: {"hits": 0, "misses": 0})
+    # One entry per LLM call: mode, pass, prompt format, token usage
+    llm_calls: List[Dict[str, Any]] = field(default_factory=list)
+    # Pre-extracted features of req.resume_latex (shared across a batch)
+    baseline: Optional[ResumeFeatures] = None
+    # Compact JD sent to the LLM; metrics always use req.job_description
+    prompt_jd: str = ""
+
+    def __post_init__(self) -> None:
+        self.prompt_jd = jd_digest(self.req.job_description)
+        self.decision = {
+            "ran_second_pass": False,
+            "reason": None,
+            "thresholds": {
+                "min_signal_density": self.req.min_signal_density,
+                "min_keyword_alignment": self.req.min_keyword_alignment,
+            },
+            "page_limit": PAGES_LIMIT,
+            "page_count": None,
+            "tighten_attempts": 0,
+            "jd_digest": {
+                "chars": len(self.req.job_description),
+                "digest_chars": len(self.prompt_jd),
+            },
+        }
+
+    async def notify(self, event: str, data: Dict[str, Any]) -> None:
+        await (_pass_emit.get() or self.emit)(event, data)
+
+    def pass_decision(self) -> Dict[str, Any]:
+        # A speculative pass writes its entries aside until it is adopted
+        held = _pass_emit.get()
+        return held.decision if held is not None and held.target is None else self.decision
+
+    def pass_llm_calls(self) -> List[Dict[str, Any]]:
+        held = _pass_emit.get()
+        return held.llm_calls if held is not None and held.target is None else self.llm_calls
+
+    async def adopt(self, held: HeldEvents) -> None:
+        """
+        Take over a speculative pass: replay its events and merge what it recorded.
+        """
+        for key, value in held.decision.items():
+            if isinstance(value, dict):
+                self.decision.setdefault(key, {}).update(value)
+            else:
+                self.decision[key] = value
+        self.llm_calls.extend(held.llm_calls)
+        await held.release(self.emit)
+
+    async def generate(self, latex: str, mode: str, pass_index: int, stream: Optional[bool] = None) -> str:
+        # Tighten/expand only reword bullets: send those, not the whole document
+        structured = self.req.bullet_edits and mode in BULLET_EDIT_MODES
+        generate_fn = generate_bullet_edits if structured else generate_tailored_resume
+        calls: List[Dict[str, Any]] = []
+        try:
+            out = await generate_fn(
+                latex,
+                self.prompt_jd,
+                mode=mode,
+                use_cache=self.req.use_llm_cache,
+                cache_stats=self.llm_stats,
+                call_log=calls,
+                stream=stream,
+            )
+        finally:
+            # Aborted calls were billed too
+            self.pass_llm_calls().extend({"pass_index": pass_index, **call} for call in calls)
+        await self.notify("llm_done", {"pass_index": pass_index, "mode": mode, "chars": len(out)})
+        return out
+
+    async def compile(self, latex: str, pass_index: int) -> CompileResult:
+        result = await self.compile_pool.compile(latex)
+        await self.notify(
+            "compile_done",
+            {
+                "pass_index": pass_index,
+                "page_count": result.page_count,
+                "fill_ratio": result.fill_ratio,
+                "cached": result.cached,
+            },
+        )
+        return result
+
+    async def tighten_loop(
+        self, latex: str, pass_index: int
+    ) -> Tuple[str, Optional[CompileResult], int, Optional[str]]:
+        """
+        Compile, and while over the page limit ask the LLM to tighten.
+        Returns (latex, last successful compile, tighten attempts, compile error).
+        """
+        latex_current = latex
+        last_good_latex = latex_current
+        compiled = None
+        attempts = 0
+
+        for attempt in range(0, TIGHTEN_ATTEMPTS_MAX + 1):
+            # attempt=0 means compile the pass output; attempt>=1 means tightened versions
+            try:
+                compiled = await self.compile(latex_current, pass_index)
+                last_good_latex = latex_current
+            except CompileQueueFull:
+                raise
+            except Exception as e:
+                # If a tightened output breaks compilation, revert and stop tightening
+                return last_good_latex, compiled, attempts, f"Compile failed during tighten attempt {attempt}: {str(e)[:200]}"
+
+            if compiled.page_count <= PAGES_LIMIT:
+                break
+
+            # Too many pages → first try dropping the weakest bullets locally (compile-bound),
+            # only then spend an LLM round trip
+            if self.req.local_tighten:
+                with span("local_tighten"):
+                    local = await tighten_locally(
+                        latex_current,
+                        self.req.job_description,
+                        lambda candidate: self.compile(candidate, pass_index),
+                        page_limit=PAGES_LIMIT,
+                    )
+                if local is not None:
+                    self.pass_decision().setdefault("local_tighten", {})[f"pass_{pass_index}"] = {
+                        "removed_bullets": local.removed,
+                        "compiles": local.compiles,
+                    }
+                    return local.latex, local.compiled, attempts, None
+
+            attempts = attempt + 1
+            await self.notify("tighten_attempt", {"pass_index": pass_index, "attempt": attempts})
+            try:
+                latex_current = await self.generate(latex_current, "tighten_to_one_page", pass_index)
+            except LatexStreamAborted as e:
+                # The reply was unusable even after regenerating: keep the last document that compiled
+                return last_good_latex, compiled, attempts, f"Tighten attempt {attempts} abandoned: {str(e)[:200]}"
+
+        return latex_current, compiled, attempts, None
+
+    def underfilled(self, latex: str, compiled: CompileResult) -> bool:
+        # Prefer the measured fill of the page; word count only when the probe didn't report
+        if compiled.fill_ratio is not None:
+            return compiled.fill_ratio < EXPAND_BELOW_FILL
+        return len(parse_resume(latex).plain.split()) < MIN_WORDS
+
+    async def expand_to_fill(self, latex: str, compiled: Optional[CompileResult], pass_index: int) -> str:
+        # Always try to expand if underfilled (but only if we fit on 1 page)
+        if compiled is None or compiled.page_count != 1 or not self.underfilled(latex, compiled):
+            return latex
+
+        latex_current = latex
+        for _ in range(MAX_EXPAND_ATTEMPTS):
+            await self.notify("expand_attempt", {"pass_index": pass_index, "fill_ratio": compiled.fill_ratio})
+            try:
+                latex_try = await self.generate(latex_current, "expand_to_fill_one_page", pass_index)
+            except LatexStreamAborted:
+                break
+
+            try:
+                compiled_try = await self.compile(latex_try, pass_index)
+            except CompileQueueFull:
+                raise
+            except Exception:
+                break
+
+            if compiled_try.page_count != 1:
+                break
+
+            latex_current, compiled = latex_try, compiled_try
+            self.decision["expanded_to_fill"] = True
+            self.decision["fill_ratio"] = compiled.fill_ratio
+            if not self.underfilled(latex_current, compiled):
+                break
+
+        return latex_current
+
+    async def score(self, latex: str, pass_index: int, mode: str) -> Tuple[TailorResult, dict]:
+        m = await asyncio.to_thread(compute_metrics, latex, self.req.job_description)
+        result = TailorResult(
+            pass_index=pass_index,
+            mode=mode,
+            tailored_resume_latex=latex,
+            metrics=Metrics(**m),
+        )
+        await self.notify("metrics_ready", {"pass_index": pass_index, "result": result.model_dump()})
+        return result, m
+
+    async def run_pass_one(self) -> Tuple[TailorResult, dict]:
+        with span("pass_1"):
+            return await self._pass_one()
+
+    async def _pass_one(self) -> Tuple[TailorResult, dict]:
+        mode = "default"
+        await self.notify("pass_started", {"pass_index": 1, "mode": mode})
+        try:
+            latex = await self.generate(self.req.resume_latex, mode, 1)
+        except LatexStreamAborted as e:
+            # Every streamed reply was rejected: pass 1 is the answer, so take one whole reply
+            self.decision["stream_fallback"] = str(e)
+            latex = await self.generate(self.req.resume_latex, mode, 1, stream=False)
+
+        # Enforce one-page by compile + count + tighten loop
+        latex, compiled, attempts, error = await self.tighten_loop(latex, 1)
+        self.decision["tighten_attempts"] = attempts
+        if error:
+            self.decision["reason"] = error
+        self.decision["page_count"] = compiled.page_count if compiled else None
+        self.decision["fill_ratio"] = compiled.fill_ratio if compiled else None
+
+        with span("expand"):
+            latex = await self.expand_to_fill(latex, compiled, 1)
+
+        # Compute metrics on the final latex (after tighten/expand)
+        return await self.score(latex, 1, mode)
+
+    async def run_pass_two(self) -> Tuple[TailorResult, dict]:
+        with span("pass_2"):
+            return await self._pass_two()
+
+    async def _pass_two(self) -> Tuple[TailorResult, dict]:
+        mode = "increase_technical_depth"
+        await self.notify("pass_started", {"pass_index": 2, "mode": mode})
+        latex = await self.generate(self.req.resume_latex, mode, 2)
+
+        # Enforce one-page for pass 2 as well
+        latex, _, _, _ = await self.tighten_loop(latex, 2)
+        return await self.score(latex, 2, mode)
+
+    def llm_cache_summary(self) -> dict:
+        calls = self.llm_stats["hits"] + self.llm_stats["misses"]
+        return {
+            **self.llm_stats,
+            "hit_rate": round(self.llm_stats["hits"] / calls, 3) if calls else 0.0,
+        }
+
+    def llm_usage_summary(self) -> dict:
+        return usage_summary(self.llm_calls)
+
+    async def predict_second_pass(self) -> bool:
+        """
+        Cheap predictor for speculation: if the original resume already misses
+        the thresholds, pass 1 usually does too, so pass 2 is worth starting early.
+        """
+        if self.baseline is None:
+            self.baseline = await asyncio.to_thread(extract_resume_features, self.req.resume_latex)
+        m0 = await asyncio.to_thread(compute_metrics_from_features, self.baseline, self.req.job_description)
+        return passes_require_regen(m0, self.req)
+
+    async def speculate_pass_two(self, held: HeldEvents) -> Tuple[TailorResult, dict]:
+        _pass_emit.set(held)
+        return await self.run_pass_two()
+
+    async def run(self) -> TailorResponse:
+        # Every span below (child tasks and worker threads included) lands in decision["timings"]
+        with request_timings() as timings, IN_FLIGHT.in_flight(kind="tailor_request"), span("request"):
+            return await self._run(timings)
+
+    async def _run(self, timings: RequestTimings) -> TailorResponse:
+        t0 = time.perf_counter()
+        all_results: list[TailorResult] = []
+
+        # Both passes start from req.resume_latex, so pass 2 can run alongside pass 1
+        # Its progress events are held back until pass 1 shows it is needed
+        speculative: Optional[asyncio.Task] = None
+        held = HeldEvents()
+        if self.req.max_passes >= 2 and self.req.speculative_second_pass:
+            predicted = await self.predict_second_pass()
+            self.decision["speculation"] = {"predicted_second_pass": predicted, "used": False}
+            if predicted:
+                speculative = asyncio.create_task(self.speculate_pass_two(held))
+
+        try:
+            # PASS 1 (default)
+            r1, m1 = await self.run_pass_one()
+            all_results.append(r1)
+
+            # PASS 2 (conditional technical depth)
+            if self.req.max_passes >= 2 and passes_require_regen(m1, self.req):
+                self.decision["ran_second_pass"] = True
+                self.decision["reason"] = "Below thresholds; regenerating with increase_technical_depth mode."
+                try:
+                    if speculative is not None:
+                        self.decision["speculation"]["used"] = True
+                        await self.adopt(held)
+                        r2, _ = await speculative
+                    else:
+                        r2, _ = await self.run_pass_two()
+                except LatexStreamAborted as e:
+                    # Pass 1 already stands on its own: answer with it
+                    self.decision["reason"] = f"Pass 2 skipped: its LLM reply was abandoned mid-stream ({e})."
+                else:
+                    all_results.append(r2)
+        finally:
+            # Pass 1 cleared the thresholds (or failed): discard the speculative pass
+            if speculative is not None and not speculative.done():
+                speculative.cancel()
+                await asyncio.gather(speculative, return_exceptions=True)
+
+        best = choose_best(all_results)
+        self.decision["llm_cache"] = self.llm_cache_summary()
+        self.decision["llm_usage"] = self.llm_usage_summary()
+        if speculative is not None and not self.decision["speculation"]["used"]:
+            # Spent on a pass that was thrown away; not part of llm_usage
+            self.decision["speculation"]["discarded_usage"] = usage_summary(held.llm_calls)
+        self.decision["timings"] = {
+            "total_s": round(time.perf_counter() - t0, 4),
+            "stages": timings.summary(),
+        }
+
+        response = TailorResponse(best=best, all_passes=all_results, decision=self.decision)
+        await self.emit("best_chosen", {"pass_index": best.pass_index, "response": response.model_dump()})
+        return response
+
+
+async def run_tailor_pipeline(
+    req: TailorRequest,
+    emit: Emit = _no_emit,
+    baseline: Optional[ResumeFeatures] = None,
+) -> TailorResponse:
+    return await PipelineRun(req=req, emit=emit, baseline=baseline).run()
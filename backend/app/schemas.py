@@ -2,23 +2,55 @@ from pydantic import BaseModel, Field
 from typing import Any, Dict, List, Optional
 
 
-class TailorRequest(BaseModel):
-    resume_latex: str = Field(..., description="Full LaTeX resume source")
-    job_description: str = Field(..., description="Target job description text")
-    role_title: Optional[str] = Field(default=None, description="Optional role title")
-    company: Optional[str] = Field(default=None, description="Optional company name")
+class TailorOptions(BaseModel):
+    """
+    Feedback-loop knobs shared by single and batch tailoring requests.
+    """
 
     # Feedback loop knobs
     min_signal_density: float = Field(default=7.6, ge=0.0, le=10.0)
     min_keyword_alignment: float = Field(default=82.0, ge=0.0, le=100.0)
     max_passes: int = Field(default=2, ge=1, le=3)
 
+    speculative_second_pass: bool = Field(
+        default=True,
+        description="Start the increase_technical_depth pass alongside pass 1 when it is predicted to be needed",
+    )
+    local_tighten: bool = Field(
+        default=True,
+        description="Try dropping the lowest-value bullets before asking the LLM to tighten",
+    )
+    bullet_edits: bool = Field(
+        default=True,
+        description="Tighten/expand by sending only the bullets and splicing the edited ones back",
+    )
+    use_llm_cache: bool = Field(default=True, description="Reuse cached LLM responses for identical prompts")
+
+
+class TailorRequest(TailorOptions):
+    resume_latex: str = Field(..., description="Full LaTeX resume source")
+    job_description: str = Field(..., description="Target job description text")
+    role_title: Optional[str] = Field(default=None, description="Optional role title")
+    company: Optional[str] = Field(default=None, description="Optional company name")
+
+
+class BatchTailorRequest(TailorOptions):
+    resume_latex: str = Field(..., description="Full LaTeX resume source, shared by every job")
+    job_descriptions: List[str] = Field(..., min_length=1, description="Job descriptions to tailor against")
+
+
+class RedundantPair(BaseModel):
+    i: int                      # indices into the resume's bullets
+    j: int
+    similarity: float           # token_set_ratio, 0-100
+
 
 class Metrics(BaseModel):
     signal_density: float
     technical_specificity: str  # Low/Med/High
     keyword_alignment: float    # %
     redundancy: str             # Low/Med/High
+    redundant_pairs: List[RedundantPair] = Field(default_factory=list)
 
     # Helpful debugging/UX extras
     matched_keywords: List[str]
@@ -38,3 +70,16 @@ class TailorResponse(BaseModel):
     best: TailorResult
     all_passes: List[TailorResult]
     decision: Dict[str, Any]
+
+
+class JobStatus(BaseModel):
+    id: str
+    status: str                 # queued/running/succeeded/failed
+    attempts: int
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    passes: List[TailorResult] = Field(default_factory=list)  # finished so far
+    response: Optional[TailorResponse] = None
+    error: Optional[str] = None
+    error_status: Optional[int] = None
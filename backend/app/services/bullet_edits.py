@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+
+from .latex_doc import ResumeDocument, splice
+
+# Modes where only bullet wording changes, so the model never needs the template
+BULLET_EDIT_MODES = {"tighten_to_one_page", "expand_to_fill_one_page"}
+
+# Characters that must be escaped inside a bullet body
+UNSAFE_CHARS = set("%&#")
+
+
+@dataclass
+class BulletEdits:
+    edits: Dict[int, str] = field(default_factory=dict)
+    removed: Set[int] = field(default_factory=set)
+    # IDs the model returned that could not be applied safely
+    rejected: List[int] = field(default_factory=list)
+
+
+def bullet_payload(doc: ResumeDocument) -> List[dict]:
+    """
+    ID-keyed bullet list sent to the model, with the heading each bullet sits under.
+    """
+    out = []
+    for idx, b in enumerate(doc.bullets):
+        item = {"id": idx, "text": b.body}
+        if b.section >= 0:
+            item["section"] = doc.sections[b.section].title
+        if b.entry >= 0:
+            item["entry"] = " | ".join(f for f in doc.entries[b.entry].fields[:2] if f)
+        out.append(item)
+    return out
+
+
+def safe_body(text: str) -> bool:
+    """
+    A replacement body must keep braces balanced and leave no unescaped % & #,
+    otherwise splicing it could break the surrounding template.
+    """
+    depth = 0
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch in UNSAFE_CHARS:
+            return False
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth < 0:
+                return False
+        i += 1
+    return depth == 0
+
+
+def _strip_fences(content: str) -> str:
+    text = content.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+    return text
+
+
+def parse_bullet_edits(content: str, doc: ResumeDocument) -> BulletEdits:
+    """
+    Parse {"edits": [{"id": ..., "text": ...}], "remove": [ids]}.
+    Raises ValueError when the reply is not that shape at all.
+    """
+    try:
+        data = json.loads(_strip_fences(content))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Bullet edits are not valid JSON: {e}") from e
+    if not isinstance(data, dict):
+        raise ValueError("Bullet edits must be a JSON object")
+
+    n = len(doc.bullets)
+    result = BulletEdits()
+
+    for item in data.get("edits") or []:
+        if not isinstance(item, dict):
+            continue
+        idx, text = item.get("id"), item.get("text")
+        if not isinstance(idx, int) or not 0 <= idx < n or not isinstance(text, str):
+            continue
+        text = " ".join(text.split())
+        if not text:
+            result.removed.add(idx)
+        elif safe_body(text):
+            result.edits[idx] = text
+        else:
+            result.rejected.append(idx)
+
+    for idx in data.get("remove") or []:
+        if isinstance(idx, int) and 0 <= idx < n:
+            result.removed.add(idx)
+            result.edits.pop(idx, None)
+
+    _keep_one_per_list(doc, result)
+    return result
+
+
+def _keep_one_per_list(doc: ResumeDocument, result: BulletEdits) -> None:
+    # An emptied itemize does not compile: the first bullet of such a list stays.
+    # Removals run last to first, so the one refused is the list's first bullet.
+    remaining: Dict[int, int] = {}
+    for b in doc.bullets:
+        remaining[b.list_start] = remaining.get(b.list_start, 0) + 1
+    for idx in sorted(result.removed, reverse=True):
+        group = doc.bullets[idx].list_start
+        if remaining[group] > 1:
+            remaining[group] -= 1
+        else:
+            result.removed.discard(idx)
+            result.rejected.append(idx)
+
+
+def apply_bullet_edits(doc: ResumeDocument, result: BulletEdits) -> str:
+    """
+    Splice edited bodies back into the original source; everything outside the
+    edited bullets (preamble, headings, list markup) is left byte-for-byte.
+    """
+    replacements: List[Tuple[int, int, str]] = []
+    for idx, text in result.edits.items():
+        b = doc.bullets[idx]
+        body_start = b.end - 1 - len(b.body)
+        replacements.append((body_start, b.end - 1, text))
+    for idx in result.removed:
+        b = doc.bullets[idx]
+        replacements.append((b.start, b.end, ""))
+    return splice(doc.source, replacements)
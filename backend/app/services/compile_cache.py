@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .lazy import Lazy
+from .lru import LRUCache
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[2] / ".cache" / "compile"
+
+
+@dataclass(frozen=True)
+class CachedCompile:
+    pdf_bytes: bytes
+    page_count: int
+    fill_ratio: Optional[float] = None
+
+
+class CompileCache:
+    """
+    Content-addressed cache of compiled PDFs.
+
+    Keys are sha256(tectonic version + sanitized LaTeX). Entries live on disk as
+    `<key>.pdf` plus a `<key>.json` sidecar holding page count and fill ratio, with
+    least-recently-used eviction once both files together exceed `max_bytes`.
+    A small in-memory LRU sits in front so hot entries skip the disk entirely.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int, memory_entries: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max(0, int(max_bytes))
+        self._memory: LRUCache[CachedCompile] = LRUCache(memory_entries)
+        self._lock = threading.Lock()
+
+        # key -> (pdf + sidecar bytes, last_access)
+        self._index: Dict[str, Tuple[int, float]] = {}
+        self._total_bytes = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def key_for(sanitized_latex: str, tectonic_version: str) -> str:
+        h = hashlib.sha256()
+        h.update(tectonic_version.encode("utf-8"))
+        h.update(b"\0")
+        h.update(sanitized_latex.encode("utf-8"))
+        return h.hexdigest()
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        return self.cache_dir / f"{key}.pdf", self.cache_dir / f"{key}.json"
+
+    def _load_index(self) -> None:
+        for pdf_path in self.cache_dir.glob("*.pdf"):
+            try:
+                st = pdf_path.stat()
+                size = st.st_size + pdf_path.with_suffix(".json").stat().st_size
+            except FileNotFoundError:
+                continue
+            self._index[pdf_path.stem] = (size, st.st_mtime)
+            self._total_bytes += size
+
+    def get(self, key: str) -> Optional[CachedCompile]:
+        hit = self._memory.get(key)
+        if hit is not None:
+            with self._lock:
+                self.memory_hits += 1
+            return hit
+
+        pdf_path, meta_path = self._paths(key)
+        try:
+            pdf_bytes = pdf_path.read_bytes()
+            meta_bytes = meta_path.read_bytes()
+            meta = json.loads(meta_bytes.decode("utf-8"))
+            entry = CachedCompile(
+                pdf_bytes=pdf_bytes,
+                page_count=int(meta["page_count"]),
+                fill_ratio=meta.get("fill_ratio"),
+            )
+        except (FileNotFoundError, ValueError, KeyError):
+            # Missing, half-written or evicted by another worker
+            with self._lock:
+                self.misses += 1
+            return None
+
+        now = time.time()
+        try:
+            os.utime(pdf_path, (now, now))
+        except OSError:
+            pass
+
+        size = len(pdf_bytes) + len(meta_bytes)
+        with self._lock:
+            self.disk_hits += 1
+            prev = self._index.get(key)
+            self._total_bytes += size - (prev[0] if prev is not None else 0)
+            self._index[key] = (size, now)
+
+        self._memory.put(key, entry)
+        return entry
+
+    def put(self, key: str, pdf_bytes: bytes, page_count: int, fill_ratio: Optional[float] = None) -> None:
+        entry = CachedCompile(pdf_bytes=pdf_bytes, page_count=page_count, fill_ratio=fill_ratio)
+        self._memory.put(key, entry)
+
+        meta_bytes = json.dumps({"page_count": page_count, "fill_ratio": fill_ratio}).encode("utf-8")
+        size = len(pdf_bytes) + len(meta_bytes)
+        if self.max_bytes == 0 or size > self.max_bytes:
+            return
+
+        pdf_path, meta_path = self._paths(key)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            # Write sidecar first so a visible .pdf always has its metadata
+            tmp_meta = meta_path.with_name(meta_path.name + suffix)
+            tmp_meta.write_bytes(meta_bytes)
+            os.replace(tmp_meta, meta_path)
+
+            tmp_pdf = pdf_path.with_name(pdf_path.name + suffix)
+            tmp_pdf.write_bytes(pdf_bytes)
+            os.replace(tmp_pdf, pdf_path)
+        except OSError:
+            return
+
+        with self._lock:
+            prev = self._index.get(key)
+            if prev is not None:
+                self._total_bytes -= prev[0]
+            self._index[key] = (size, time.time())
+            self._total_bytes += size
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        for key, (size, _) in sorted(self._index.items(), key=lambda kv: kv[1][1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            pdf_path, meta_path = self._paths(key)
+            for p in (pdf_path, meta_path):
+                try:
+                    p.unlink()
+                except FileNotFoundError:
+                    pass
+            del self._index[key]
+            self._total_bytes -= size
+            self._memory.pop(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "disk_entries": len(self._index),
+                "disk_bytes": self._total_bytes,
+                "memory_entries": len(self._memory),
+            }
+
+
+def _cache_from_env() -> CompileCache:
+    """
+    COMPILE_CACHE_DIR (default backend/.cache/compile), COMPILE_CACHE_MAX_BYTES
+    (default 256 MiB; 0 disables the disk tier) and COMPILE_CACHE_MEMORY_ENTRIES
+    (default 64).
+    """
+    return CompileCache(
+        cache_dir=Path(os.getenv("COMPILE_CACHE_DIR", str(DEFAULT_CACHE_DIR))),
+        max_bytes=int(os.getenv("COMPILE_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+        memory_entries=int(os.getenv("COMPILE_CACHE_MEMORY_ENTRIES", "64")),
+    )
+
+
+get_compile_cache = Lazy(_cache_from_env)
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+from pathlib import Path
+from typing import List
+
+from .compile_cache import get_compile_cache
+from .lazy import Lazy
+from .pdf_compile import (
+    CompileResult,
+    TectonicOutput,
+    cache_key_for,
+    count_pdf_pages,
+    reference_template,
+    run_tectonic_async,
+)
+from .telemetry import COMPILES, IN_FLIGHT, span
+
+DEFAULT_WORKSPACE_ROOT = Path(__file__).resolve().parents[2] / ".cache" / "workspaces"
+
+
+class CompileQueueFull(RuntimeError):
+    """
+    Raised when too many compiles are already waiting for a worker slot.
+    """
+
+
+class CompileTimeout(RuntimeError):
+    """
+    Raised when a single tectonic run exceeds the per-job timeout.
+    """
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def sweep_stale_workspaces(root: Path) -> int:
+    """
+    Delete workspaces left behind by processes that are no longer running.
+    """
+    removed = 0
+    for d in Path(root).glob("ws-*-*"):
+        try:
+            pid = int(d.name.split("-")[1])
+        except ValueError:
+            continue
+        if pid != os.getpid() and not _pid_alive(pid):
+            shutil.rmtree(d, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+class WorkspacePool:
+    """
+    Fixed set of persistent compile directories, one per worker slot.
+
+    Directories are namespaced by PID so several uvicorn workers can share the
+    same root; those of dead processes are swept on creation and a pool
+    removes its own on shutdown. Between jobs only resume.tex is rewritten.
+    """
+
+    def __init__(self, root: Path, size: int):
+        self.root = Path(root)
+        self.dirs: List[Path] = []
+        self._free: asyncio.Queue[Path] = asyncio.Queue()
+
+        if self.root.is_dir():
+            sweep_stale_workspaces(self.root)
+
+        for i in range(max(1, int(size))):
+            d = self.root / f"ws-{os.getpid()}-{i}"
+            d.mkdir(parents=True, exist_ok=True)
+            self.dirs.append(d)
+            self._free.put_nowait(d)
+
+    async def acquire(self) -> Path:
+        return await self._free.get()
+
+    def release(self, workdir: Path) -> None:
+        self._free.put_nowait(workdir)
+
+    def remove(self) -> None:
+        for d in self.dirs:
+            shutil.rmtree(d, ignore_errors=True)
+
+
+class CompilePool:
+    """
+    Bounded async compile service.
+
+    At most `concurrency` tectonic processes run at once; up to `max_pending`
+    further jobs wait for a slot, beyond that new jobs are rejected with
+    CompileQueueFull so callers can shed load instead of piling up.
+    Cache hits never take a slot.
+
+    Each slot owns a warm workspace, so tectonic reuses the same directory
+    (and the shared TECTONIC_CACHE_DIR bundle/format cache) across jobs.
+    """
+
+    def __init__(self, concurrency: int, max_pending: int, timeout_s: float, workspace_root: Path):
+        self.concurrency = max(1, int(concurrency))
+        self.max_pending = max(0, int(max_pending))
+        self.timeout_s = float(timeout_s)
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self.workspaces = WorkspacePool(workspace_root, self.concurrency)
+        self.warmed = False
+        self._waiting = 0
+        self._running = 0
+
+    async def compile(self, latex: str) -> CompileResult:
+        with span("compile"):
+            try:
+                result = await self._compile(latex)
+            except CompileQueueFull:
+                COMPILES.inc(result="queue_full")
+                raise
+            except CompileTimeout:
+                COMPILES.inc(result="timeout")
+                raise
+            except Exception:
+                COMPILES.inc(result="error")
+                raise
+        COMPILES.inc(result="cached" if result.cached else "compiled")
+        return result
+
+    async def _compile(self, latex: str) -> CompileResult:
+        # Hashing, the tectonic version probe and disk reads stay off the event loop
+        sanitized, key = await asyncio.to_thread(cache_key_for, latex)
+        cache = get_compile_cache()
+
+        hit = await asyncio.to_thread(cache.get, key)
+        if hit is not None:
+            return CompileResult(
+                pdf_bytes=hit.pdf_bytes, page_count=hit.page_count, cached=True, fill_ratio=hit.fill_ratio
+            )
+
+        if self._waiting >= self.max_pending and self._slots.locked():
+            raise CompileQueueFull(
+                f"Compile queue full ({self._waiting} waiting, {self.concurrency} running)."
+            )
+
+        self._waiting += 1
+        try:
+            with span("compile_queue"):
+                await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+
+        try:
+            with IN_FLIGHT.in_flight(kind="compile"):
+                out = await self._run(sanitized)
+        finally:
+            self._slots.release()
+
+        page_count = await asyncio.to_thread(count_pdf_pages, out.pdf_bytes)
+        await asyncio.to_thread(cache.put, key, out.pdf_bytes, page_count, out.fill_ratio)
+        return CompileResult(pdf_bytes=out.pdf_bytes, page_count=page_count, fill_ratio=out.fill_ratio)
+
+    async def _run(self, latex: str) -> TectonicOutput:
+        workdir = await self.workspaces.acquire()
+        self._running += 1
+        try:
+            return await asyncio.wait_for(run_tectonic_async(latex, workdir), self.timeout_s)
+        except asyncio.TimeoutError:
+            raise CompileTimeout(f"PDF compile timed out after {self.timeout_s:.0f}s.")
+        finally:
+            self._running -= 1
+            self.workspaces.release(workdir)
+
+    async def warm_up(self) -> None:
+        """
+        Compile the reference template once in every workspace, bypassing the
+        compile cache, so the first real request finds tectonic's bundle files,
+        format file and font caches already populated.
+        """
+        latex, _ = await asyncio.to_thread(cache_key_for, reference_template())
+
+        async def one() -> None:
+            async with self._slots:
+                await self._run(latex)
+
+        # First run alone generates the format file; the rest reuse it
+        await one()
+        await asyncio.gather(*(one() for _ in range(self.concurrency - 1)))
+        self.warmed = True
+
+    def stats(self) -> dict:
+        return {
+            "warmed": self.warmed,
+            "concurrency": self.concurrency,
+            "running": self._running,
+            "waiting": self._waiting,
+            "max_pending": self.max_pending,
+        }
+
+
+def _pool_from_env() -> CompilePool:
+    """
+    COMPILE_CONCURRENCY (default: CPU core count), COMPILE_MAX_PENDING (default
+    8 x concurrency), COMPILE_TIMEOUT_S (default 30) and COMPILE_WORKSPACE_DIR
+    (default backend/.cache/workspaces).
+    """
+    concurrency = int(os.getenv("COMPILE_CONCURRENCY", str(os.cpu_count() or 1)))
+    return CompilePool(
+        concurrency=concurrency,
+        max_pending=int(os.getenv("COMPILE_MAX_PENDING", str(concurrency * 8))),
+        timeout_s=float(os.getenv("COMPILE_TIMEOUT_S", "30")),
+        workspace_root=Path(os.getenv("COMPILE_WORKSPACE_DIR", str(DEFAULT_WORKSPACE_ROOT))),
+    )
+
+
+get_compile_pool = Lazy(_pool_from_env)
+
+
+def close_compile_pool() -> None:
+    """
+    Remove the pool's workspaces (called from the FastAPI lifespan on shutdown).
+    """
+    pool = get_compile_pool.reset()
+    if pool is not None:
+        pool.workspaces.remove()
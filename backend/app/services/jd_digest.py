@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import os
+import re
+from typing import List, Pattern, Tuple
+
+from .keywords import extract_keywords
+from .lru import content_key, memo_from_env
+
+# Rough tokenizer-free estimate, good enough for budgeting English prompts
+CHARS_PER_TOKEN = 4
+
+# Lines/sentences about the employer rather than the role
+BOILERPLATE_RE = re.compile(
+    r"equal (employment )?opportunity|\beeo\b|affirmative action|without regard to|"
+    r"\brace\b|religion|gender identity|sexual orientation|national origin|veteran|disabilit|"
+    r"reasonable accommodation|background check|e-verify|privacy (policy|notice)|"
+    r"benefits|401\(?k\)?|dental|vision insurance|health insurance|paid time off|\bpto\b|"
+    r"parental leave|wellness|stipend|perks|salary range|compensation|equity package|"
+    r"about us|our mission|our culture|we are proud|founded in|headquartered",
+    re.IGNORECASE,
+)
+
+# Phrasing that marks a requirement or responsibility
+REQUIREMENT_RE = re.compile(
+    r"experience|proficien|familiar|knowledge of|required|requirement|must|should|"
+    r"you will|you'll|responsib|qualif|ability to|strong|expertise|hands-on|degree",
+    re.IGNORECASE,
+)
+
+_SPLIT_RE = re.compile(r"\n+|(?<=[.!?;])\s+(?=[A-Z(])")
+_BULLET_PREFIX_RE = re.compile(r"^\s*(?:[-*•●▪]|\d+[.)])\s*")
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def token_budget() -> int:
+    """
+    JD_DIGEST_TOKEN_BUDGET (default 400; 0 sends the JD verbatim).
+    """
+    return int(os.getenv("JD_DIGEST_TOKEN_BUDGET", "400"))
+
+
+def split_units(job_description: str) -> List[str]:
+    """
+    Lines and sentences of the JD, bullet markers removed, first occurrence only.
+    """
+    units: List[str] = []
+    seen = set()
+    for raw in _SPLIT_RE.split(job_description):
+        text = " ".join(_BULLET_PREFIX_RE.sub("", raw).split())
+        if text and text.lower() not in seen:
+            seen.add(text.lower())
+            units.append(text)
+    return units
+
+
+def keyword_patterns(keywords: List[str]) -> List[Pattern[str]]:
+    # Whole-word matches, so "c" or "go" don't hit inside other words
+    return [re.compile(r"(?<![\w+#/])" + re.escape(kw) + r"(?![\w+#/])", re.IGNORECASE) for kw in keywords]
+
+
+def score_unit(unit: str, patterns: List[Pattern[str]]) -> float:
+    """
+    Distinct JD keywords in the unit, plus a bonus for requirement phrasing.
+    Boilerplate and headings ("Requirements:") score zero or below and are never kept.
+    """
+    if BOILERPLATE_RE.search(unit) or unit.endswith(":"):
+        return -1.0
+    hits = sum(1 for p in patterns if p.search(unit))
+    return hits + (0.5 if REQUIREMENT_RE.search(unit) else 0.0)
+
+
+def build_digest(job_description: str, budget: int) -> str:
+    """
+    Keyword line followed by the most relevant sentences, in their original
+    order, within `budget` estimated tokens.
+    """
+    if budget <= 0 or estimate_tokens(job_description) <= budget:
+        return job_description
+
+    units = split_units(job_description)
+    # Keywords come from the role text only, so employer boilerplate can't leak in
+    role_text = "\n".join(u for u in units if not BOILERPLATE_RE.search(u))
+    keywords = extract_keywords(role_text)
+    # extract_keywords matches substrings ("api" in "rapid"); keep whole words only
+    pairs = [(kw, p) for kw, p in zip(keywords, keyword_patterns(keywords)) if p.search(role_text)]
+    header = "Key terms: " + ", ".join(kw for kw, _ in pairs)
+    remaining = budget - estimate_tokens(header)
+    patterns = [p for _, p in pairs]
+
+    ranked: List[Tuple[float, int]] = sorted(
+        ((score_unit(u, patterns), i) for i, u in enumerate(units)),
+        key=lambda t: (-t[0], t[1]),
+    )
+
+    chosen = []
+    for score, i in ranked:
+        if score <= 0:
+            break
+        cost = estimate_tokens(units[i]) + 1
+        if cost <= remaining:
+            chosen.append(i)
+            remaining -= cost
+
+    return "\n".join([header] + [f"- {units[i]}" for i in sorted(chosen)])
+
+
+_digest_cache = memo_from_env("JD_DIGEST_CACHE_ENTRIES", 256)
+
+
+def jd_digest(job_description: str) -> str:
+    """
+    Compact JD used in prompts; metrics keep scoring against the full text.
+    Cached per JD and budget.
+    """
+    budget = token_budget()
+    cache = _digest_cache()
+    key = (content_key(job_description), budget)
+    digest = cache.get(key)
+    if digest is None:
+        digest = build_digest(job_description, budget)
+        cache.put(key, digest)
+    return digest
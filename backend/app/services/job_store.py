@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Optional, Tuple
+
+from .lazy import Lazy
+from .sqlite_db import connect, create
+
+DEFAULT_STORE_PATH = Path(__file__).resolve().parents[2] / ".cache" / "jobs.sqlite3"
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    request TEXT NOT NULL,
+    passes TEXT NOT NULL DEFAULT '[]',
+    response TEXT,
+    error TEXT,
+    error_status INTEGER,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    heartbeat_at REAL,
+    not_before REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs(status, created_at);
+"""
+
+
+class JobStore:
+    """
+    SQLite-backed tailoring job queue, shared by every uvicorn worker pointing
+    at the same file.
+
+    Jobs move queued -> running -> succeeded/failed. A running job whose
+    heartbeat is older than `lease_s` belonged to a worker that died; it is
+    put back in the queue (or failed once it has used up `max_attempts`).
+    A requeued job can carry a not-before time so an overloaded worker does
+    not claim it straight back. Finished jobs are dropped after `ttl_s`.
+    """
+
+    def __init__(self, path: Path, lease_s: float, max_attempts: int, ttl_s: float):
+        self.path = Path(path)
+        self.lease_s = float(lease_s)
+        self.max_attempts = max(1, int(max_attempts))
+        self.ttl_s = float(ttl_s)
+
+        create(self.path, SCHEMA)
+        with connect(self.path, rows=True) as conn:
+            # Stores created before delayed requeues lack the column
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "not_before" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN not_before REAL")
+
+    def submit(self, request: dict) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with connect(self.path, rows=True) as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, request, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(request), now),
+            )
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (SUCCEEDED, FAILED, now - self.ttl_s),
+            )
+        return job_id
+
+    def queued_count(self) -> int:
+        with connect(self.path, rows=True) as conn:
+            (count,) = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()
+        return int(count)
+
+    def claim(self, worker: str) -> Optional[Tuple[str, dict]]:
+        """
+        Atomically take the oldest queued job that is due for `worker`; None when
+        there is none.
+        """
+        now = time.time()
+        with connect(self.path, rows=True) as conn:
+            row = conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, attempts = attempts + 1, "
+                "started_at = ?, heartbeat_at = ?, not_before = NULL "
+                "WHERE id = (SELECT id FROM jobs WHERE status = ? AND (not_before IS NULL OR not_before <= ?) "
+                "ORDER BY created_at LIMIT 1) "
+                "RETURNING id, request",
+                (RUNNING, worker, now, now, QUEUED, now),
+            ).fetchone()
+        if row is None:
+            return None
+        return row["id"], json.loads(row["request"])
+
+    def heartbeat(self, job_id: str) -> None:
+        with connect(self.path, rows=True) as conn:
+            conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = ?", (time.time(), job_id, RUNNING)
+            )
+
+    def add_pass(self, job_id: str, result: dict) -> None:
+        # json_insert appends in place, so concurrent passes of one job cannot overwrite each other
+        with connect(self.path, rows=True) as conn:
+            conn.execute(
+                "UPDATE jobs SET passes = json_insert(passes, '$[#]', json(?)), heartbeat_at = ? WHERE id = ?",
+                (json.dumps(result), time.time(), job_id),
+            )
+
+    def succeed(self, job_id: str, response: dict) -> None:
+        self._finish(job_id, SUCCEEDED, response=json.dumps(response))
+
+    def fail(self, job_id: str, error: str, status: int = 500) -> None:
+        self._finish(job_id, FAILED, error=error, error_status=status)
+
+    def _finish(self, job_id: str, status: str, **fields) -> None:
+        cols = "".join(f", {k} = ?" for k in fields)
+        with connect(self.path, rows=True) as conn:
+            conn.execute(
+                f"UPDATE jobs SET status = ?, finished_at = ?{cols} WHERE id = ?",
+                (status, time.time(), *fields.values(), job_id),
+            )
+
+    def requeue(
+        self, job_id: str, error: Optional[str] = None, delay_s: float = 0.0, error_status: int = 500
+    ) -> None:
+        """
+        Give a running job back to the queue, claimable again `delay_s` after
+        now, or fail it with `error_status` if it is out of attempts.
+        """
+        now = time.time()
+        with connect(self.path, rows=True) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "error = COALESCE(?, error), worker = NULL, passes = '[]', "
+                "error_status = CASE WHEN attempts >= ? THEN ? ELSE error_status END, "
+                "not_before = CASE WHEN attempts >= ? THEN NULL ELSE ? END, "
+                "finished_at = CASE WHEN attempts >= ? THEN ? ELSE NULL END "
+                "WHERE id = ? AND status = ?",
+                (
+                    self.max_attempts, FAILED, QUEUED, error,
+                    self.max_attempts, error_status,
+                    self.max_attempts, now + delay_s if delay_s > 0 else None,
+                    self.max_attempts, now,
+                    job_id, RUNNING,
+                ),
+            )
+
+    def recover_stale(self) -> int:
+        """
+        Requeue running jobs whose worker stopped heartbeating. Returns how many.
+        """
+        now = time.time()
+        with connect(self.path, rows=True) as conn:
+            rows = conn.execute(
+                "SELECT id FROM jobs WHERE status = ? AND heartbeat_at < ?", (RUNNING, now - self.lease_s)
+            ).fetchall()
+        for row in rows:
+            self.requeue(row["id"], error="Worker stopped before the job finished.")
+        return len(rows)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with connect(self.path, rows=True) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row["id"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+            "passes": json.loads(row["passes"]),
+            "response": json.loads(row["response"]) if row["response"] else None,
+            "error": row["error"],
+            "error_status": row["error_status"],
+        }
+
+    def stats(self) -> dict:
+        with connect(self.path, rows=True) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {s: 0 for s in (QUEUED, RUNNING, SUCCEEDED, FAILED)}
+        counts.update({status: n for status, n in rows})
+        return counts
+
+
+def _store_from_env() -> JobStore:
+    """
+    JOB_STORE_PATH (default backend/.cache/jobs.sqlite3); JOB_LEASE_S (default
+    60), the heartbeat age after which a running job is reclaimed;
+    JOB_MAX_ATTEMPTS (default 3); JOB_TTL_S (default 1 day), how long
+    finished jobs stay readable.
+    """
+    return JobStore(
+        path=Path(os.getenv("JOB_STORE_PATH", str(DEFAULT_STORE_PATH))),
+        lease_s=float(os.getenv("JOB_LEASE_S", "60")),
+        max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "3")),
+        ttl_s=float(os.getenv("JOB_TTL_S", str(24 * 3600))),
+    )
+
+
+get_job_store = Lazy(_store_from_env)
@@ -1,5 +1,12 @@
+import json
+import os
 import re
-from typing import List, Set
+from itertools import islice
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from .lru import content_key, memo_from_env
+from .matcher import AhoCorasick
 
 # Minimal, robust keyword extraction tuned for SWE job descriptions
 STOPWORDS = {
@@ -15,6 +22,16 @@ BOOST_TERMS = {
     "openapi","swagger","pytest","gtest","c++","c","python","sql","firebase"
 }
 
+# Common compound phrases, reported in this order when present
+PHRASES = [
+    "embedded linux", "device drivers", "real-time", "real time", "memory mapped",
+    "rest api", "openapi", "unit test", "integration test", "continuous integration",
+    "agile", "sprint", "jwt", "oauth", "git", "github", "docker", "postgresql",
+    "c test", "g test", "gtest", "python", "c++", "linux"
+]
+
+TOKEN_RE = re.compile(r"[a-zA-Z][a-zA-Z0-9\+\#\/\.\-]{1,}")
+
 
 def normalize_token(t: str) -> str:
     t = t.lower().strip()
@@ -23,57 +40,87 @@ def normalize_token(t: str) -> str:
     return t
 
 
+def load_vocabulary(path: Optional[str] = None) -> Tuple[List[str], List[str], Set[str]]:
+    """
+    (phrases, boost terms, stopwords). Defaults to the built-in lists; a JSON file
+    at `path` (or $KEYWORD_VOCAB_PATH) may override any of
+    "phrases", "boost_terms" and "stopwords".
+    """
+    phrases: List[str] = list(PHRASES)
+    boost: List[str] = list(BOOST_TERMS)
+    stop: Set[str] = set(STOPWORDS)
+
+    path = path or os.getenv("KEYWORD_VOCAB_PATH")
+    if path:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        phrases = [p.lower() for p in data.get("phrases", phrases)]
+        boost = list(data.get("boost_terms", boost))
+        stop = {w.lower() for w in data.get("stopwords", stop)}
+
+    return phrases, boost, stop
+
+
+class KeywordEngine:
+    """
+    Vocabulary compiled once: phrases and (normalized) boost terms share one
+    Aho-Corasick automaton, so a JD is scanned a single time for all of them.
+    """
+
+    def __init__(self, phrases: List[str], boost_terms: List[str], stopwords: Set[str]):
+        self.phrases = phrases
+        self.boost = [normalize_token(b) for b in boost_terms]
+        self.stopwords = frozenset(stopwords)
+        self.matcher = AhoCorasick(self.phrases + self.boost)
+
+    def extract(self, job_description: str, max_keywords: int = 30) -> List[str]:
+        jd = job_description.lower()
+        found = self.matcher.found(jd)
+        n_phrases = len(self.phrases)
+
+        # Tokenize
+        cleaned: List[str] = []
+        for tok in TOKEN_RE.findall(jd):
+            nt = normalize_token(tok)
+            if nt in self.stopwords or len(nt) < 3:
+                continue
+            cleaned.append(nt)
+        cleaned_set = set(cleaned)
+
+        # Phrases first, then boosted terms present, then remaining tokens;
+        # dict keys keep first-seen order and drop duplicates
+        pool: Dict[str, None] = {}
+        for i, p in enumerate(self.phrases):
+            if i in found:
+                pool.setdefault(normalize_token(p))
+        for j, b in enumerate(self.boost):
+            if b in cleaned_set or (n_phrases + j) in found:
+                pool.setdefault(b)
+        for t in cleaned:
+            pool.setdefault(t)
+
+        return list(islice(pool, max_keywords))
+
+
+_engine = KeywordEngine(*load_vocabulary())
+
+# JD -> keywords memo; KEYWORD_CACHE_ENTRIES (default 256, 0 disables)
+_keyword_memo = memo_from_env("KEYWORD_CACHE_ENTRIES", 256)
+
+
+def keyword_cache_stats() -> dict:
+    return _keyword_memo().stats()
+
+
 def extract_keywords(job_description: str, max_keywords: int = 30) -> List[str]:
     """
     Extract a keyword list from the JD.
     Heuristic: keep tech-ish tokens and important phrases.
+    Memoized per JD, since one request scores many candidates against the same JD.
     """
-    jd = job_description.lower()
-
-    # Capture common compound phrases
-    phrases = []
-    for p in [
-        "embedded linux", "device drivers", "real-time", "real time", "memory mapped",
-        "rest api", "openapi", "unit test", "integration test", "continuous integration",
-        "agile", "sprint", "jwt", "oauth", "git", "github", "docker", "postgresql",
-        "c test", "g test", "gtest", "python", "c++", "linux"
-    ]:
-        if p in jd:
-            phrases.append(p)
-
-    # Tokenize
-    tokens = re.findall(r"[a-zA-Z][a-zA-Z0-9\+\#\/\.\-]{1,}", jd)
-    cleaned: List[str] = []
-    for tok in tokens:
-        nt = normalize_token(tok)
-        if nt in STOPWORDS:
-            continue
-        if len(nt) < 3:
-            continue
-        cleaned.append(nt)
-
-    # Prefer boosted terms and phrases, then remaining tokens
-    pool: List[str] = []
-    pool.extend([normalize_token(p) for p in phrases])
-
-    # Pull boosted tech terms present
-    for bt in BOOST_TERMS:
-        b = normalize_token(bt)
-        if b in cleaned or b in jd:
-            pool.append(b)
-
-    # Add remaining unique tokens
-    for t in cleaned:
-        if t not in pool:
-            pool.append(t)
-
-    # Unique preserving order
-    seen: Set[str] = set()
-    out: List[str] = []
-    for t in pool:
-        if t in seen:
-            continue
-        seen.add(t)
-        out.append(t)
-
-    return out[:max_keywords]
+    memo = _keyword_memo()
+    key = (content_key(job_description), max_keywords)
+    hit = memo.get(key)
+    if hit is None:
+        hit = tuple(_engine.extract(job_description, max_keywords))
+        memo.put(key, hit)
+    return list(hit)
@@ -0,0 +1,432 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from .lru import content_key, memo_from_env
+
+# Bullet and entry macros of the resume template (Jake's-style)
+BULLET_COMMANDS = {"resumeItem"}
+ENTRY_COMMANDS = {"resumeSubheading": 4, "resumeSubSubheading": 2, "resumeProjectHeading": 2}
+SECTION_COMMANDS = {"section", "section*"}
+LIST_START_COMMANDS = {"resumeItemListStart"}
+LIST_END_COMMANDS = {"resumeItemListEnd"}
+LIST_ENVIRONMENTS = {"itemize", "enumerate"}
+
+# Commands whose leading brace arguments are layout/markup, not text
+DROP_ARGS = {
+    "begin": 1, "end": 1, "vspace": 1, "vspace*": 1, "hspace": 1, "hspace*": 1,
+    "setlength": 2, "addtolength": 2, "label": 1, "ref": 1, "cite": 1,
+    "includegraphics": 1, "color": 1, "textcolor": 1, "href": 1, "url": 1,
+    "newcommand": 2, "renewcommand": 2, "usepackage": 1, "documentclass": 1,
+    "input": 1, "pagestyle": 1, "thispagestyle": 1, "fancyhf": 1,
+}
+# Extra column-spec arguments after \begin{<env>}
+ENV_ARGS = {"tabular": 1, "tabular*": 2, "minipage": 1, "multicols": 1}
+# \<char> escapes that stand for the character itself
+ESCAPED_CHARS = set("%&$#_{}")
+
+# What the scanner acts on (a command name is captured whole); everything
+# in between is copied as is
+_SPECIAL_RE = re.compile(r"\\([a-zA-Z]+\*?)?|[{}%~$]")
+_OPTIONS_RE = re.compile(r"(?:\[[^\]]*\])+")
+# Whitespace then the opening brace of an argument, optionally after
+# [options]; group 1 is the whole argument when it holds nothing to scan
+_ARG_RE = re.compile(r"\s*\{(?:([^\\{}%~$]*)\})?")
+_OPTIONS_ARG_RE = re.compile(r"(?:\[[^\]]*\])*\s*\{(?:([^\\{}%~$]*)\})?")
+_COMMAND_RE = re.compile(r"\\[a-zA-Z]+\*?")
+_UNBRACE = str.maketrans("", "", "{}\\")
+
+
+@dataclass(frozen=True)
+class Section:
+    title: str
+    start: int
+    end: int
+
+
+@dataclass(frozen=True)
+class Entry:
+    fields: Tuple[str, ...]
+    start: int
+    end: int
+    section: int
+
+
+@dataclass(frozen=True)
+class Bullet:
+    """
+    One \\resumeItem{...}: `source[start:end]` is the whole command, `body`
+    the LaTeX between its braces. `list_start` is the offset of the list
+    opener it belongs to (-1 outside any list).
+    """
+
+    start: int
+    end: int
+    body: str
+    plain: str
+    section: int
+    entry: int
+    list_start: int
+
+
+@dataclass(frozen=True)
+class ResumeDocument:
+    source: str
+    body_start: int
+    body_end: int
+    sections: Tuple[Section, ...]
+    entries: Tuple[Entry, ...]
+    bullets: Tuple[Bullet, ...]
+    plain: str
+
+    @property
+    def preamble(self) -> str:
+        return self.source[:self.body_start]
+
+
+def _squash(text: str) -> str:
+    return " ".join(text.split())
+
+
+# What a command name means to the scanner
+_BULLET, _SECTION, _ENTRY, _LIST_START, _LIST_END, _DROP = range(6)
+_KINDS = {
+    **{name: _DROP for name in DROP_ARGS},
+    **{name: _LIST_START for name in LIST_START_COMMANDS},
+    **{name: _LIST_END for name in LIST_END_COMMANDS},
+    **{name: _ENTRY for name in ENTRY_COMMANDS},
+    **{name: _SECTION for name in SECTION_COMMANDS},
+    **{name: _BULLET for name in BULLET_COMMANDS},
+}
+
+# A bullet body of plain text, character escapes, non-structural commands
+# without [options] and one level of braces, e.g. "Cut \textbf{p99} by 40\%".
+# Each alternative can match only one way, so a failed match never
+# backtracks badly.
+_SIMPLE_TEXT = (
+    r"[^\\{}%%~$]+(?![^\\{}%%~$])"
+    r"|\\[%%&$#_]"
+    r"|\\(?!(?:%s)(?![a-zA-Z]))[a-zA-Z]+(?![a-zA-Z*\[])"
+) % "|".join(sorted({name.rstrip("*") for name in _KINDS}))
+_SIMPLE_BODY_RE = re.compile(r"\s*\{((?:%s|\{(?:%s)*\})*)\}" % (_SIMPLE_TEXT, _SIMPLE_TEXT))
+
+
+class _Call:
+    """
+    A structural command waiting for its brace arguments.
+    """
+
+    __slots__ = ("name", "kind", "start", "args_end", "need", "taken", "fields", "options")
+
+    def __init__(self, name: str, kind: int, start: int, args_end: int, need: int):
+        self.name = name
+        self.kind = kind
+        self.start = start
+        self.args_end = args_end
+        self.need = need
+        self.taken = 0
+        self.fields: List[str] = []
+        # Whether [options] may precede the next argument
+        self.options = False
+
+
+class _Scanner:
+    """
+    One left-to-right pass over the LaTeX: plain text goes to the output
+    buffer, structural macros are recorded as they are met. Runs of ordinary
+    text are copied as one slice, and open brace groups live on an explicit
+    stack, so every character is visited once and nesting depth is unbounded.
+    """
+
+    def __init__(self, src: str, start: int, end: int):
+        self.src = src
+        self.end = end
+        self.start = start
+        self.sections: List[Tuple[str, int]] = []
+        self.entries: List[Entry] = []
+        self.bullets: List[Bullet] = []
+        # Offsets of the enclosing list openers, innermost last
+        self.lists: List[int] = []
+
+    def run(self) -> str:
+        src, end = self.src, self.end
+        buf: List[str] = []
+        # (call or None, open brace offset, len(buf) at the brace)
+        stack: List[Tuple[Optional[_Call], int, int]] = []
+        search = _SPECIAL_RE.search
+        i = self.start
+        while i < end:
+            m = search(src, i, end)
+            if m is None:
+                buf.append(src[i:end])
+                break
+            k = m.start()
+            if k > i:
+                buf.append(src[i:k])
+            ch = src[k]
+            if ch == "\\":
+                name = m.group(1)
+                if name is not None and name not in _KINDS:
+                    # Formatting and other non-structural commands
+                    buf.append(" ")
+                    i = m.end()
+                    if i < end and src[i] == "[":
+                        i = self._skip_options(i)
+                    continue
+                i = self._command(k, m.end(), name, buf, stack)
+            elif ch == "{":
+                stack.append((None, k, len(buf)))
+                i = k + 1
+            elif ch == "}":
+                if not stack:
+                    # A stray closing brace at top level is skipped, not fatal
+                    i = k + 1
+                    continue
+                call, open_idx, mark = stack.pop()
+                i = k + 1 if call is None else self._take(call, open_idx, k, mark, buf, stack)
+            elif ch == "%":
+                nl = src.find("\n", k, end)
+                i = end if nl == -1 else nl
+            elif ch == "~":
+                buf.append(" ")
+                i = k + 1
+            else:  # "$"
+                i = k + 1
+
+        # Unclosed groups run to the end of the input
+        while stack:
+            call, open_idx, mark = stack.pop()
+            if call is not None:
+                self._take(call, open_idx, end, mark, buf, stack)
+        return _squash("".join(buf))
+
+    def _skip_options(self, i: int) -> int:
+        m = _OPTIONS_RE.match(self.src, i, self.end)
+        return m.end() if m else i
+
+    def _command(
+        self, i: int, j: int, name: Optional[str], buf: List[str], stack: List[Tuple[Optional[_Call], int, int]]
+    ) -> int:
+        """
+        Handle the command at `i` whose name (None for a control symbol) ends at `j`.
+        """
+        src, end = self.src, self.end
+        if name is None:
+            # Control symbol: \% \& ..., \\ (line break), \, \; ...
+            j = i + 1
+            ch = src[j] if j < end else ""
+            buf.append(ch if ch in ESCAPED_CHARS else " ")
+            if ch == "\\":
+                return self._skip_options(j + 1)
+            return j + 1
+
+        buf.append(" ")
+        kind = _KINDS[name]
+        if kind == _BULLET:
+            # Bodies of text and formatting only are converted in one go
+            simple = _SIMPLE_BODY_RE.match(src, j, end)
+            if simple is not None:
+                close = simple.end() - 1
+                body = src[simple.start(1):close]
+                if "\\" in body:
+                    # Commands become a space, escapes the character itself
+                    body = _COMMAND_RE.sub(" ", body)
+                plain = _squash(body.translate(_UNBRACE))
+                self._add_bullet(i, simple.start(1) - 1, close, plain, buf)
+                return close + 1
+            return self._await(_Call(name, kind, i, j, 1), j, buf, stack)
+        if kind == _SECTION:
+            call = _Call(name, kind, i, j, 1)
+            call.options = True
+            return self._await(call, j, buf, stack)
+        if kind == _ENTRY:
+            return self._await(_Call(name, kind, i, j, ENTRY_COMMANDS[name]), j, buf, stack)
+        if kind == _LIST_START:
+            self.lists.append(i)
+        elif kind == _LIST_END:
+            if self.lists:
+                self.lists.pop()
+        else:
+            return self._await(_Call(name, kind, i, j, DROP_ARGS[name]), j, buf, stack)
+        return self._skip_options(j)
+
+    def _await(self, call: _Call, pos: int, buf: List[str], stack: List[Tuple[Optional[_Call], int, int]]) -> int:
+        """
+        Open the next argument of `call` if a brace group follows `pos`,
+        otherwise finish the command.
+        """
+        if call.taken >= call.need:
+            return self._finish(call)
+        m = (_OPTIONS_ARG_RE if call.options else _ARG_RE).match(self.src, pos, self.end)
+        if m is None:
+            return self._finish(call)
+
+        # Arguments without markup are taken whole; anything else is scanned
+        text = m.group(1)
+        if text is not None:
+            return self._took(call, m.start(1) - 1, m.end() - 1, _squash(text), buf, stack)
+        stack.append((call, m.end() - 1, len(buf)))
+        return m.end()
+
+    def _take(
+        self,
+        call: _Call,
+        open_idx: int,
+        close: int,
+        mark: int,
+        buf: List[str],
+        stack: List[Tuple[Optional[_Call], int, int]],
+    ) -> int:
+        """
+        Hand the scanned argument group closed at `close` to `call`.
+        """
+        # Layout arguments are dropped; only \begin/\end look at theirs
+        if call.kind == _DROP and (call.taken or call.name not in ("begin", "end")):
+            plain = ""
+        else:
+            plain = _squash("".join(buf[mark:]))
+        del buf[mark:]
+        return self._took(call, open_idx, close, plain, buf, stack)
+
+    def _took(
+        self,
+        call: _Call,
+        open_idx: int,
+        close: int,
+        plain: str,
+        buf: List[str],
+        stack: List[Tuple[Optional[_Call], int, int]],
+    ) -> int:
+        """
+        Record argument `plain` of `call`, closed at `close`; returns where
+        scanning resumes.
+        """
+        kind = call.kind
+        call.taken += 1
+        call.args_end = close + 1
+
+        if kind == _DROP:
+            if call.taken == 1 and call.name == "end":
+                if plain in LIST_ENVIRONMENTS and self.lists:
+                    self.lists.pop()
+            elif call.taken == 1 and call.name == "begin":
+                if plain in LIST_ENVIRONMENTS:
+                    self.lists.append(call.start)
+                # Column specs and the like, each possibly after [options]
+                call.need += ENV_ARGS.get(plain, 0)
+                call.options = True
+            return self._await(call, close + 1, buf, stack)
+
+        if kind == _ENTRY:
+            call.fields.append(plain)
+            buf.append(plain + " ")
+            return self._await(call, close + 1, buf, stack)
+
+        if kind == _SECTION:
+            self.sections.append((plain, call.start))
+            buf.append(plain)
+        else:
+            self._add_bullet(call.start, open_idx, close, plain, buf)
+        return close + 1
+
+    def _add_bullet(self, start: int, open_idx: int, close: int, plain: str, buf: List[str]) -> None:
+        self.bullets.append(
+            Bullet(
+                start=start,
+                end=close + 1,
+                body=self.src[open_idx + 1:close],
+                plain=plain,
+                section=len(self.sections) - 1,
+                entry=len(self.entries) - 1,
+                list_start=self.lists[-1] if self.lists else -1,
+            )
+        )
+        buf.append(plain)
+
+    def _finish(self, call: _Call) -> int:
+        if call.kind == _BULLET or call.kind == _SECTION:
+            # No argument followed: only the command name is consumed
+            return call.args_end
+        if call.kind == _ENTRY:
+            self.entries.append(Entry(tuple(call.fields), call.start, call.args_end, len(self.sections) - 1))
+            return call.args_end
+        return self._skip_options(call.args_end)
+
+
+def splice(source: str, replacements: List[Tuple[int, int, str]]) -> str:
+    """
+    Replace non-overlapping (start, end, text) spans of `source`. An emptied
+    span that was alone on its line takes the whole line with it.
+    """
+    out = source
+    for start, end, text in sorted(replacements, key=lambda r: r[0], reverse=True):
+        if not text:
+            line_start = out.rfind("\n", 0, start) + 1
+            line_end = out.find("\n", end)
+            line_end = len(out) if line_end == -1 else line_end
+            if not out[line_start:start].strip() and not out[end:line_end].strip():
+                start, end = line_start, min(len(out), line_end + 1)
+        out = out[:start] + text + out[end:]
+    return out
+
+
+def parse_document(latex: str) -> ResumeDocument:
+    """
+    Parse without the cache. Only the document body (between
+    \\begin{document} and \\end{document}, or everything for a fragment)
+    contributes plain text and structure.
+    """
+    begin = latex.find("\\begin{document}")
+    body_start = 0 if begin == -1 else begin + len("\\begin{document}")
+    end = latex.find("\\end{document}", body_start)
+    body_end = len(latex) if end == -1 else end
+
+    scanner = _Scanner(latex, body_start, body_end)
+    plain = scanner.run()
+
+    section_starts = [start for _, start in scanner.sections] + [body_end]
+    sections = tuple(
+        Section(title=title, start=start, end=section_starts[k + 1])
+        for k, (title, start) in enumerate(scanner.sections)
+    )
+
+    return ResumeDocument(
+        source=latex,
+        body_start=0 if begin == -1 else begin,
+        body_end=body_end,
+        sections=sections,
+        entries=tuple(scanner.entries),
+        bullets=tuple(scanner.bullets),
+        plain=plain,
+    )
+
+
+def latex_to_plain(fragment: str) -> str:
+    """
+    Plain text of a LaTeX fragment; formatting like \\textbf{...} keeps its content.
+    """
+    scanner = _Scanner(fragment, 0, len(fragment))
+    return scanner.run()
+
+
+# Parsed documents by content digest; LATEX_DOC_CACHE_ENTRIES (default 128)
+_doc_cache = memo_from_env("LATEX_DOC_CACHE_ENTRIES", 128)
+
+
+def doc_cache_stats() -> dict:
+    return _doc_cache().stats()
+
+
+def parse_resume(latex: str) -> ResumeDocument:
+    """
+    Cached parse: metrics, prompts and local edits of the same LaTeX share one scan.
+    """
+    cache = _doc_cache()
+    key = content_key(latex)
+    doc = cache.get(key)
+    if doc is None:
+        doc = parse_document(latex)
+        cache.put(key, doc)
+    return doc
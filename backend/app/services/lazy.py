@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import threading
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Lazy(Generic[T]):
+    """
+    A process-wide value, built by `factory` on the first call (once, even
+    when threads race for it) and returned as is afterwards. Settings read
+    from the environment inside `factory` therefore apply from first use.
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._value: Optional[T] = None
+        self._lock = threading.Lock()
+
+    def __call__(self) -> T:
+        value = self._value
+        if value is None:
+            with self._lock:
+                value = self._value
+                if value is None:
+                    value = self._value = self._factory()
+        return value
+
+    def reset(self) -> Optional[T]:
+        """
+        Forget the value so the next call builds a fresh one; returns the old one.
+        """
+        with self._lock:
+            value, self._value = self._value, None
+        return value
@@ -1,6 +1,25 @@
+import asyncio
+import heapq
+import importlib.util
+import itertools
+import json
+import logging
 import os
+import random
+import time
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
 import httpx
 
+from .bullet_edits import apply_bullet_edits, bullet_payload, parse_bullet_edits
+from .latex_doc import parse_resume
+from .lazy import Lazy
+from .llm_cache import LLMCache, get_llm_cache, llm_cache_enabled
+from .telemetry import IN_FLIGHT, LLM_CALLS, LLM_RETRIES, LLM_TOKENS, span
+
+logger = logging.getLogger(__name__)
+
 
 SYSTEM_RULES = """
 You are an assistant that edits LaTeX resumes for job alignment.
@@ -57,52 +76,490 @@ Rules:
 Return ONLY valid LaTeX from \\documentclass through \\end{document}.
 """
 
+TIGHTEN_EDIT_INSTRUCTIONS = """
+The resume exceeds one page. Tighten its bullets so it fits on ONE PAGE when compiled.
+
+Rules:
+- Prefer removing the weakest/least relevant bullets first (older/less aligned).
+- Shorten bullets aggressively (remove adjectives, compress clauses).
+- Keep bullets to ~1 line when possible.
+"""
+
+EXPAND_EDIT_INSTRUCTIONS = """
+The resume is underfilled (too much whitespace) but must remain ONE PAGE.
+
+Rules:
+- Do NOT add new experience or claims.
+- You may slightly expand bullets by adding technical mechanisms, constraints, validation steps ONLY if already implied by the resume.
+- If adding length, do it evenly across the most relevant sections.
+"""
+
+BULLET_EDIT_FORMAT = """
+You are given the resume's bullets as a JSON list keyed by "id". Bullet text is LaTeX:
+keep braces balanced and escape % & # with a backslash, as in the input.
+
+Return ONLY a JSON object, no markdown:
+{"edits": [{"id": <id>, "text": "<new bullet LaTeX>"}], "remove": [<id>, ...]}
+List only bullets you change or remove; omitted bullets stay as they are.
+"""
+
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+def create_openai_client() -> httpx.AsyncClient:
+    """
+    Build the pooled client used for every OpenAI call.
+
+    Environment knobs:
+      - OPENAI_BASE_URL (default https://api.openai.com/v1; point at a local stand-in for tests)
+      - OPENAI_HTTP2 (default 1; only used when the `h2` package is installed)
+      - OPENAI_MAX_CONNECTIONS / OPENAI_MAX_KEEPALIVE / OPENAI_KEEPALIVE_EXPIRY_S
+      - OPENAI_CONNECT_TIMEOUT_S / OPENAI_READ_TIMEOUT_S
+    """
+    base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+    http2 = os.getenv("OPENAI_HTTP2", "1") == "1" and importlib.util.find_spec("h2") is not None
+
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", "20")),
+        max_keepalive_connections=int(os.getenv("OPENAI_MAX_KEEPALIVE", "10")),
+        keepalive_expiry=_env_float("OPENAI_KEEPALIVE_EXPIRY_S", 30.0),
+    )
+    timeout = httpx.Timeout(
+        connect=_env_float("OPENAI_CONNECT_TIMEOUT_S", 5.0),
+        read=_env_float("OPENAI_READ_TIMEOUT_S", 60.0),
+        write=10.0,
+        pool=_env_float("OPENAI_CONNECT_TIMEOUT_S", 5.0),
+    )
+    return httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout, http2=http2)
+
+
+async def start_openai_client() -> None:
+    """
+    Open the process-wide client (called from the FastAPI lifespan).
+    """
+    global _client
+    if _client is None:
+        _client = create_openai_client()
+
+
+async def close_openai_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_openai_client() -> httpx.AsyncClient:
+    # Lazily created for scripts that don't run the app lifespan
+    global _client
+    if _client is None:
+        _client = create_openai_client()
+    return _client
+
 
+def openai_model() -> str:
+    return os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
 
-async def _openai_chat(prompt: str) -> str:
+
+class OpenAIError(RuntimeError):
+    """
+    Error reply from the API; `retry_after` is the server's hint in seconds, if any.
+    """
+
+    def __init__(self, message: str, status_code: int, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.status_code == 429 or self.status_code >= 500
+
+
+def _retry_after(r: httpx.Response) -> Optional[float]:
+    # OpenAI sends retry-after-ms alongside the standard seconds header
+    for header, scale in (("retry-after-ms", 1000.0), ("retry-after", 1.0)):
+        value = r.headers.get(header)
+        if value:
+            try:
+                return max(0.0, float(value) / scale)
+            except ValueError:
+                continue
+    return None
+
+
+# Lower runs first: finishing a request in progress beats starting a new one
+MODE_PRIORITY = {
+    "tighten_to_one_page": 0,
+    "expand_to_fill_one_page": 0,
+    "increase_technical_depth": 1,
+    "default": 2,
+}
+
+CHARS_PER_TOKEN = 4
+RATE_WINDOW_S = 60.0
+
+
+def estimate_tokens(prompt: str, json_mode: bool) -> int:
+    """
+    Rough prompt + completion tokens for budgeting before the call: full-document
+    replies are about as long as the resume in the prompt, bullet edits about half.
+    """
+    prompt_tokens = (len(SYSTEM_RULES) + len(prompt)) // CHARS_PER_TOKEN
+    return prompt_tokens + (prompt_tokens // 2 if json_mode else prompt_tokens)
+
+
+class _Grant:
+    __slots__ = ("at", "tokens")
+
+    def __init__(self, at: float, tokens: int):
+        self.at = at
+        self.tokens = tokens
+
+
+class LLMScheduler:
+    """
+    Admission control for API calls.
+
+    Callers wait in a priority queue (FIFO within a priority) and are let
+    through while fewer than `concurrency` calls are running and the last
+    minute's dispatched requests and tokens stay within `rpm` / `tpm`
+    (0 = unlimited). Token counts start as estimates and are corrected with
+    the reported usage when the call finishes. A 429 pauses all dispatch
+    for its Retry-After so the whole process backs off together.
+    """
+
+    def __init__(self, rpm: int, tpm: int, concurrency: int):
+        self.rpm = max(0, int(rpm))
+        self.tpm = max(0, int(tpm))
+        self.concurrency = max(1, int(concurrency))
+        self._queue: List[Tuple[int, int, asyncio.Future, int]] = []
+        self._seq = itertools.count()
+        self._window: Deque[_Grant] = deque()
+        self._running = 0
+        self._paused_until = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.granted = 0
+        self.retries = 0
+
+    async def acquire(self, priority: int, tokens: int) -> _Grant:
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._seq), fut, tokens))
+        self._pump()
+        try:
+            return await fut
+        except asyncio.CancelledError:
+            # Granted just as the caller was cancelled: give the slot back
+            if fut.done() and not fut.cancelled():
+                self.release(fut.result())
+            raise
+
+    def release(self, grant: _Grant, actual_tokens: Optional[int] = None) -> None:
+        self._running -= 1
+        if actual_tokens:
+            grant.tokens = actual_tokens
+        self._pump()
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _wait_s(self, tokens: int, now: float) -> float:
+        """
+        Seconds until a call of `tokens` may start; inf while all slots are busy.
+        """
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self._running >= self.concurrency:
+            return float("inf")
+
+        while self._window and self._window[0].at <= now - RATE_WINDOW_S:
+            self._window.popleft()
+        wait = 0.0
+        if self.rpm and len(self._window) >= self.rpm:
+            wait = self._window[len(self._window) - self.rpm].at + RATE_WINDOW_S - now
+        if self.tpm and self._window:
+            # A call larger than the whole budget runs alone once the window drains
+            excess = sum(g.tokens for g in self._window) + min(tokens, self.tpm) - self.tpm
+            for grant in self._window:
+                if excess <= 0:
+                    break
+                excess -= grant.tokens
+                wait = max(wait, grant.at + RATE_WINDOW_S - now)
+        return wait
+
+    def _pump(self) -> None:
+        now = time.monotonic()
+        while self._queue:
+            priority, seq, fut, tokens = self._queue[0]
+            if fut.done():
+                heapq.heappop(self._queue)
+                continue
+            wait = self._wait_s(tokens, now)
+            if wait > 0:
+                if wait != float("inf"):
+                    self._schedule(wait)
+                return
+            heapq.heappop(self._queue)
+            grant = _Grant(now, tokens)
+            self._window.append(grant)
+            self._running += 1
+            self.granted += 1
+            fut.set_result(grant)
+
+    def _schedule(self, wait: float) -> None:
+        loop = asyncio.get_running_loop()
+        when = loop.time() + wait
+        if self._timer is not None and self._timer.when() <= when:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = loop.call_at(when, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._pump()
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        recent = [g for g in self._window if g.at > now - RATE_WINDOW_S]
+        return {
+            "running": self._running,
+            "queued": sum(1 for *_, fut, _t in self._queue if not fut.done()),
+            "concurrency": self.concurrency,
+            "rpm_limit": self.rpm,
+            "tpm_limit": self.tpm,
+            "requests_last_minute": len(recent),
+            "tokens_last_minute": sum(g.tokens for g in recent),
+            "paused_s": round(max(0.0, self._paused_until - now), 3),
+            "granted": self.granted,
+            "retries": self.retries,
+        }
+
+
+def _scheduler_from_env() -> LLMScheduler:
+    """
+    OPENAI_RPM (default 500) and OPENAI_TPM (default 200000), 0 meaning
+    unlimited, and OPENAI_MAX_CONCURRENCY (default 16).
+    """
+    return LLMScheduler(
+        rpm=int(os.getenv("OPENAI_RPM", "500")),
+        tpm=int(os.getenv("OPENAI_TPM", "200000")),
+        concurrency=int(os.getenv("OPENAI_MAX_CONCURRENCY", "16")),
+    )
+
+
+get_llm_scheduler = Lazy(_scheduler_from_env)
+
+
+def retry_delay(attempt: int, retry_after: Optional[float]) -> float:
+    """
+    Server hint when given, honored in full; else exponential backoff capped
+    at OPENAI_RETRY_MAX_S (default 30) from OPENAI_RETRY_BASE_S (default 0.5).
+    Both get up to 25% jitter so callers throttled together do not come back
+    together.
+    """
+    if retry_after is not None:
+        base = retry_after
+    else:
+        base = min(_env_float("OPENAI_RETRY_MAX_S", 30.0), _env_float("OPENAI_RETRY_BASE_S", 0.5) * 2 ** attempt)
+    return base * random.uniform(1.0, 1.25)
+
+
+def _chat_request(prompt: str, json_mode: bool) -> Tuple[dict, dict]:
     openai_api_key = os.getenv("OPENAI_API_KEY", "")
-    openai_model = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
 
     if not openai_api_key:
         raise RuntimeError("OPENAI_API_KEY missing. Set it in your environment.")
 
-    url = "https://api.openai.com/v1/chat/completions"
     headers = {"Authorization": f"Bearer {openai_api_key}"}
 
     payload = {
-        "model": openai_model,
+        "model": openai_model(),
         "temperature": 0.2,
         "messages": [
             {"role": "system", "content": SYSTEM_RULES.strip()},
             {"role": "user", "content": prompt},
         ],
     }
-
-    async with httpx.AsyncClient(timeout=60) as client:
-        r = await client.post(url, headers=headers, json=payload)
-
-        # If OpenAI returns an error, surface it clearly
+    if json_mode:
+        payload["response_format"] = {"type": "json_object"}
+    return headers, payload
+
+
+def _raise_for_status(r: httpx.Response) -> None:
+    # If OpenAI returns an error, surface it clearly
+    if r.status_code >= 400:
+        try:
+            err = r.json()
+        except Exception:
+            err = {"raw": r.text}
+        raise OpenAIError(f"OpenAI error {r.status_code}: {err}", r.status_code, _retry_after(r))
+
+
+async def _openai_chat(prompt: str, json_mode: bool = False, usage: Optional[dict] = None) -> str:
+    """
+    One chat completion. `json_mode` asks for a JSON object reply;
+    `usage`, when given, receives prompt_tokens / completion_tokens.
+    """
+    headers, payload = _chat_request(prompt, json_mode)
+    r = await get_openai_client().post("/chat/completions", headers=headers, json=payload)
+    _raise_for_status(r)
+
+    data = r.json()
+    if usage is not None:
+        reported = data.get("usage") or {}
+        usage["prompt_tokens"] = reported.get("prompt_tokens")
+        usage["completion_tokens"] = reported.get("completion_tokens")
+
+    # Defensive parsing
+    choices = data.get("choices", [])
+    if not choices:
+        raise RuntimeError(f"OpenAI returned no choices: {data}")
+
+    msg = choices[0].get("message", {})
+    content = msg.get("content")
+    if not content:
+        raise RuntimeError(f"OpenAI response missing message content: {data}")
+
+    return content
+
+
+class LatexStreamAborted(RuntimeError):
+    """
+    Raised when a streamed LaTeX reply is already known to be unusable.
+    """
+
+
+END_DOCUMENT = "\\end{document}"
+# Characters allowed before \documentclass (a markdown fence, a stray sentence)
+PREAMBLE_GRACE_CHARS = 400
+
+
+class LatexStreamGuard:
+    """
+    Incremental checks on a streamed LaTeX document.
+
+    Brace depth is tracked from \\documentclass on (skipping escaped braces
+    and % comments). The reply is abandoned as soon as a closing brace has
+    no opener, \\end{document} arrives with braces still open, or no
+    \\documentclass shows up within PREAMBLE_GRACE_CHARS. `done` is set at
+    the first \\end{document} outside a comment, and `text` then ends right
+    there.
+    """
+
+    def __init__(self) -> None:
+        self.text = ""
+        self.done = False
+        self._start = -1
+        self._pos = 0
+        self._depth = 0
+
+    def feed(self, chunk: str) -> None:
+        self.text += chunk
+
+        if self._start < 0:
+            self._start = self.text.find("\\documentclass")
+            if self._start < 0:
+                if len(self.text) > PREAMBLE_GRACE_CHARS:
+                    raise LatexStreamAborted("No \\documentclass at the start of the reply.")
+                return
+            self._pos = self._start
+
+        # Hold back a tail that may be the start of a split \end{document}
+        end = self._scan(len(self.text) - len(END_DOCUMENT) + 1)
+        if end < 0:
+            return
+        if self._depth != 0:
+            raise LatexStreamAborted(f"{self._depth} unclosed brace(s) at \\end{{document}}.")
+        self.text = self.text[:end + len(END_DOCUMENT)]
+        self.done = True
+
+    def _scan(self, limit: int) -> int:
+        """
+        Advance up to `limit`; returns where an uncommented \\end{document}
+        starts, or -1 if none was reached.
+        """
+        text, i = self.text, self._pos
+        while i < limit:
+            c = text[i]
+            if c == "\\":
+                if text.startswith(END_DOCUMENT, i):
+                    self._pos = i
+                    return i
+                if i + 1 >= len(text):
+                    break  # the escaped character is still in flight
+                i += 2
+                continue
+            if c == "%":
+                nl = text.find("\n", i)
+                if nl < 0:
+                    break
+                i = nl + 1
+                continue
+            if c == "{":
+                self._depth += 1
+            elif c == "}":
+                self._depth -= 1
+                if self._depth < 0:
+                    raise LatexStreamAborted("Closing brace without a matching opener.")
+            i += 1
+        self._pos = i
+        return -1
+
+
+async def _openai_chat_stream(prompt: str, usage: Optional[dict] = None) -> str:
+    """
+    Streamed full-document completion that stops reading at \\end{document}
+    and raises LatexStreamAborted as soon as LatexStreamGuard rejects the
+    reply. Closing the stream early means the API never reports usage, so
+    it is then estimated from the text (usage["estimated"] = True).
+    """
+    headers, payload = _chat_request(prompt, json_mode=False)
+    payload["stream"] = True
+    payload["stream_options"] = {"include_usage": True}
+
+    guard = LatexStreamGuard()
+    reported: dict = {}
+    async with get_openai_client().stream("POST", "/chat/completions", headers=headers, json=payload) as r:
         if r.status_code >= 400:
-            try:
-                err = r.json()
-            except Exception:
-                err = {"raw": r.text}
-            raise RuntimeError(f"OpenAI error {r.status_code}: {err}")
-
-        data = r.json()
-
-        # Defensive parsing
-        choices = data.get("choices", [])
-        if not choices:
-            raise RuntimeError(f"OpenAI returned no choices: {data}")
-
-        msg = choices[0].get("message", {})
-        content = msg.get("content")
-        if not content:
-            raise RuntimeError(f"OpenAI response missing message content: {data}")
+            await r.aread()
+            _raise_for_status(r)
+        async for line in r.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            reported = chunk.get("usage") or reported
+            for choice in chunk.get("choices") or []:
+                delta = (choice.get("delta") or {}).get("content")
+                if delta:
+                    guard.feed(delta)
+            if guard.done:
+                break
+
+    if not guard.text:
+        raise RuntimeError("OpenAI stream ended without message content")
+
+    if usage is not None:
+        if reported:
+            usage["prompt_tokens"] = reported.get("prompt_tokens")
+            usage["completion_tokens"] = reported.get("completion_tokens")
+        else:
+            usage["prompt_tokens"] = (len(SYSTEM_RULES) + len(prompt)) // CHARS_PER_TOKEN
+            usage["completion_tokens"] = len(guard.text) // CHARS_PER_TOKEN
+            usage["estimated"] = True
+    return guard.text
 
-        return content
 
+def streaming_enabled() -> bool:
+    return os.getenv("OPENAI_STREAM", "1") == "1"
 
 
 def build_prompt(resume_latex: str, job_description: str, mode: str) -> str:
@@ -133,9 +590,152 @@ Do NOT include any explanation or markdown.
 """.strip()
 
 
-async def generate_tailored_resume(resume_latex: str, job_description: str, mode: str) -> str:
+def build_bullet_edit_prompt(resume_latex: str, job_description: str, mode: str) -> str:
+    """
+    Structured-edit prompt: only the bullets travel, never the template.
+    """
+    instructions = TIGHTEN_EDIT_INSTRUCTIONS if mode == "tighten_to_one_page" else EXPAND_EDIT_INSTRUCTIONS
+    bullets = json.dumps(bullet_payload(parse_resume(resume_latex)), ensure_ascii=False)
+    return f"""
+{instructions}
+{BULLET_EDIT_FORMAT}
+
+=== JOB DESCRIPTION ===
+{job_description}
+
+=== BULLETS (JSON) ===
+{bullets}
+""".strip()
+
+
+async def _timed_chat(
+    prompt: str, mode: str, json_mode: bool, call: dict, stream: Optional[bool] = None
+) -> str:
+    """
+    _openai_chat through the scheduler, retrying 429/5xx and transport errors
+    up to OPENAI_MAX_RETRIES (default 4) times, with its latency, outcome and
+    token usage recorded per mode. Full-document replies are streamed
+    (OPENAI_STREAM, default 1, unless `stream` says otherwise); a reply
+    abandoned mid-stream is regenerated at most OPENAI_STREAM_ABORT_RETRIES
+    (default 1) times.
+    """
+    scheduler = get_llm_scheduler()
+    priority = MODE_PRIORITY.get(mode, MODE_PRIORITY["default"])
+    estimate = estimate_tokens(prompt, json_mode)
+    max_retries = int(os.getenv("OPENAI_MAX_RETRIES", "4"))
+    max_aborts = int(os.getenv("OPENAI_STREAM_ABORT_RETRIES", "1"))
+    stream = not json_mode and (streaming_enabled() if stream is None else stream)
+
+    attempt = aborts = 0
+    while True:
+        with span("llm_queue"):
+            grant = await scheduler.acquire(priority, estimate)
+        try:
+            with IN_FLIGHT.in_flight(kind="llm"), span(f"llm:{mode}"):
+                if stream:
+                    content = await _openai_chat_stream(prompt, usage=call)
+                else:
+                    content = await _openai_chat(prompt, json_mode=json_mode, usage=call)
+        except LatexStreamAborted as e:
+            scheduler.release(grant)
+            if aborts >= max_aborts:
+                LLM_CALLS.inc(mode=mode, outcome="aborted")
+                raise
+            logger.warning("LLM reply abandoned mid-stream (%s); regenerating", e)
+            LLM_RETRIES.inc(mode=mode, reason="aborted")
+            scheduler.retries += 1
+            aborts += 1
+            continue
+        except (OpenAIError, httpx.TransportError) as e:
+            retryable = isinstance(e, httpx.TransportError) or e.retryable
+            if not retryable or attempt >= max_retries:
+                scheduler.release(grant)
+                LLM_CALLS.inc(mode=mode, outcome="error")
+                raise
+            delay = retry_delay(attempt, getattr(e, "retry_after", None))
+            if getattr(e, "status_code", None) == 429:
+                # Pause before releasing so the freed slot is not handed straight back out
+                scheduler.pause(delay)
+            scheduler.release(grant)
+            reason = str(e.status_code) if isinstance(e, OpenAIError) else "transport"
+            LLM_RETRIES.inc(mode=mode, reason=reason)
+            scheduler.retries += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+            continue
+        except BaseException:
+            scheduler.release(grant)
+            LLM_CALLS.inc(mode=mode, outcome="error")
+            raise
+        break
+
+    scheduler.release(grant, (call.get("prompt_tokens") or 0) + (call.get("completion_tokens") or 0))
+    call["retries"] = attempt + aborts
+    LLM_CALLS.inc(mode=mode, outcome="ok")
+    for kind in ("prompt", "completion"):
+        tokens = call.get(f"{kind}_tokens")
+        if tokens:
+            LLM_TOKENS.inc(tokens, mode=mode, kind=kind)
+    return content
+
+
+async def _cached_chat(
+    prompt: str,
+    mode: str,
+    use_cache: bool,
+    cache_stats: Optional[dict],
+    call_log: Optional[List[dict]] = None,
+    json_mode: bool = False,
+    stream: Optional[bool] = None,
+) -> str:
+    """
+    _openai_chat behind the shared response cache (keyed on model + mode + prompt hash).
+    `cache_stats`, when given, collects per-request "hits"/"misses";
+    `call_log` gets one entry per call with its token usage.
+    """
+    call = {
+        "mode": mode,
+        "format": "bullets" if json_mode else "latex",
+        "cached": False,
+        "prompt_tokens": None,
+        "completion_tokens": None,
+        "retries": 0,
+    }
+    if call_log is not None:
+        call_log.append(call)
+
+    if not (use_cache and llm_cache_enabled()):
+        return await _timed_chat(prompt, mode, json_mode, call, stream)
+
+    cache = get_llm_cache()
+    model = openai_model()
+    key = LLMCache.key_for(model, mode, prompt)
+
+    content = await asyncio.to_thread(cache.get, key)
+    if cache_stats is not None:
+        field = "hits" if content is not None else "misses"
+        cache_stats[field] = cache_stats.get(field, 0) + 1
+    if content is not None:
+        call["cached"] = True
+        LLM_CALLS.inc(mode=mode, outcome="cached")
+        return content
+
+    content = await _timed_chat(prompt, mode, json_mode, call, stream)
+    await asyncio.to_thread(cache.put, key, model, mode, content)
+    return content
+
+
+async def generate_tailored_resume(
+    resume_latex: str,
+    job_description: str,
+    mode: str,
+    use_cache: bool = True,
+    cache_stats: Optional[dict] = None,
+    call_log: Optional[List[dict]] = None,
+    stream: Optional[bool] = None,
+) -> str:
     prompt = build_prompt(resume_latex, job_description, mode)
-    latex = await _openai_chat(prompt)
+    latex = await _cached_chat(prompt, mode, use_cache, cache_stats, call_log, stream=stream)
 
     # Ensure document wrappers exist (robust)
     if "\\begin{document}" not in latex or "\\end{document}" not in latex:
@@ -147,3 +747,39 @@ async def generate_tailored_resume(resume_latex: str, job_description: str, mode
             latex = "\\documentclass{article}\\begin{document}\n" + latex + "\n\\end{document}"
 
     return latex
+
+
+async def generate_bullet_edits(
+    resume_latex: str,
+    job_description: str,
+    mode: str,
+    use_cache: bool = True,
+    cache_stats: Optional[dict] = None,
+    call_log: Optional[List[dict]] = None,
+    stream: Optional[bool] = None,
+) -> str:
+    """
+    Tighten/expand by editing bullets only: the model sees an ID-keyed bullet
+    list and returns just the changed ones, which are spliced back into the
+    original LaTeX. Falls back to a full-document rewrite when the resume has
+    no bullets or the reply is unusable.
+    """
+    doc = parse_resume(resume_latex)
+    if not doc.bullets:
+        return await generate_tailored_resume(
+            resume_latex, job_description, mode, use_cache, cache_stats, call_log, stream
+        )
+
+    prompt = build_bullet_edit_prompt(resume_latex, job_description, mode)
+    content = await _cached_chat(prompt, mode, use_cache, cache_stats, call_log, json_mode=True)
+    try:
+        edits = parse_bullet_edits(content, doc)
+    except ValueError as e:
+        logger.warning("Bullet edits unusable (%s); falling back to full rewrite", e)
+        return await generate_tailored_resume(
+            resume_latex, job_description, mode, use_cache, cache_stats, call_log, stream
+        )
+
+    if edits.rejected:
+        logger.info("Skipped unsafe bullet edits: %s", edits.rejected)
+    return apply_bullet_edits(doc, edits)
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from .lazy import Lazy
+from .sqlite_db import connect, create
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parents[2] / ".cache" / "llm_cache.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS llm_cache_last_access ON llm_cache(last_access);
+"""
+
+
+class LLMCache:
+    """
+    SQLite-backed cache of LLM completions, shared by every uvicorn worker
+    pointing at the same file.
+
+    Entries expire after `ttl_s`; once the table holds more than `max_entries`
+    rows the least recently used ones are dropped.
+    """
+
+    def __init__(self, path: Path, ttl_s: float, max_entries: int):
+        self.path = Path(path)
+        self.ttl_s = float(ttl_s)
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        create(self.path, SCHEMA)
+
+    @staticmethod
+    def key_for(model: str, mode: str, prompt: str) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return hashlib.sha256(f"{model}\0{mode}\0{prompt_hash}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        try:
+            with connect(self.path) as conn:
+                row = conn.execute(
+                    "SELECT content, created_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and now - row[1] > self.ttl_s:
+                    conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    row = None
+                if row is not None:
+                    conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+        except sqlite3.Error:
+            row = None
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0]
+
+    def put(self, key: str, model: str, mode: str, content: str) -> None:
+        now = time.time()
+        try:
+            with connect(self.path) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, model, mode, content, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, model, mode, content, now, now),
+                )
+                conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_s,))
+                (count,) = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+                if count > self.max_entries:
+                    conn.execute(
+                        "DELETE FROM llm_cache WHERE key IN "
+                        "(SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                        (count - self.max_entries,),
+                    )
+        except sqlite3.Error:
+            # Caching is best-effort; a locked or broken DB must not fail the request
+            pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+def llm_cache_enabled() -> bool:
+    return os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+
+
+def _cache_from_env() -> LLMCache:
+    """
+    LLM_CACHE_PATH (default backend/.cache/llm_cache.sqlite3), LLM_CACHE_TTL_S
+    (default 7 days) and LLM_CACHE_MAX_ENTRIES (default 5000).
+    """
+    return LLMCache(
+        path=Path(os.getenv("LLM_CACHE_PATH", str(DEFAULT_CACHE_PATH))),
+        ttl_s=float(os.getenv("LLM_CACHE_TTL_S", str(7 * 24 * 3600))),
+        max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000")),
+    )
+
+
+get_llm_cache = Lazy(_cache_from_env)
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .compile_pool import CompileQueueFull
+from .keywords import extract_keywords
+from .latex_doc import parse_resume, splice
+from .metrics import bullet_keyword_hits, bullet_signal_points
+from .pdf_compile import CompileResult
+from .redundancy import redundancy_report
+
+# Never drop more than this share of the bullets without asking the LLM
+MAX_DROP_FRACTION = 0.35
+# A JD keyword hit is worth this many signal points when ranking bullets
+KEYWORD_WEIGHT = 1.5
+# Value taken off the weaker bullet of a near-duplicate pair
+REDUNDANCY_PENALTY = 1.0
+
+CompileFn = Callable[[str], Awaitable[CompileResult]]
+
+
+@dataclass
+class LocalTightenResult:
+    latex: str
+    compiled: CompileResult
+    removed: List[str] = field(default_factory=list)
+    compiles: int = 0
+
+
+@dataclass(frozen=True)
+class _Bullet:
+    start: int
+    end: int
+    plain: str
+    group: int
+    value: float
+
+
+def rank_bullets(latex: str, job_description: str) -> List[_Bullet]:
+    """
+    Bullets ordered from least to most valuable.
+    Value = signal points + weighted JD keyword hits; the weaker bullet of each
+    redundant pair is penalized; ties drop the longer bullet first.
+    """
+    jd_keys = extract_keywords(job_description)
+    items = parse_resume(latex).bullets
+    plains = [b.plain for b in items]
+    values = [
+        bullet_signal_points(p) + KEYWORD_WEIGHT * bullet_keyword_hits(p, jd_keys) for p in plains
+    ]
+
+    for pair in redundancy_report(plains).pairs:
+        weaker = pair.i if values[pair.i] <= values[pair.j] else pair.j
+        values[weaker] -= REDUNDANCY_PENALTY
+
+    # Bullets share a group when they follow the same list opener
+    bullets = [
+        _Bullet(item.start, item.end, item.plain, item.list_start, value)
+        for item, value in zip(items, values)
+    ]
+    return sorted(bullets, key=lambda b: (b.value, -len(b.plain)))
+
+
+def removal_order(ranked: List[_Bullet]) -> List[_Bullet]:
+    """
+    Drop candidates in ranked order, keeping at least one bullet per list
+    so no itemize environment ends up empty.
+    """
+    remaining: Dict[int, int] = {}
+    for b in ranked:
+        remaining[b.group] = remaining.get(b.group, 0) + 1
+
+    order = []
+    for b in ranked:
+        if remaining[b.group] > 1:
+            order.append(b)
+            remaining[b.group] -= 1
+    return order
+
+
+def remove_bullets(latex: str, bullets: List[_Bullet]) -> str:
+    """
+    Delete the given bullets; a bullet alone on its line takes the line with it.
+    """
+    return splice(latex, [(b.start, b.end, "") for b in bullets])
+
+
+async def tighten_locally(
+    latex: str,
+    job_description: str,
+    compile_fn: CompileFn,
+    page_limit: int = 1,
+) -> Optional[LocalTightenResult]:
+    """
+    Fit `latex` into `page_limit` pages by dropping the lowest-value bullets.
+
+    Finds the smallest k such that removing the k weakest bullets fits, by
+    bisection over compiles (repeat candidates hit the compile cache).
+    Returns None when even the maximum allowed removal does not fit, so the
+    caller can fall back to the LLM.
+    """
+    ranked = rank_bullets(latex, job_description)
+    order = removal_order(ranked)
+    k_max = min(len(order), math.ceil(len(ranked) * MAX_DROP_FRACTION))
+    if k_max == 0:
+        return None
+
+    compiles = 0
+    results: Dict[int, Tuple[str, CompileResult]] = {}
+
+    async def fits(k: int) -> bool:
+        nonlocal compiles
+        candidate = remove_bullets(latex, order[:k])
+        compiles += 1
+        try:
+            compiled = await compile_fn(candidate)
+        except CompileQueueFull:
+            raise
+        except Exception:
+            # A candidate that breaks compilation counts as "does not fit"
+            return False
+        if compiled.page_count <= page_limit:
+            results[k] = (candidate, compiled)
+            return True
+        return False
+
+    if not await fits(k_max):
+        return None
+
+    # Invariant: removing `lo` bullets overflows (lo=0 is the input), removing `hi` fits
+    lo, hi = 0, k_max
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if await fits(mid):
+            hi = mid
+        else:
+            lo = mid
+
+    candidate, compiled = results[hi]
+    return LocalTightenResult(
+        latex=candidate,
+        compiled=compiled,
+        removed=[b.plain for b in order[:hi]],
+        compiles=compiles,
+    )
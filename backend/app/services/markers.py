@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Heuristic vocab for "technical specificity"
+TECH_MARKERS = {
+    "implemented","designed","built","integrated","debugged","validated","tested","deployed",
+    "docker","linux","kernel","driver","fastapi","postgresql","jwt","oauth","alembic","openapi",
+    "api","rest","ci","cd","pipeline","cache","rate","limit","schema","migration","auth",
+    "memory","mapped","interrupt","timer","latency","throughput","gdb","gcc","clang"
+}
+
+VALIDATION_MARKERS = {
+    "test","tested","testing","validated","verification","benchmark","unit","integration","regression",
+    "coverage","assert","gtest","pytest","ci"
+}
+
+SOFT_FLUFF = {
+    "collaborated","cross-functional","stakeholders","communication","team","worked with"
+}
+
+# Constraints / specificity: numbers, units, protocols, or key system words
+CONSTRAINT_MARKERS = [
+    "latency","throughput","ms","hz","kb","mb","gb","%","ax i","can","ethernet","tcp","udp"
+]
+
+ARCHITECTURE_MARKERS = [
+    "schema","migration","driver","kernel","device","api","rate limit","auth","ownership",
+    "memory-mapped","interrupt","pipeline",
+]
+
+# Feature vector columns. Counts are of distinct markers; CONSTRAINT/ARCH are 0/1 flags.
+TECH, VALIDATION, FLUFF, CONSTRAINT, ARCH = range(5)
+N_FEATURES = 5
+
+MAX_POINTS_PER_BULLET = 4
+
+
+class MarkerScorer:
+    """
+    All marker vocabularies merged into one list of distinct markers, each
+    mapped to the feature columns it counts toward; a bullet is checked once
+    per marker and reduced to a small per-bullet feature vector.
+    """
+
+    def __init__(self) -> None:
+        groups: Dict[str, List[int]] = {}
+        for column, vocab in (
+            (TECH, TECH_MARKERS),
+            (VALIDATION, VALIDATION_MARKERS),
+            (FLUFF, SOFT_FLUFF),
+            (CONSTRAINT, CONSTRAINT_MARKERS),
+            (ARCH, ARCHITECTURE_MARKERS),
+        ):
+            for marker in vocab:
+                cols = groups.setdefault(marker, [])
+                if column not in cols:
+                    cols.append(column)
+
+        self._markers: List[Tuple[str, Tuple[int, ...]]] = [(m, tuple(groups[m])) for m in sorted(groups)]
+
+    def features(self, bullet: str) -> List[int]:
+        low = bullet.lower()
+        vec = [0] * N_FEATURES
+        for marker, cols in self._markers:
+            if marker in low:
+                for col in cols:
+                    vec[col] += 1
+        # Any digit is a constraint too (str.isdigit, as the scorer always used)
+        if not vec[CONSTRAINT] and any(ch.isdigit() for ch in low):
+            vec[CONSTRAINT] = 1
+        vec[CONSTRAINT] = min(1, vec[CONSTRAINT])
+        vec[ARCH] = min(1, vec[ARCH])
+        return vec
+
+    def feature_matrix(self, bullets: List[str]) -> np.ndarray:
+        """
+        (len(bullets), N_FEATURES) int32 matrix.
+        """
+        if not bullets:
+            return np.zeros((0, N_FEATURES), dtype=np.int32)
+        return np.array([self.features(b) for b in bullets], dtype=np.int32)
+
+
+_scorer = MarkerScorer()
+
+
+def feature_matrix(bullets: List[str]) -> np.ndarray:
+    return _scorer.feature_matrix(bullets)
+
+
+def signal_points(features: np.ndarray) -> np.ndarray:
+    """
+    Per-bullet signal points (0-4): tech, constraint, validation, architecture.
+    """
+    pts = (
+        (features[:, TECH] > 0).astype(np.int32)
+        + features[:, CONSTRAINT]
+        + (features[:, VALIDATION] > 0)
+        + features[:, ARCH]
+    )
+    return np.minimum(MAX_POINTS_PER_BULLET, pts)
+
+
+def specificity_scores(features: np.ndarray) -> np.ndarray:
+    """
+    Per-bullet tech + validation - fluff marker counts.
+    """
+    return features[:, TECH] + features[:, VALIDATION] - features[:, FLUFF]
+
+
+def signal_density_from_features(features: np.ndarray) -> float:
+    n = features.shape[0]
+    if n == 0:
+        return 0.0
+    total = int(signal_points(features).sum())
+    return round((total / (n * MAX_POINTS_PER_BULLET)) * 10.0, 1)
+
+
+def specificity_level_from_features(features: np.ndarray) -> str:
+    n = features.shape[0]
+    if n == 0:
+        return "Low"
+
+    avg = int(specificity_scores(features).sum()) / n
+
+    if avg >= 2.0:
+        return "High"
+    if avg >= 0.8:
+        return "Med"
+    return "Low"
+
+
+def score_bullets(bullets: List[str]) -> np.ndarray:
+    """
+    Batch API for offline corpus analysis: one row per bullet with
+    [signal points, specificity score], computed from a single feature pass.
+    """
+    features = feature_matrix(bullets)
+    return np.column_stack([signal_points(features), specificity_scores(features)])
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+
+class AhoCorasick:
+    """
+    Multi-pattern substring matcher.
+
+    Built once from a vocabulary; every scan reports all (possibly overlapping)
+    occurrences of every pattern in a single left-to-right pass over the text.
+    Patterns are identified by their index in the list given to the constructor.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = list(patterns)
+
+        # Trie as parallel arrays: goto edges, failure links, outputs per state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+
+        outs: List[List[int]] = [[]]
+        for idx, pat in enumerate(self.patterns):
+            if not pat:
+                continue
+            state = 0
+            for ch in pat:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outs.append([])
+                state = nxt
+            outs[state].append(idx)
+
+        # BFS to fill failure links; each state inherits its failure state's outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                cand = self._goto[f].get(ch, 0)
+                self._fail[nxt] = cand if cand != nxt else 0
+                outs[nxt].extend(outs[self._fail[nxt]])
+
+        self._out = [tuple(o) for o in outs]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        Yield (end_index_exclusive, pattern_index) for every occurrence.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                for idx in out[state]:
+                    yield i + 1, idx
+
+    def found(self, text: str) -> Set[int]:
+        """
+        Indices of the patterns that occur anywhere in `text`.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        hits: Set[int] = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                hits.update(out[state])
+        return hits
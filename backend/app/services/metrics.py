@@ -1,53 +1,101 @@
-from typing import List, Tuple
-from rapidfuzz import fuzz
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+from .latex_doc import doc_cache_stats, parse_resume
+from .keywords import extract_keywords, keyword_cache_stats
+from .lru import LRUCache, content_key, memo_from_env
+from .redundancy import RedundantPair, redundancy_report
+from .telemetry import span
+from .markers import (
+    feature_matrix,
+    signal_density_from_features,
+    signal_points,
+    specificity_level_from_features,
+)
+
+
+FUZZY_THRESHOLD = 90
+
+# Per-bullet memos: plain text -> marker feature row,
+# (plain text, JD keywords) -> keyword hits. Candidates within a request share
+# most bullets, so only the edited ones are rescored.
+# METRICS_BULLET_CACHE_ENTRIES (default 4096 per memo, 0 disables)
+_memos = {
+    "features": memo_from_env("METRICS_BULLET_CACHE_ENTRIES", 4096),
+    "keyword_hits": memo_from_env("METRICS_BULLET_CACHE_ENTRIES", 4096),
+}
 
-from .text_extract import extract_resume_items, strip_latex_commands
-from .keywords import extract_keywords
 
+def _memo(name: str) -> LRUCache:
+    return _memos[name]()
 
-# Heuristic vocab for "technical specificity"
-TECH_MARKERS = {
-    "implemented","designed","built","integrated","debugged","validated","tested","deployed",
-    "docker","linux","kernel","driver","fastapi","postgresql","jwt","oauth","alembic","openapi",
-    "api","rest","ci","cd","pipeline","cache","rate","limit","schema","migration","auth",
-    "memory","mapped","interrupt","timer","latency","throughput","gdb","gcc","clang"
-}
 
-VALIDATION_MARKERS = {
-    "test","tested","testing","validated","verification","benchmark","unit","integration","regression",
-    "coverage","assert","gtest","pytest","ci"
-}
+def metrics_cache_stats() -> dict:
+    return {
+        "jd_keywords": keyword_cache_stats(),
+        "documents": doc_cache_stats(),
+        "bullet_features": _memo("features").stats(),
+        "bullet_keyword_hits": _memo("keyword_hits").stats(),
+    }
 
-SOFT_FLUFF = {
-    "collaborated","cross-functional","stakeholders","communication","team","worked with"
-}
+
+def _bullet_features(bullets_plain: List[str]) -> np.ndarray:
+    """
+    Marker feature matrix; only bullets not seen before are scanned.
+    """
+    memo = _memo("features")
+    keys = [content_key(b) for b in bullets_plain]
+    rows: List[Optional[np.ndarray]] = [memo.get(k) for k in keys]
+
+    fresh = [i for i, row in enumerate(rows) if row is None]
+    if fresh:
+        scanned = feature_matrix([bullets_plain[i] for i in fresh])
+        for i, row in zip(fresh, scanned):
+            row.flags.writeable = False
+            memo.put(keys[i], row)
+            rows[i] = row
+
+    if not rows:
+        return feature_matrix([])
+    return np.vstack(rows)
 
 
 def keyword_alignment(resume_text: str, jd_keywords: List[str]) -> Tuple[float, List[str], List[str]]:
     """
     Compute % of JD keywords present in resume (approx match).
     We use fuzzy matching to account for variations.
+
+    Substring hits never reach the fuzzy step; the leftovers are scored in
+    one multithreaded cdist call. A substring hit is the same as
+    partial_ratio == 100, so results match scoring every keyword with
+    partial_ratio(k, resume) >= 90.
     """
     r = resume_text.lower()
-    matched = []
-    missing = []
 
-    for kw in jd_keywords:
-        k = kw.lower().strip()
-        if not k:
-            continue
+    keys = [kw.lower().strip() for kw in jd_keywords]
+    hit = [bool(k) and k in r for k in keys]
+
+    leftovers = [i for i, k in enumerate(keys) if k and not hit[i]]
+    if leftovers:
+        scores = process.cdist(
+            [keys[i] for i in leftovers],
+            [r],
+            scorer=fuzz.partial_ratio,
+            score_cutoff=FUZZY_THRESHOLD,
+            dtype=np.float64,
+            workers=-1,
+        )[:, 0]
+        for i, sc in zip(leftovers, scores):
+            hit[i] = sc >= FUZZY_THRESHOLD
 
-        # direct contain for phrases
-        if " " in k and k in r:
-            matched.append(kw)
-            continue
-
-        # fuzzy check token-level
-        score = fuzz.partial_ratio(k, r)
-        if score >= 90:
-            matched.append(kw)
-        else:
-            missing.append(kw)
+    matched = []
+    missing = []
+    for kw, k, h in zip(jd_keywords, keys, hit):
+        if k:
+            (matched if h else missing).append(kw)
 
     total = max(1, len(jd_keywords))
     pct = (len(matched) / total) * 100.0
@@ -57,23 +105,9 @@ def keyword_alignment(resume_text: str, jd_keywords: List[str]) -> Tuple[float,
 def redundancy_level(bullets: List[str]) -> str:
     """
     Simple redundancy: average pairwise similarity between bullets.
+    See services/redundancy.py for the pairs behind the label.
     """
-    if len(bullets) < 2:
-        return "Low"
-
-    sims = []
-    for i in range(len(bullets)):
-        for j in range(i + 1, len(bullets)):
-            sims.append(fuzz.token_set_ratio(bullets[i], bullets[j]))
-
-    avg = sum(sims) / max(1, len(sims))
-
-    # Higher similarity means more redundancy
-    if avg >= 70:
-        return "High"
-    if avg >= 55:
-        return "Med"
-    return "Low"
+    return redundancy_report(bullets).level
 
 
 def technical_specificity_level(bullets: List[str]) -> str:
@@ -81,24 +115,28 @@ def technical_specificity_level(bullets: List[str]) -> str:
     Rate bullets based on presence of technical markers and validation markers,
     while penalizing pure fluff.
     """
-    if not bullets:
-        return "Low"
+    return specificity_level_from_features(_bullet_features(bullets))
 
-    scores = []
-    for b in bullets:
-        low = b.lower()
-        tech = sum(1 for w in TECH_MARKERS if w in low)
-        val = sum(1 for w in VALIDATION_MARKERS if w in low)
-        fluff = sum(1 for w in SOFT_FLUFF if w in low)
-        scores.append(tech + val - fluff)
 
-    avg = sum(scores) / len(scores)
+def bullet_signal_points(bullet: str) -> int:
+    """
+    Points (0-4) a single bullet contributes to signal_density_score.
+    """
+    return int(signal_points(_bullet_features([bullet]))[0])
 
-    if avg >= 2.0:
-        return "High"
-    if avg >= 0.8:
-        return "Med"
-    return "Low"
+
+def bullet_keyword_hits(bullet: str, jd_keywords: List[str]) -> int:
+    """
+    Number of JD keywords appearing verbatim in a bullet.
+    """
+    memo = _memo("keyword_hits")
+    key = (content_key(bullet), content_key("\n".join(jd_keywords)))
+    hits = memo.get(key)
+    if hits is None:
+        low = bullet.lower()
+        hits = sum(1 for kw in jd_keywords if kw and kw.lower() in low)
+        memo.put(key, hits)
+    return hits
 
 
 def signal_density_score(bullets: List[str]) -> float:
@@ -110,65 +148,74 @@ def signal_density_score(bullets: List[str]) -> float:
       - architecture/system terms
     This is deliberately heuristic and stable.
     """
-    if not bullets:
-        return 0.0
-
-    total = 0
-    max_per = 4
-
-    for b in bullets:
-        low = b.lower()
-        pts = 0
-
-        # Tool/tech terms
-        if any(t in low for t in TECH_MARKERS):
-            pts += 1
-
-        # Constraints / specificity: numbers, units, protocols, or key system words
-        if any(ch.isdigit() for ch in low) or any(x in low for x in ["latency","throughput","ms","hz","kb","mb","gb","%","ax i","can","ethernet","tcp","udp"]):
-            pts += 1
-
-        # Validation/testing
-        if any(t in low for t in VALIDATION_MARKERS):
-            pts += 1
-
-        # Architecture terms
-        if any(t in low for t in ["schema","migration","driver","kernel","device","api","rate limit","auth","ownership","memory-mapped","interrupt","pipeline"]):
-            pts += 1
+    return signal_density_from_features(_bullet_features(bullets))
 
-        total += min(max_per, pts)
-
-    score_10 = (total / (len(bullets) * max_per)) * 10.0
-    return round(score_10, 1)
 
+@dataclass(frozen=True)
+class ResumeFeatures:
+    """
+    Everything compute_metrics needs from the resume that does not depend on the JD.
+    Extract once and reuse when scoring one resume against many job descriptions.
+    """
 
-def compute_metrics(resume_latex: str, job_description: str):
-    bullets = extract_resume_items(resume_latex)
-    bullets_plain = [strip_latex_commands(b) for b in bullets]
+    resume_plain: str
+    bullets_plain: List[str]
+    word_count: int
+    signal_density: float
+    redundancy: str
+    redundant_pairs: List[RedundantPair]
+    technical_specificity: str
+    avg_bullet_length: float
+
+
+def extract_resume_features(resume_latex: str) -> ResumeFeatures:
+    # One cached scan gives both the bullets and the body text
+    doc = parse_resume(resume_latex)
+    # Empty bullets are not scored; `positions` maps back to doc.bullets
+    positions = [k for k, b in enumerate(doc.bullets) if b.plain]
+    bullets_plain = [doc.bullets[k].plain for k in positions]
+
+    resume_plain = doc.plain
+    redundancy = redundancy_report(bullets_plain)
+    # One marker pass per bullet feeds both signal density and specificity
+    features = _bullet_features(bullets_plain)
+
+    return ResumeFeatures(
+        resume_plain=resume_plain,
+        bullets_plain=bullets_plain,
+        word_count=len(resume_plain.split()),
+        signal_density=signal_density_from_features(features),
+        redundancy=redundancy.level,
+        redundant_pairs=[RedundantPair(positions[p.i], positions[p.j], p.similarity) for p in redundancy.pairs],
+        technical_specificity=specificity_level_from_features(features),
+        avg_bullet_length=round(sum(len(b.split()) for b in bullets_plain) / max(1, len(bullets_plain)), 1),
+    )
+
+
+def compute_metrics_from_features(features: ResumeFeatures, job_description: str):
     jd_keys = extract_keywords(job_description)
-
-    resume_plain = strip_latex_commands(resume_latex)
-    word_count = len(resume_plain.split())
-
-    ka, matched, missing = keyword_alignment(resume_plain, jd_keys)
-    sd = signal_density_score(bullets_plain)
-    red = redundancy_level(bullets_plain)
-    spec = technical_specificity_level(bullets_plain)
-
-    avg_len = round(sum(len(b.split()) for b in bullets_plain) / max(1, len(bullets_plain)), 1)
+    ka, matched, missing = keyword_alignment(features.resume_plain, jd_keys)
 
     return {
-        "signal_density": sd,
-        "technical_specificity": spec,
+        "signal_density": features.signal_density,
+        "technical_specificity": features.technical_specificity,
         "keyword_alignment": ka,
-        "redundancy": red,
+        "redundancy": features.redundancy,
+        "redundant_pairs": [
+            {"i": p.i, "j": p.j, "similarity": p.similarity} for p in features.redundant_pairs
+        ],
         "matched_keywords": matched,
         "missing_keywords": missing,
-        "bullet_count": len(bullets_plain),
-        "avg_bullet_length": avg_len,
-        "word_count": word_count,
+        "bullet_count": len(features.bullets_plain),
+        "avg_bullet_length": features.avg_bullet_length,
+        "word_count": features.word_count,
     }
 
+
+def compute_metrics(resume_latex: str, job_description: str):
+    with span("metrics"):
+        return compute_metrics_from_features(extract_resume_features(resume_latex), job_description)
+
 def length_score(resume_plain: str) -> int:
     # crude proxy; tune threshold on your template
     return len(resume_plain.split())
@@ -1,49 +1,224 @@
 from __future__ import annotations
 
+import asyncio
 import io
+import os
+import re
 import subprocess
 import tempfile
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
+
 from pypdf import PdfReader
 
+from .compile_cache import CompileCache
+from .telemetry import span
 
-def compile_latex_to_pdf_bytes(latex: str) -> bytes:
-    """
-    Compile LaTeX to PDF using tectonic and return PDF bytes.
+REFERENCE_TEMPLATE_PATH = Path(__file__).with_name("reference_resume.tex")
+
+
+# Written to the log at shipout of the page holding \end{document}:
+# y position (sp, from page bottom), paper height, top of text block, text height, page number
+LAYOUT_PROBE = (
+    "\\par\\pdfsavepos\\write-1{RLAYOUT:\\the\\pdflastypos:\\the\\paperheight:"
+    "\\the\\dimexpr 1in+\\voffset+\\topmargin+\\headheight+\\headsep\\relax:"
+    "\\the\\textheight:\\thepage}\n"
+)
+LAYOUT_RE = re.compile(r"RLAYOUT:(-?\d+):([\d.]+)pt:(-?[\d.]+)pt:([\d.]+)pt:(\d+)")
+
+
+@dataclass(frozen=True)
+class TectonicOutput:
+    pdf_bytes: bytes
+    fill_ratio: Optional[float]
 
-    Requirements:
-      - `tectonic` installed and available on PATH.
-    """
-    with tempfile.TemporaryDirectory() as td:
-        workdir = Path(td)
-        tex_path = workdir / "resume.tex"
-        tex_path.write_text(latex, encoding="utf-8")
 
-        # Compile in a temp directory
-        cmd = ["tectonic", str(tex_path), "--outdir", str(workdir)]
+@dataclass(frozen=True)
+class CompileResult:
+    pdf_bytes: bytes
+    page_count: int
+    cached: bool = False
+    # Share of the last page's text block used (0-1); None if the probe did not report
+    fill_ratio: Optional[float] = None
+
+
+def tectonic_bin() -> str:
+    return os.getenv("TECTONIC_BIN", "tectonic")
+
+
+@lru_cache(maxsize=1)
+def tectonic_version() -> str:
+    """
+    Version string of the tectonic binary, used to key the compile cache.
+    """
+    try:
         proc = subprocess.run(
-            cmd,
-            cwd=str(workdir),
+            [tectonic_bin(), "--version"],
             capture_output=True,
             text=True,
+            timeout=10,
+        )
+        return proc.stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def sanitize_latex_for_tectonic(latex: str) -> str:
+    """
+    Tectonic uses XeTeX; strip the pdfTeX-only commands common in resume templates.
+    Mirrors sanitizeLatexForTectonic in app/api/compile/route.ts.
+    """
+    return (
+        latex.replace("\\input{glyphtounicode}", "")
+        .replace("\\pdfgentounicode=1", "")
+        .replace("\\pdfminorversion=7", "")
+        .replace("\\pdfobjcompresslevel=0", "")
+    )
+
+
+def inject_layout_probe(latex: str) -> str:
+    """
+    Insert LAYOUT_PROBE right before the final \\end{document}. The probe is a
+    zero-size whatsit, so the typeset output is unchanged.
+    """
+    end = latex.rfind("\\end{document}")
+    if end == -1:
+        return latex
+    return latex[:end] + LAYOUT_PROBE + latex[end:]
+
+
+def parse_layout_log(log_text: str) -> Optional[float]:
+    """
+    Vertical fill ratio of the last page, from the probe line in the TeX log.
+    """
+    matches = LAYOUT_RE.findall(log_text)
+    if not matches:
+        return None
+
+    ypos_sp, paper_pt, top_offset_pt, text_height_pt, _ = matches[-1]
+    text_height = float(text_height_pt)
+    if text_height <= 0:
+        return None
+
+    # pdflastypos is measured up from the page bottom; the text block starts top_offset down
+    y_pt = int(ypos_sp) / 65536.0
+    used = float(paper_pt) - float(top_offset_pt) - y_pt
+    return round(min(1.0, max(0.0, used / text_height)), 3)
+
+
+def tectonic_cmd(tex_path: Path, outdir: Path) -> list[str]:
+    """
+    Build the tectonic command line.
+
+    Environment knobs:
+      - TECTONIC_BUNDLE: local bundle (zip or directory) to compile against
+      - TECTONIC_ONLY_CACHED=1: never touch the network; fail if a file is missing
+      - TECTONIC_CACHE_DIR is read by tectonic itself; point all workers at one
+        directory so they share downloaded files and generated format files
+    """
+    cmd = [tectonic_bin(), str(tex_path), "--outdir", str(outdir), "--keep-logs"]
+    bundle = os.getenv("TECTONIC_BUNDLE")
+    if bundle:
+        cmd += ["--bundle", bundle]
+    if os.getenv("TECTONIC_ONLY_CACHED", "0") == "1":
+        cmd.append("--only-cached")
+    return cmd
+
+
+def _prepare_workspace(workdir: Path, latex: str) -> Path:
+    """
+    Reset a workspace for a new job: replace the .tex input and drop the previous outputs.
+    """
+    tex_path = workdir / "resume.tex"
+    tex_path.write_text(latex, encoding="utf-8")
+    for name in ("resume.pdf", "resume.log"):
+        try:
+            (workdir / name).unlink()
+        except FileNotFoundError:
+            pass
+    return tex_path
+
+
+def _read_output(workdir: Path) -> TectonicOutput:
+    pdf_path = workdir / "resume.pdf"
+    if not pdf_path.exists():
+        raise RuntimeError("PDF compile failed: resume.pdf not produced.")
+
+    try:
+        log_text = (workdir / "resume.log").read_text(encoding="utf-8", errors="replace")
+    except FileNotFoundError:
+        log_text = ""
+
+    return TectonicOutput(pdf_bytes=pdf_path.read_bytes(), fill_ratio=parse_layout_log(log_text))
+
+
+async def _run_tectonic_in(workdir: Path, latex: str) -> TectonicOutput:
+    tex_path = _prepare_workspace(workdir, latex)
+
+    with span("tectonic"):
+        proc = await asyncio.create_subprocess_exec(
+            *tectonic_cmd(tex_path, workdir),
+            cwd=str(workdir),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
         )
+        try:
+            stdout, stderr = await proc.communicate()
+        except BaseException:
+            # Timeout or cancellation: don't leave tectonic running
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            raise
 
-        if proc.returncode != 0:
-            raise RuntimeError(
-                "PDF compile failed.\n"
-                f"STDOUT:\n{proc.stdout}\n\nSTDERR:\n{proc.stderr}"
-            )
+    if proc.returncode != 0:
+        raise RuntimeError(
+            "PDF compile failed.\n"
+            f"STDOUT:\n{stdout.decode(errors='replace')}\n\n"
+            f"STDERR:\n{stderr.decode(errors='replace')}"
+        )
+
+    return _read_output(workdir)
+
+
+async def run_tectonic_async(latex: str, workdir: Optional[Path] = None) -> TectonicOutput:
+    """
+    Run tectonic on an asyncio subprocess so the event loop keeps serving
+    other requests. Cancelling the awaiting task kills tectonic.
+
+    With `workdir`, compile inside that persistent workspace instead of a fresh
+    temp directory.
+    """
+    if workdir is not None:
+        return await _run_tectonic_in(workdir, latex)
 
-        pdf_path = workdir / "resume.pdf"
-        if not pdf_path.exists():
-            raise RuntimeError("PDF compile failed: resume.pdf not produced.")
+    with tempfile.TemporaryDirectory() as td:
+        return await _run_tectonic_in(Path(td), latex)
 
-        return pdf_path.read_bytes()
+
+def reference_template() -> str:
+    """
+    Small resume in the supported template, used to warm tectonic's caches.
+    """
+    return REFERENCE_TEMPLATE_PATH.read_text(encoding="utf-8")
+
+
+def cache_key_for(latex: str) -> tuple[str, str]:
+    """
+    Return (latex as it will be compiled, compile cache key).
+    The source is sanitized and carries the layout probe. The first call runs
+    `tectonic --version`, so async callers go through a worker thread.
+    """
+    sanitized = inject_layout_probe(sanitize_latex_for_tectonic(latex))
+    return sanitized, CompileCache.key_for(sanitized, tectonic_version())
 
 
 def count_pdf_pages(pdf_bytes: bytes) -> int:
     """
     Count pages in a PDF byte string.
     """
-    reader = PdfReader(io.BytesIO(pdf_bytes))
-    return len(reader.pages)
+    with span("page_count"):
+        reader = PdfReader(io.BytesIO(pdf_bytes))
+        return len(reader.pages)
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import os
+import random
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
+
+HIGH_AVG = 70
+MED_AVG = 55
+
+# A pair at least this similar is reported as redundant
+PAIR_THRESHOLD = 70
+TOP_PAIRS = 5
+
+# MinHash / LSH settings for large bullet sets
+NUM_PERM = 64
+LSH_BANDS = 16
+SAMPLE_PAIRS = 5000
+_MERSENNE = (1 << 31) - 1
+
+
+@dataclass(frozen=True)
+class RedundantPair:
+    i: int
+    j: int
+    similarity: float
+
+
+@dataclass
+class RedundancyReport:
+    level: str
+    average: float
+    pairs: List[RedundantPair] = field(default_factory=list)
+    method: str = "exact"
+
+
+def lsh_min_bullets() -> int:
+    return int(os.getenv("REDUNDANCY_LSH_MIN_BULLETS", "200"))
+
+
+def _label(avg: float) -> str:
+    # Higher similarity means more redundancy
+    if avg >= HIGH_AVG:
+        return "High"
+    if avg >= MED_AVG:
+        return "Med"
+    return "Low"
+
+
+def _top_pairs(pairs: List[RedundantPair], top_k: int) -> List[RedundantPair]:
+    return sorted(pairs, key=lambda p: (-p.similarity, p.i, p.j))[:top_k]
+
+
+def _upper_similarities(bullets: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    token_set_ratio of every pair i < j, as (iu, ju, sims) in triu order.
+    One all-pairs cdist call (on every core) fills the matrix; the upper
+    triangle is then sliced out.
+    """
+    iu, ju = np.triu_indices(len(bullets), k=1)
+    matrix = process.cdist(bullets, bullets, scorer=fuzz.token_set_ratio, dtype=np.float64, workers=-1)
+    return iu, ju, matrix[iu, ju]
+
+
+def _exact(bullets: List[str], top_k: int) -> RedundancyReport:
+    iu, ju, upper = _upper_similarities(bullets)
+
+    # Python sum keeps the average bit-identical to the original pairwise loop
+    avg = sum(upper.tolist()) / max(1, len(upper))
+
+    strong = np.nonzero(upper >= PAIR_THRESHOLD)[0]
+    pairs = [RedundantPair(int(iu[k]), int(ju[k]), float(upper[k])) for k in strong]
+    return RedundancyReport(level=_label(avg), average=avg, pairs=_top_pairs(pairs, top_k), method="exact")
+
+
+def _minhash_signatures(bullets: List[str]) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    a = rng.integers(1, _MERSENNE, size=NUM_PERM, dtype=np.uint64)
+    b = rng.integers(0, _MERSENNE, size=NUM_PERM, dtype=np.uint64)
+
+    sigs = np.full((len(bullets), NUM_PERM), _MERSENNE, dtype=np.uint64)
+    for row, text in enumerate(bullets):
+        tokens = set(default_process(text).split())
+        if not tokens:
+            continue
+        h = np.array([zlib.crc32(t.encode("utf-8")) % _MERSENNE for t in tokens], dtype=np.uint64)
+        sigs[row] = ((np.outer(h, a) + b) % _MERSENNE).min(axis=0)
+    return sigs
+
+
+def _lsh_candidates(sigs: np.ndarray) -> Set[Tuple[int, int]]:
+    rows = NUM_PERM // LSH_BANDS
+    candidates: Set[Tuple[int, int]] = set()
+    for band in range(LSH_BANDS):
+        buckets: Dict[bytes, List[int]] = defaultdict(list)
+        chunk = sigs[:, band * rows:(band + 1) * rows]
+        for idx in range(sigs.shape[0]):
+            buckets[chunk[idx].tobytes()].append(idx)
+        for members in buckets.values():
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    candidates.add((members[x], members[y]))
+    return candidates
+
+
+def _approximate(bullets: List[str], top_k: int) -> RedundancyReport:
+    """
+    For large bullet sets: the average is estimated from a fixed random sample
+    of pairs, and redundant pairs come from MinHash/LSH candidates verified
+    with token_set_ratio. Sub-quadratic in the number of bullets.
+    """
+    n = len(bullets)
+    rng = random.Random(0)
+    sample = set()
+    while len(sample) < min(SAMPLE_PAIRS, n * (n - 1) // 2):
+        i, j = rng.randrange(n), rng.randrange(n)
+        if i != j:
+            sample.add((min(i, j), max(i, j)))
+    sims = [fuzz.token_set_ratio(bullets[i], bullets[j]) for i, j in sorted(sample)]
+    avg = sum(sims) / max(1, len(sims))
+
+    pairs = []
+    for i, j in _lsh_candidates(_minhash_signatures(bullets)):
+        sim = fuzz.token_set_ratio(bullets[i], bullets[j])
+        if sim >= PAIR_THRESHOLD:
+            pairs.append(RedundantPair(i, j, float(sim)))
+
+    return RedundancyReport(level=_label(avg), average=avg, pairs=_top_pairs(pairs, top_k), method="lsh")
+
+
+def redundancy_report(bullets: List[str], top_k: int = TOP_PAIRS) -> RedundancyReport:
+    """
+    Average pairwise token_set_ratio between bullets, its Low/Med/High label,
+    and the most similar bullet pairs (indices into `bullets`).
+    """
+    if len(bullets) < 2:
+        return RedundancyReport(level="Low", average=0.0)
+    if len(bullets) >= lsh_min_bullets():
+        return _approximate(bullets, top_k)
+    return _exact(bullets, top_k)
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+from .telemetry import Counter
+
+T = TypeVar("T")
+
+SINGLE_FLIGHT = Counter(
+    "tailor_single_flight_total", "Requests that started shared work vs joined it", ["outcome"]
+)
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key onto one shared task.
+
+    The first caller (the leader) starts `factory()`; callers arriving while it
+    runs await the same task and receive the same result or exception. A
+    caller that is cancelled only stops waiting: the shared task is cancelled
+    once no waiters remain. The key is forgotten when the task finishes, so
+    later calls start fresh work.
+    """
+
+    def __init__(self) -> None:
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.create_task(factory()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _t: self._forget(key, flight))
+            self.leaders += 1
+            SINGLE_FLIGHT.inc(outcome="leader")
+        else:
+            self.coalesced += 1
+            SINGLE_FLIGHT.inc(outcome="coalesced")
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Every caller went away: stop spending LLM calls and compiles on it
+                self.abandoned += 1
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def waiters(self) -> int:
+        return sum(f.waiters for f in self._flights.values())
+
+    def stats(self) -> dict:
+        calls = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._flights),
+            "waiters": self.waiters(),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "coalesced_rate": round(self.coalesced / calls, 3) if calls else 0.0,
+            "abandoned": self.abandoned,
+        }
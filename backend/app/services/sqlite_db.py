@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+BUSY_TIMEOUT_S = 5.0
+
+
+@contextmanager
+def connect(path: Path, rows: bool = False) -> Iterator[sqlite3.Connection]:
+    """
+    One short-lived connection: the block runs in a transaction that commits
+    (or rolls back on error), and the connection is always closed, so no
+    file handles pile up across threads. `rows` gives sqlite3.Row results.
+    """
+    conn = sqlite3.connect(str(path), timeout=BUSY_TIMEOUT_S)
+    if rows:
+        conn.row_factory = sqlite3.Row
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def create(path: Path, schema: str) -> None:
+    """
+    Create the database file and its tables; WAL lets readers and one writer
+    from several processes work at once.
+    """
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with connect(path) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(schema)
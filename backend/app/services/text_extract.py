@@ -1,26 +1,31 @@
-import re
-from typing import List
+from typing import List, Tuple
 
-
-BULLET_RE = re.compile(r"\\resumeItem\{(.+?)\}", re.DOTALL)
+from .latex_doc import latex_to_plain, parse_resume
 
 
 def extract_resume_items(resume_latex: str) -> List[str]:
     """
     Extract \\resumeItem{...} bullets from your LaTeX format.
+    Brace-aware, so nested formatting like \\textbf{...} stays inside the bullet.
     """
-    items = BULLET_RE.findall(resume_latex)
     # Normalize whitespace
-    cleaned = [re.sub(r"\s+", " ", it).strip() for it in items]
+    cleaned = [" ".join(b.body.split()) for b in parse_resume(resume_latex).bullets]
     return [c for c in cleaned if c]
 
 
+def resume_item_spans(resume_latex: str) -> List[Tuple[int, int, str]]:
+    """
+    Locate \\resumeItem{...} bullets in the document body, brace-aware.
+    Returns (start, end, body) with `resume_latex[start:end]` the whole command.
+    """
+    return [(b.start, b.end, b.body) for b in parse_resume(resume_latex).bullets]
+
+
 def strip_latex_commands(s: str) -> str:
     """
-    Rough LaTeX stripper for metric scoring (good enough for heuristics).
+    Plain text for metric scoring: markup is dropped, the text inside
+    formatting commands is kept. Full documents contribute only their body.
     """
-    # Remove common commands and braces
-    s = re.sub(r"\\[a-zA-Z]+\*?(?:\[[^\]]*\])?(?:\{[^}]*\})?", " ", s)
-    s = re.sub(r"[\{\}\\]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+    if "\\begin{document}" in s:
+        return parse_resume(s).plain
+    return latex_to_plain(s)
@@ -0,0 +1,71 @@
+"""
+Cold vs warm tectonic compile latency.
+
+cold: fresh temp directory per compile (the original compile path)
+warm: persistent workspaces from CompilePool after warm_up()
+
+Every run compiles a unique variant of the reference template so the compile
+cache never answers. Run from backend/:
+
+    python -m bench.compile_latency --runs 10
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.compile_pool import CompilePool
+from app.services.pdf_compile import reference_template, run_tectonic_async, sanitize_latex_for_tectonic
+
+
+def _variant(base: str, i: int) -> str:
+    return base.replace("\\end{document}", f"% run {i} {time.time_ns()}\n\\end{{document}}")
+
+
+def _summary(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "min_s": round(ordered[0], 4),
+        "median_s": round(statistics.median(ordered), 4),
+        "p95_s": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        "max_s": round(ordered[-1], 4),
+    }
+
+
+async def bench(runs: int) -> dict:
+    base = sanitize_latex_for_tectonic(reference_template())
+
+    cold = []
+    for i in range(runs):
+        t0 = time.perf_counter()
+        await run_tectonic_async(_variant(base, i))
+        cold.append(time.perf_counter() - t0)
+
+    with tempfile.TemporaryDirectory() as td:
+        pool = CompilePool(concurrency=1, max_pending=0, timeout_s=60, workspace_root=Path(td))
+        t0 = time.perf_counter()
+        await pool.warm_up()
+        warm_up_s = time.perf_counter() - t0
+
+        warm = []
+        for i in range(runs):
+            t0 = time.perf_counter()
+            await pool.compile(_variant(base, runs + i))
+            warm.append(time.perf_counter() - t0)
+
+    return {"cold": _summary(cold), "warm": _summary(warm), "warm_up_s": round(warm_up_s, 4)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(bench(args.runs)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
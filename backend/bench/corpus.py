@@ -0,0 +1,117 @@
+"""
+Synthetic resume / JD corpus for offline benchmarks.
+
+Documents use the reference template's preamble, so they exercise the same
+macros (sections, \\resumeSubheading entries, \\resumeItem bullets with nested
+formatting and escapes) as real inputs. Everything is seeded and reproducible.
+"""
+import random
+from typing import List
+
+from app.services.keywords import BOOST_TERMS, PHRASES
+from app.services.markers import ARCHITECTURE_MARKERS, CONSTRAINT_MARKERS, TECH_MARKERS, VALIDATION_MARKERS
+from app.services.pdf_compile import reference_template
+
+UNITS = ["ms", "\\%", "x", "k", " MB"]
+FILLER = "the and with for using across to of in on by while reducing improving supporting".split()
+
+BOILERPLATE = [
+    "We are an equal opportunity employer and value diversity.",
+    "Benefits include medical, dental and vision insurance, 401(k) match and unlimited PTO.",
+    "Founded in 2012, we are headquartered in Austin with offices worldwide.",
+    "Reasonable accommodation is available for applicants with disabilities.",
+]
+
+REQUIREMENT_LEADS = ["Experience with", "Proficiency in", "You will build", "Familiarity with", "Strong knowledge of"]
+
+
+def make_vocabulary(size: int, seed: int = 0) -> List[str]:
+    """
+    Domain terms first (so scorers find markers and keywords), then
+    synthetic tokens up to `size`.
+    """
+    domain = sorted(
+        set(TECH_MARKERS) | set(VALIDATION_MARKERS) | set(BOOST_TERMS)
+        | {m for m in CONSTRAINT_MARKERS + ARCHITECTURE_MARKERS if len(m) > 1}
+        | set(PHRASES)
+    )
+    rng = random.Random(seed)
+    vocab = domain[:size]
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    while len(vocab) < size:
+        vocab.append("".join(rng.choice(letters) for _ in range(rng.randint(4, 10))))
+    return vocab
+
+
+def _bullet(rng: random.Random, vocab: List[str], words: int) -> str:
+    parts = []
+    for _ in range(words):
+        roll = rng.random()
+        if roll < 0.55:
+            parts.append(rng.choice(vocab))
+        elif roll < 0.8:
+            parts.append(rng.choice(FILLER))
+        elif roll < 0.9:
+            parts.append(f"{rng.randint(2, 500)}{rng.choice(UNITS)}")
+        else:
+            parts.append(f"\\textbf{{{rng.choice(vocab)}}}")
+    text = " ".join(parts)
+    return text[0].upper() + text[1:]
+
+
+def make_resume(n_bullets: int, vocab: List[str], words_per_bullet: int = 14, seed: int = 0) -> str:
+    """
+    LaTeX resume with `n_bullets` bullets spread over entries of 3-6 bullets.
+    """
+    rng = random.Random(seed)
+    template = reference_template()
+    preamble = template[:template.index("\\begin{document}")]
+
+    body = [
+        "\\begin{document}",
+        "\\begin{center}",
+        "    \\textbf{\\Huge \\scshape Synthetic Candidate} \\\\ \\vspace{1pt}",
+        "    \\small 555-555-5555 $|$ \\href{mailto:x@example.com}{\\underline{x@example.com}}",
+        "\\end{center}",
+        "",
+        "\\section{Experience}",
+        "  \\resumeSubHeadingListStart",
+    ]
+    remaining = n_bullets
+    entry = 0
+    while remaining > 0:
+        count = min(remaining, rng.randint(3, 6))
+        remaining -= count
+        entry += 1
+        body += [
+            "    \\resumeSubheading",
+            f"      {{Engineer {entry}}}{{20{10 + entry % 10} -- 20{11 + entry % 10}}}",
+            f"      {{Company {entry}}}{{Remote}}",
+            "      \\resumeItemListStart",
+        ]
+        body += [
+            f"        \\resumeItem{{{_bullet(rng, vocab, rng.randint(words_per_bullet // 2, words_per_bullet * 3 // 2))}}}"
+            for _ in range(count)
+        ]
+        body.append("      \\resumeItemListEnd")
+    body += ["  \\resumeSubHeadingListEnd", "", "\\end{document}", ""]
+    return preamble + "\n".join(body)
+
+
+def make_job_description(n_words: int, vocab: List[str], seed: int = 0) -> str:
+    """
+    Requirement sentences drawn from `vocab`, interleaved with employer boilerplate.
+    """
+    rng = random.Random(seed)
+    lines = ["About the role", "Requirements:"]
+    written = 0
+    while written < n_words:
+        terms = [rng.choice(vocab) for _ in range(rng.randint(3, 8))]
+        line = f"- {rng.choice(REQUIREMENT_LEADS)} {', '.join(terms[:-1])} and {terms[-1]}."
+        lines.append(line)
+        written += len(line.split())
+        if rng.random() < 0.15:
+            boiler = rng.choice(BOILERPLATE)
+            lines.append(boiler)
+            written += len(boiler.split())
+    return "\n".join(lines)
@@ -0,0 +1,166 @@
+"""
+Micro-benchmarks for the scoring and extraction hot paths.
+
+Times extract_keywords, keyword_alignment, redundancy_level,
+signal_density_score, strip_latex_commands and compute_metrics (end to end)
+over a synthetic corpus scaled by bullet count, document size and vocabulary
+size. Results are written as JSON so runs can be compared. Run from backend/:
+
+    python -m bench.hot_paths --out bench/results/baseline.json
+    python -m bench.hot_paths --compare bench/results/baseline.json
+
+Memo caches are disabled by default so every call pays the full cost;
+--warm keeps them enabled to measure the repeated-scoring path instead.
+Exits non-zero when --compare finds a case slower than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from app.services.keywords import extract_keywords
+from app.services.latex_doc import parse_resume
+from app.services.metrics import compute_metrics, keyword_alignment, redundancy_level, signal_density_score
+from app.services.text_extract import strip_latex_commands
+
+from .corpus import make_job_description, make_resume, make_vocabulary
+
+# Memo caches are sized lazily on first use, so zeroing these in main() still applies
+MEMO_ENV = (
+    "KEYWORD_CACHE_ENTRIES",
+    "METRICS_BULLET_CACHE_ENTRIES",
+    "LATEX_DOC_CACHE_ENTRIES",
+)
+
+BULLET_COUNTS = [10, 40, 160, 640]
+VOCAB_SIZES = [200, 2000, 20000]
+JD_WORDS = [100, 400, 1600]
+WORDS_PER_BULLET = [8, 14, 28]
+
+QUICK = {"bullets": [10, 40], "vocab": [200, 2000], "jd_words": [100, 400], "words_per_bullet": [14]}
+
+
+def _time(fn: Callable[[], object], repeat: int, min_time: float) -> Dict[str, float]:
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time or number >= 1 << 16:
+            break
+        number *= 2
+    runs = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {"best_s": min(runs), "mean_s": sum(runs) / len(runs), "calls": number}
+
+
+def build_cases(quick: bool) -> List[Tuple[str, Callable[[], object]]]:
+    bullets_axis = QUICK["bullets"] if quick else BULLET_COUNTS
+    vocab_axis = QUICK["vocab"] if quick else VOCAB_SIZES
+    jd_axis = QUICK["jd_words"] if quick else JD_WORDS
+    wpb_axis = QUICK["words_per_bullet"] if quick else WORDS_PER_BULLET
+
+    cases: List[Tuple[str, Callable[[], object]]] = []
+
+    for vocab_size in vocab_axis:
+        vocab = make_vocabulary(vocab_size)
+        for jd_words in jd_axis:
+            jd = make_job_description(jd_words, vocab, seed=jd_words)
+            cases.append((f"extract_keywords[vocab={vocab_size},jd_words={jd_words}]", lambda jd=jd: extract_keywords(jd)))
+
+        jd = make_job_description(jd_axis[-1], vocab, seed=1)
+        jd_keys = extract_keywords(jd)
+        for n in bullets_axis:
+            latex = make_resume(n, vocab, seed=n)
+            doc = parse_resume(latex)
+            plain = doc.plain
+            bullets = [b.plain for b in doc.bullets]
+            tag = f"vocab={vocab_size},bullets={n}"
+            cases += [
+                (f"keyword_alignment[{tag}]", lambda p=plain, k=jd_keys: keyword_alignment(p, k)),
+                (f"redundancy_level[{tag}]", lambda b=bullets: redundancy_level(b)),
+                (f"signal_density_score[{tag}]", lambda b=bullets: signal_density_score(b)),
+                (f"strip_latex_commands[{tag}]", lambda s=latex: strip_latex_commands(s)),
+                (f"compute_metrics[{tag}]", lambda s=latex, j=jd: compute_metrics(s, j)),
+            ]
+
+    # Document size at a fixed bullet count: longer bullets, same structure
+    vocab = make_vocabulary(vocab_axis[0])
+    for wpb in wpb_axis:
+        latex = make_resume(bullets_axis[-1], vocab, words_per_bullet=wpb, seed=wpb)
+        cases.append((f"strip_latex_commands[chars={len(latex)}]", lambda s=latex: strip_latex_commands(s)))
+
+    return cases
+
+
+def run(quick: bool, repeat: int, min_time: float, only: str) -> dict:
+    results = {}
+    for name, fn in build_cases(quick):
+        if only and only not in name:
+            continue
+        results[name] = _time(fn, repeat, min_time)
+        print(f"{name:70s} {results[name]['best_s'] * 1e3:10.3f} ms", file=sys.stderr)
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "warm_memos": all(os.getenv(v) != "0" for v in MEMO_ENV),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[dict]:
+    """
+    Cases present in both runs whose best time grew by more than `threshold`x.
+    """
+    regressions = []
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base["best_s"]:
+            continue
+        ratio = cur["best_s"] / base["best_s"]
+        if ratio > threshold:
+            regressions.append({"case": name, "ratio": round(ratio, 2), "baseline_s": base["best_s"], "current_s": cur["best_s"]})
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", type=Path, help="write results JSON here")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio reported as a regression")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05, help="seconds per timing run")
+    parser.add_argument("--quick", action="store_true", help="small axes only")
+    parser.add_argument("--warm", action="store_true", help="keep memo caches enabled")
+    parser.add_argument("--only", default="", help="substring filter on case names")
+    args = parser.parse_args()
+
+    if not args.warm:
+        for var in MEMO_ENV:
+            os.environ[var] = "0"
+
+    report = run(args.quick, args.repeat, args.min_time, args.only)
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.threshold)
+        print(json.dumps({"compared_to": str(args.compare), "regressions": regressions}, indent=2))
+        if regressions:
+            sys.exit(1)
+    elif not args.out:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
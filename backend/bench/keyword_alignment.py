@@ -0,0 +1,108 @@
+"""
+keyword_alignment: batched cdist implementation vs the original
+per-keyword partial_ratio loop.
+
+Checks that matched/missing lists are identical on every case, then reports
+timings. Run from backend/:
+
+    python -m bench.keyword_alignment --cases 50 --repeat 5
+"""
+import argparse
+import json
+import random
+import time
+from typing import List, Tuple
+
+from rapidfuzz import fuzz
+
+from app.services.keywords import extract_keywords
+from app.services.metrics import keyword_alignment
+
+VOCAB = (
+    "implemented designed built integrated debugged validated tested deployed docker linux kernel "
+    "driver fastapi postgresql jwt oauth alembic openapi api rest pipeline cache schema migration "
+    "latency throughput gdb gcc clang python typescript react redis grpc kubernetes pytest gtest "
+    "service endpoint queue worker scheduler firmware sensor protocol uart spi i2c dma embedded "
+    "the and with for using across team customers reliable scalable secure"
+).split()
+
+
+def legacy_keyword_alignment(resume_text: str, jd_keywords: List[str]) -> Tuple[float, List[str], List[str]]:
+    r = resume_text.lower()
+    matched = []
+    missing = []
+
+    for kw in jd_keywords:
+        k = kw.lower().strip()
+        if not k:
+            continue
+        if " " in k and k in r:
+            matched.append(kw)
+            continue
+        score = fuzz.partial_ratio(k, r)
+        if score >= 90:
+            matched.append(kw)
+        else:
+            missing.append(kw)
+
+    total = max(1, len(jd_keywords))
+    pct = (len(matched) / total) * 100.0
+    return round(pct, 1), matched, missing
+
+
+def _mutate(word: str, rng: random.Random) -> str:
+    # Typos and suffixes so the fuzzy path is exercised
+    if len(word) > 4 and rng.random() < 0.3:
+        i = rng.randrange(len(word))
+        word = word[:i] + word[i + 1:]
+    if rng.random() < 0.2:
+        word += rng.choice(["s", "ed", "ing"])
+    return word
+
+
+def make_cases(n: int, seed: int = 0) -> List[Tuple[str, List[str]]]:
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(n):
+        resume = " ".join(_mutate(rng.choice(VOCAB), rng) for _ in range(rng.randint(200, 900)))
+        jd = " ".join(rng.choice(VOCAB + ["benefits", "equal", "opportunity"]) for _ in range(rng.randint(50, 600)))
+        keywords = extract_keywords(jd, max_keywords=rng.choice([30, 60, 120]))
+        cases.append((resume, keywords))
+    return cases
+
+
+def _time(fn, cases, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for resume, keywords in cases:
+            fn(resume, keywords)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = make_cases(args.cases)
+    mismatches = sum(
+        1 for resume, keywords in cases
+        if keyword_alignment(resume, keywords) != legacy_keyword_alignment(resume, keywords)
+    )
+
+    legacy_s = _time(legacy_keyword_alignment, cases, args.repeat)
+    batched_s = _time(keyword_alignment, cases, args.repeat)
+    print(json.dumps({
+        "cases": len(cases),
+        "mismatches": mismatches,
+        "legacy_s": round(legacy_s, 4),
+        "batched_s": round(batched_s, 4),
+        "speedup": round(legacy_s / batched_s, 2) if batched_s else None,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Resume parsing: the brace-aware latex_doc scanner vs the original regex
+extraction it replaced.
+
+The legacy path is what compute_metrics used to run per document:
+BULLET_RE.findall for the bullets, then the regex stripper on every bullet
+and on the whole document. The scanner produces the same outputs (bullets,
+their plain text and the body text) from one parse_document call, with the
+document cache off; `parse_resume_hit` is the cached call every later
+consumer of the same LaTeX makes.
+
+A single parse runs at roughly the speed of the regex extraction. The
+pipeline pass is where the scanner pays off: per candidate the old code ran
+the metrics extraction, the too-short word count and local_tighten's
+brace-matching span walk, each over the same LaTeX, where one parse now
+serves all three. Run from backend/:
+
+    python -m bench.latex_parse --repeat 15
+"""
+import argparse
+import json
+import re
+import time
+from typing import Callable, Dict, List, Tuple
+
+from app.services.latex_doc import latex_to_plain, parse_document, parse_resume
+
+from .corpus import make_resume, make_vocabulary
+
+BULLET_COUNTS = [15, 40, 160, 640]
+WORDS_PER_BULLET = [8, 14, 28]
+
+BULLET_RE = re.compile(r"\\resumeItem\{(.+?)\}", re.DOTALL)
+
+
+def legacy_strip_latex_commands(s: str) -> str:
+    s = re.sub(r"\\[a-zA-Z]+\*?(?:\[[^\]]*\])?(?:\{[^}]*\})?", " ", s)
+    s = re.sub(r"[\{\}\\]", " ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+
+def legacy_extract(resume_latex: str) -> Tuple[List[str], str]:
+    items = [re.sub(r"\s+", " ", it).strip() for it in BULLET_RE.findall(resume_latex)]
+    bullets = [legacy_strip_latex_commands(it) for it in items if it]
+    return bullets, legacy_strip_latex_commands(resume_latex)
+
+
+def _legacy_matching_brace(s: str, open_idx: int) -> int:
+    depth = 0
+    i = open_idx
+    while i < len(s):
+        ch = s[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return -1
+
+
+def legacy_item_spans(resume_latex: str) -> List[Tuple[int, int, str]]:
+    spans: List[Tuple[int, int, str]] = []
+    token = "\\resumeItem{"
+    pos = resume_latex.find("\\begin{document}")
+    pos = 0 if pos == -1 else pos
+    while True:
+        start = resume_latex.find(token, pos)
+        if start == -1:
+            break
+        open_idx = start + len(token) - 1
+        close_idx = _legacy_matching_brace(resume_latex, open_idx)
+        if close_idx == -1:
+            break
+        spans.append((start, close_idx + 1, resume_latex[open_idx + 1:close_idx]))
+        pos = close_idx + 1
+    return spans
+
+
+def legacy_pass(resume_latex: str) -> int:
+    bullets, plain = legacy_extract(resume_latex)
+    words = len(legacy_strip_latex_commands(resume_latex).split())
+    plains = [legacy_strip_latex_commands(body) for _, _, body in legacy_item_spans(resume_latex)]
+    return len(bullets) + len(plain) + words + len(plains)
+
+
+def scanner_pass(resume_latex: str) -> int:
+    doc = parse_document(resume_latex)
+    bullets = [b.plain for b in doc.bullets]
+    words = len(doc.plain.split())
+    plains = [b.plain for b in doc.bullets]
+    return len(bullets) + len(doc.plain) + words + len(plains)
+
+
+def scanner_extract(resume_latex: str) -> Tuple[List[str], str]:
+    doc = parse_document(resume_latex)
+    return [b.plain for b in doc.bullets], doc.plain
+
+
+def _best_ms(fns: Dict[str, Callable[[], object]], repeat: int, number: int) -> Dict[str, float]:
+    # Interleaved so machine noise hits every variant alike
+    best = {name: float("inf") for name in fns}
+    for _ in range(repeat):
+        for name, fn in fns.items():
+            t0 = time.perf_counter()
+            for _ in range(number):
+                fn()
+            best[name] = min(best[name], (time.perf_counter() - t0) / number)
+    return {name: round(t * 1e3, 3) for name, t in best.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--number", type=int, default=10, help="calls per timing run")
+    args = parser.parse_args()
+
+    vocab = make_vocabulary(400)
+    cases = [(n, wpb, make_resume(n, vocab, words_per_bullet=wpb, seed=n)) for n in BULLET_COUNTS for wpb in WORDS_PER_BULLET]
+
+    results = []
+    for n, wpb, latex in cases:
+        body = latex[latex.index("\\begin{document}"):]
+        parse_resume(latex)
+        ms = _best_ms(
+            {
+                "legacy_extract": lambda s=latex: legacy_extract(s),
+                "parse_document": lambda s=latex: scanner_extract(s),
+                "parse_resume_hit": lambda s=latex: parse_resume(s),
+                "legacy_pass": lambda s=latex: legacy_pass(s),
+                "scanner_pass": lambda s=latex: scanner_pass(s),
+                "legacy_strip": lambda s=body: legacy_strip_latex_commands(s),
+                "latex_to_plain": lambda s=body: latex_to_plain(s),
+            },
+            args.repeat,
+            args.number,
+        )
+        results.append({
+            "bullets": n,
+            "words_per_bullet": wpb,
+            "chars": len(latex),
+            "ms": ms,
+            "parse_speedup": round(ms["legacy_extract"] / ms["parse_document"], 2),
+            "pass_speedup": round(ms["legacy_pass"] / ms["scanner_pass"], 2),
+        })
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Local OpenAI-compatible stand-in for load tests.
+
+Serves POST /v1/chat/completions (and /chat/completions) with deterministic
+canned replies per tailoring mode, after a sampled latency:
+
+  - full-document modes return the resume from the prompt (tighten drops
+    every third bullet, so the page count really shrinks);
+  - bullet-edit (JSON) modes return edits in the structured format.
+
+Run from backend/:
+
+    python -m loadtest.fake_openai --port 8100 --latency lognormal:2.0,0.5
+
+Latency specs: fixed:S, uniform:LO,HI, normal:MEAN,STD, lognormal:MEDIAN,SIGMA.
+--per-token-ms adds generation time per completion token.
+
+Failure injection, for exercising the client's scheduler and retries:
+--rpm enforces a per-minute request limit with 429 + Retry-After, and
+--error-rate / --server-error-rate make that fraction of calls return a
+429 or a 503 regardless.
+
+"stream": true requests get SSE chunks: the sampled latency is the time to
+first token and --per-token-ms paces the rest. --broken-rate makes that
+fraction of full-document replies carry an unbalanced closing brace.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import time
+from collections import deque
+from typing import Callable, List
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.services.bullet_edits import BULLET_EDIT_MODES
+from app.services.latex_doc import parse_resume, splice
+from app.services.llm import (
+    DEFAULT_INSTRUCTIONS,
+    DEPTH_INSTRUCTIONS,
+    EXPAND_EDIT_INSTRUCTIONS,
+    EXPAND_INSTRUCTIONS,
+    TIGHTEN_EDIT_INSTRUCTIONS,
+    TIGHTEN_INSTRUCTIONS,
+)
+from app.services.pdf_compile import reference_template
+
+RESUME_MARKER = "=== ORIGINAL RESUME (LATEX) ==="
+BULLETS_MARKER = "=== BULLETS (JSON) ==="
+
+# Prompt prefix -> mode; edit prompts share the mode names of their full-document twins
+MODE_PREFIXES = [
+    (TIGHTEN_EDIT_INSTRUCTIONS.strip(), "tighten_to_one_page"),
+    (EXPAND_EDIT_INSTRUCTIONS.strip(), "expand_to_fill_one_page"),
+    (TIGHTEN_INSTRUCTIONS.strip(), "tighten_to_one_page"),
+    (EXPAND_INSTRUCTIONS.strip(), "expand_to_fill_one_page"),
+    (DEPTH_INSTRUCTIONS.strip(), "increase_technical_depth"),
+    (DEFAULT_INSTRUCTIONS.strip(), "default"),
+]
+
+EXPAND_SUFFIX = ", validated with regression tests"
+STREAM_CHUNK_CHARS = 32
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+
+def detect_mode(prompt: str) -> str:
+    for prefix, mode in MODE_PREFIXES:
+        if prompt.startswith(prefix):
+            return mode
+    return "default"
+
+
+def full_document_reply(prompt: str, mode: str) -> str:
+    idx = prompt.find(RESUME_MARKER)
+    latex = prompt[idx + len(RESUME_MARKER):].strip() if idx != -1 else reference_template()
+    if mode != "tighten_to_one_page":
+        return latex
+    doc = parse_resume(latex)
+    drop = [(b.start, b.end, "") for i, b in enumerate(doc.bullets) if i % 3 == 2]
+    return splice(latex, drop)
+
+
+def bullet_edit_reply(prompt: str, mode: str) -> str:
+    idx = prompt.find(BULLETS_MARKER)
+    bullets: List[dict] = json.loads(prompt[idx + len(BULLETS_MARKER):]) if idx != -1 else []
+    if mode == "tighten_to_one_page":
+        return json.dumps({"edits": [], "remove": [b["id"] for b in bullets if b["id"] % 3 == 2]})
+    edits = [{"id": b["id"], "text": b["text"] + EXPAND_SUFFIX} for b in bullets[:3]]
+    return json.dumps({"edits": edits, "remove": []})
+
+
+async def stream_chunks(call_id: str, content: str, usage, first_token_s: float, per_token_s: float):
+    def sse(choices: list, **extra) -> str:
+        return "data: " + json.dumps({"id": call_id, "object": "chat.completion.chunk", "choices": choices, **extra}) + "\n\n"
+
+    await asyncio.sleep(first_token_s)
+    for i in range(0, len(content), STREAM_CHUNK_CHARS):
+        piece = content[i:i + STREAM_CHUNK_CHARS]
+        yield sse([{"index": 0, "delta": {"content": piece}, "finish_reason": None}])
+        await asyncio.sleep(per_token_s * len(piece) / 4)
+    yield sse([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+    if usage is not None:
+        yield sse([], usage=usage)
+    yield "data: [DONE]\n\n"
+
+
+def _error(status: int, code: str, headers: dict) -> JSONResponse:
+    body = {"error": {"message": f"Fake {code}", "type": code, "code": code}}
+    return JSONResponse(body, status_code=status, headers=headers)
+
+
+def create_app() -> FastAPI:
+    latency = parse_latency(os.getenv("FAKE_OPENAI_LATENCY", "lognormal:1.5,0.4"))
+    per_token_s = float(os.getenv("FAKE_OPENAI_PER_TOKEN_MS", "0")) / 1000.0
+    rng = random.Random(int(os.getenv("FAKE_OPENAI_SEED", "0")))
+    rpm = int(os.getenv("FAKE_OPENAI_RPM", "0"))
+    error_rate = float(os.getenv("FAKE_OPENAI_ERROR_RATE", "0"))
+    server_error_rate = float(os.getenv("FAKE_OPENAI_SERVER_ERROR_RATE", "0"))
+    broken_rate = float(os.getenv("FAKE_OPENAI_BROKEN_RATE", "0"))
+    recent: deque = deque()
+
+    app = FastAPI(title="Fake OpenAI")
+    app.state.calls = {}
+
+    def rejection():
+        now = time.monotonic()
+        while recent and recent[0] <= now - 60.0:
+            recent.popleft()
+        if rpm and len(recent) >= rpm:
+            wait_ms = int((recent[0] + 60.0 - now) * 1000) + 1
+            return _error(429, "rate_limit_exceeded", {"retry-after-ms": str(wait_ms)})
+        recent.append(now)
+        roll = rng.random()
+        if roll < error_rate:
+            return _error(429, "rate_limit_exceeded", {"retry-after": "1"})
+        if roll < error_rate + server_error_rate:
+            return _error(503, "server_error", {})
+        return None
+
+    @app.get("/health")
+    def health():
+        return {"ok": True, "calls": app.state.calls}
+
+    async def chat_completions(request: Request):
+        rejected = rejection()
+        if rejected is not None:
+            key = f"error:{rejected.status_code}"
+            app.state.calls[key] = app.state.calls.get(key, 0) + 1
+            return rejected
+
+        payload = await request.json()
+        prompt = payload["messages"][-1]["content"]
+        mode = detect_mode(prompt)
+        structured = (payload.get("response_format") or {}).get("type") == "json_object"
+
+        if structured and mode in BULLET_EDIT_MODES:
+            content = bullet_edit_reply(prompt, mode)
+        else:
+            content = full_document_reply(prompt, mode)
+            if broken_rate and rng.random() < broken_rate:
+                content = content.replace("\\begin{document}", "\\begin{document}}", 1)
+
+        prompt_tokens = sum(len(m["content"]) for m in payload["messages"]) // 4
+        completion_tokens = len(content) // 4
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+        key = f"{mode}:{'json' if structured else 'latex'}"
+        app.state.calls[key] = app.state.calls.get(key, 0) + 1
+        call_id = f"chatcmpl-fake-{sum(app.state.calls.values())}"
+        first_token_s = latency(rng)
+
+        if payload.get("stream"):
+            include_usage = (payload.get("stream_options") or {}).get("include_usage", False)
+            return StreamingResponse(
+                stream_chunks(call_id, content, usage if include_usage else None, first_token_s, per_token_s),
+                media_type="text/event-stream",
+            )
+
+        await asyncio.sleep(first_token_s + per_token_s * completion_tokens)
+        return {
+            "id": call_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "fake"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage,
+        }
+
+    app.post("/v1/chat/completions")(chat_completions)
+    app.post("/chat/completions")(chat_completions)
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", default=os.getenv("FAKE_OPENAI_LATENCY", "lognormal:1.5,0.4"))
+    parser.add_argument("--per-token-ms", type=float, default=float(os.getenv("FAKE_OPENAI_PER_TOKEN_MS", "0")))
+    parser.add_argument("--seed", type=int, default=int(os.getenv("FAKE_OPENAI_SEED", "0")))
+    parser.add_argument("--rpm", type=int, default=int(os.getenv("FAKE_OPENAI_RPM", "0")))
+    parser.add_argument("--error-rate", type=float, default=float(os.getenv("FAKE_OPENAI_ERROR_RATE", "0")))
+    parser.add_argument(
+        "--server-error-rate", type=float, default=float(os.getenv("FAKE_OPENAI_SERVER_ERROR_RATE", "0"))
+    )
+    parser.add_argument("--broken-rate", type=float, default=float(os.getenv("FAKE_OPENAI_BROKEN_RATE", "0")))
+    args = parser.parse_args()
+
+    os.environ["FAKE_OPENAI_LATENCY"] = args.latency
+    os.environ["FAKE_OPENAI_PER_TOKEN_MS"] = str(args.per_token_ms)
+    os.environ["FAKE_OPENAI_SEED"] = str(args.seed)
+    os.environ["FAKE_OPENAI_RPM"] = str(args.rpm)
+    os.environ["FAKE_OPENAI_ERROR_RATE"] = str(args.error_rate)
+    os.environ["FAKE_OPENAI_SERVER_ERROR_RATE"] = str(args.server_error_rate)
+    os.environ["FAKE_OPENAI_BROKEN_RATE"] = str(args.broken_rate)
+
+    uvicorn.run(create_app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
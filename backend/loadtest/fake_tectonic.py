@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the tectonic binary in load tests: point TECTONIC_BIN at this file.
+
+Accepts the command line built by pdf_compile.tectonic_cmd, sleeps for a
+configurable compile time, and writes resume.pdf with blank pages plus, with
+--keep-logs, a resume.log carrying the RLAYOUT probe line so fill ratios work.
+
+Environment:
+  - FAKE_TECTONIC_SECONDS (default 0.3) and FAKE_TECTONIC_JITTER (default 0.0, +/- seconds)
+  - FAKE_TECTONIC_PAGES: fixed page count; otherwise pages grow with the body length
+  - FAKE_CHARS_PER_PAGE (default 3000): body characters that fill one page
+  - A source containing FAKE_TECTONIC_FAIL fails to compile
+"""
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+from pypdf import PdfWriter
+
+PAPER_PT = 792.0
+TOP_OFFSET_PT = 72.0
+TEXT_HEIGHT_PT = 648.0
+
+
+def main(argv: list) -> int:
+    if "--version" in argv:
+        print("Tectonic 0.0.0-fake")
+        return 0
+
+    tex = next(Path(a) for a in argv if a.endswith(".tex"))
+    outdir = Path(argv[argv.index("--outdir") + 1]) if "--outdir" in argv else tex.parent
+    source = tex.read_text(encoding="utf-8")
+
+    seconds = float(os.getenv("FAKE_TECTONIC_SECONDS", "0.3"))
+    jitter = float(os.getenv("FAKE_TECTONIC_JITTER", "0.0"))
+    time.sleep(max(0.0, seconds + random.uniform(-jitter, jitter)))
+
+    if "FAKE_TECTONIC_FAIL" in source:
+        print("error: fake compile failure", file=sys.stderr)
+        return 1
+
+    body = source[source.find("\\begin{document}"):]
+    chars_per_page = int(os.getenv("FAKE_CHARS_PER_PAGE", "3000"))
+    fixed = os.getenv("FAKE_TECTONIC_PAGES")
+    pages = int(fixed) if fixed else 1 + len(body) // chars_per_page
+
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(612, PAPER_PT)
+    with open(outdir / "resume.pdf", "wb") as f:
+        writer.write(f)
+
+    if "--keep-logs" in argv and "RLAYOUT" in source:
+        fill = (len(body) % chars_per_page) / chars_per_page
+        ypos_sp = int((PAPER_PT - TOP_OFFSET_PT - fill * TEXT_HEIGHT_PT) * 65536)
+        (outdir / "resume.log").write_text(
+            f"RLAYOUT:{ypos_sp}:{PAPER_PT}pt:{TOP_OFFSET_PT}pt:{TEXT_HEIGHT_PT}pt:{pages}\n",
+            encoding="utf-8",
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
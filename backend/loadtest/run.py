@@ -0,0 +1,233 @@
+"""
+Drive concurrent clients against /tailor and report throughput, latency
+percentiles and event-loop lag. Run from backend/:
+
+    python -m loadtest.run --clients 8 --requests 64
+
+By default this starts the fake OpenAI server and the backend (with
+loadtest/fake_tectonic.py as TECTONIC_BIN, fresh cache directories and the LLM
+cache off) as subprocesses; --target points it at an already running backend
+instead. --real-tectonic keeps the configured tectonic binary.
+
+Event-loop lag comes from the backend's tailor_event_loop_lag_seconds
+histogram, diffed across the run.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from bench.corpus import make_job_description, make_resume, make_vocabulary
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+FAKE_TECTONIC = Path(__file__).resolve().parent / "fake_tectonic.py"
+LAG_METRIC = "tailor_event_loop_lag_seconds"
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(q / 100.0 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def build_payloads(count: int, bullets: int, distinct: int, local_tighten: bool) -> List[dict]:
+    # Distinct resumes keep the compile cache from answering every request
+    vocab = make_vocabulary(400)
+    jd = make_job_description(300, vocab, seed=1)
+    resumes = [make_resume(bullets, vocab, seed=i) for i in range(max(1, distinct))]
+    return [
+        {
+            "resume_latex": resumes[i % len(resumes)],
+            "job_description": jd,
+            "local_tighten": local_tighten,
+        }
+        for i in range(count)
+    ]
+
+
+def parse_histogram(text: str, name: str) -> Tuple[Dict[str, float], float, float]:
+    """
+    (cumulative bucket counts by le, sum, count) of an unlabelled histogram.
+    """
+    buckets: Dict[str, float] = {}
+    total = count = 0.0
+    for line in text.splitlines():
+        if line.startswith(name + "_bucket{"):
+            le = line.split('le="', 1)[1].split('"', 1)[0]
+            buckets[le] = float(line.rsplit(" ", 1)[1])
+        elif line.startswith(name + "_sum"):
+            total = float(line.rsplit(" ", 1)[1])
+        elif line.startswith(name + "_count"):
+            count = float(line.rsplit(" ", 1)[1])
+    return buckets, total, count
+
+
+def lag_summary(before: str, after: str) -> dict:
+    b0, s0, c0 = parse_histogram(before, LAG_METRIC)
+    b1, s1, c1 = parse_histogram(after, LAG_METRIC)
+    samples = c1 - c0
+    if samples <= 0:
+        return {"samples": 0}
+
+    def bucket_quantile(q: float) -> str:
+        # Upper bound of the first bucket holding the q-th sample
+        for le, cum in b1.items():
+            if cum - b0.get(le, 0.0) >= q * samples:
+                return le
+        return "+Inf"
+
+    return {
+        "samples": int(samples),
+        "mean_ms": round((s1 - s0) / samples * 1e3, 3),
+        "p50_le_s": bucket_quantile(0.50),
+        "p99_le_s": bucket_quantile(0.99),
+    }
+
+
+async def wait_ready(client: httpx.AsyncClient, url: str, timeout_s: float) -> None:
+    deadline = time.monotonic() + timeout_s
+    while True:
+        try:
+            if (await client.get(url)).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"{url} did not become ready within {timeout_s:.0f}s")
+        await asyncio.sleep(0.2)
+
+
+async def drive(target: str, payloads: List[dict], clients: int, timeout_s: float) -> dict:
+    queue: asyncio.Queue = asyncio.Queue()
+    for p in payloads:
+        queue.put_nowait(p)
+
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        while True:
+            try:
+                payload = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            t0 = time.perf_counter()
+            try:
+                resp = await client.post(f"{target}/tailor", json=payload)
+                status = str(resp.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - t0
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == "200":
+                latencies.append(elapsed)
+
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(timeout=timeout_s, limits=limits) as client:
+        await wait_ready(client, f"{target}/health", 60)
+        metrics_before = (await client.get(f"{target}/metrics")).text
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(clients)))
+        wall = time.perf_counter() - t0
+
+        metrics_after = (await client.get(f"{target}/metrics")).text
+
+    return {
+        "clients": clients,
+        "requests": len(payloads),
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 3) if wall else 0.0,
+        "latency_s": {
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "max": round(max(latencies), 3) if latencies else 0.0,
+        },
+        "status": statuses,
+        "event_loop_lag": lag_summary(metrics_before, metrics_after),
+    }
+
+
+def start_stack(args: argparse.Namespace, workdir: Path) -> Tuple[str, List[subprocess.Popen]]:
+    env = dict(os.environ)
+    env.setdefault("FAKE_OPENAI_LATENCY", args.latency)
+    fake = subprocess.Popen(
+        [sys.executable, "-m", "loadtest.fake_openai", "--port", str(args.openai_port), "--latency", args.latency],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+
+    env.update(
+        {
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{args.openai_port}/v1",
+            "OPENAI_API_KEY": env.get("OPENAI_API_KEY", "fake"),
+            "LLM_CACHE_ENABLED": "0",
+            "COMPILE_CACHE_DIR": str(workdir / "compile"),
+            "COMPILE_WORKSPACE_DIR": str(workdir / "workspaces"),
+        }
+    )
+    if not args.real_tectonic:
+        env["TECTONIC_BIN"] = str(FAKE_TECTONIC)
+    backend = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    return f"http://127.0.0.1:{args.port}", [backend, fake]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", help="base URL of a running backend; skips starting the stack")
+    parser.add_argument("--clients", type=int, default=4, help="concurrent clients")
+    parser.add_argument("--requests", type=int, default=16, help="total /tailor requests")
+    parser.add_argument("--bullets", type=int, default=24, help="bullets per synthetic resume")
+    parser.add_argument("--distinct", type=int, default=0, help="distinct resumes (default: one per request)")
+    parser.add_argument("--no-local-tighten", action="store_true", help="send every tighten pass to the LLM")
+    parser.add_argument("--timeout", type=float, default=600.0, help="per-request timeout in seconds")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--openai-port", type=int, default=8100)
+    parser.add_argument("--latency", default=os.getenv("FAKE_OPENAI_LATENCY", "lognormal:1.5,0.4"))
+    parser.add_argument("--real-tectonic", action="store_true", help="compile with the configured tectonic")
+    parser.add_argument("--out", type=Path, help="write the report JSON here")
+    args = parser.parse_args()
+
+    payloads = build_payloads(
+        args.requests, args.bullets, args.distinct or args.requests, not args.no_local_tighten
+    )
+
+    procs: List[subprocess.Popen] = []
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as tmp:
+        target: Optional[str] = args.target
+        try:
+            if target is None:
+                target, procs = start_stack(args, Path(tmp))
+            report = asyncio.run(drive(target.rstrip("/"), payloads, args.clients, args.timeout))
+        finally:
+            for p in procs:
+                p.terminate()
+            for p in procs:
+                try:
+                    p.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    p.kill()
+
+    print(json.dumps(report, indent=2))
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from app.services.bullet_edits import apply_bullet_edits, parse_bullet_edits, safe_body
+from app.services.latex_doc import parse_document
+
+RESUME = r"""\begin{document}
+\section{Experience}
+\resumeItemListStart
+  \resumeItem{First \textbf{bullet}}
+  \resumeItem{Second bullet}
+\resumeItemListEnd
+\resumeItemListStart
+  \resumeItem{Only bullet}
+\resumeItemListEnd
+\end{document}
+"""
+
+
+@pytest.fixture
+def doc():
+    return parse_document(RESUME)
+
+
+def test_parse_edits_and_removals(doc):
+    reply = json.dumps({
+        "edits": [{"id": 0, "text": "  First   \\textbf{win} "}, {"id": 1, "text": "50% faster"}, {"id": 9, "text": "x"}],
+        "remove": [2, "1", -1],
+    })
+    result = parse_bullet_edits(reply, doc)
+    assert result.edits == {0: r"First \textbf{win}"}
+    # Unescaped % is rejected; the lone bullet of its list must stay
+    assert sorted(result.rejected) == [1, 2]
+    assert result.removed == set()
+
+
+def test_parse_accepts_code_fences(doc):
+    reply = '```json\n{"edits": [{"id": 1, "text": "Second, shorter"}]}\n```'
+    assert parse_bullet_edits(reply, doc).edits == {1: "Second, shorter"}
+
+
+@pytest.mark.parametrize("reply", ["not json", "[1, 2]"])
+def test_parse_rejects_other_shapes(doc, reply):
+    with pytest.raises(ValueError):
+        parse_bullet_edits(reply, doc)
+
+
+def test_emptied_list_keeps_its_first_bullet(doc):
+    result = parse_bullet_edits(json.dumps({"remove": [0, 1]}), doc)
+    assert result.removed == {1}
+    assert result.rejected == [0]
+
+
+@pytest.mark.parametrize(
+    "text, ok",
+    [
+        (r"Cut cost by 40\% \& more", True),
+        (r"\textbf{nested {braces}}", True),
+        ("Cut cost by 40%", False),
+        ("R&D", False),
+        ("issue #12", False),
+        ("open {brace", False),
+        ("close} brace{", False),
+    ],
+)
+def test_safe_body(text, ok):
+    assert safe_body(text) is ok
+
+
+def test_apply_splices_bodies_and_drops_lines(doc):
+    result = parse_bullet_edits(json.dumps({"edits": [{"id": 0, "text": "Rewritten"}], "remove": [1]}), doc)
+    out = apply_bullet_edits(doc, result)
+    assert out == RESUME.replace(r"First \textbf{bullet}", "Rewritten").replace("  \\resumeItem{Second bullet}\n", "")
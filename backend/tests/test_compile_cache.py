@@ -0,0 +1,25 @@
+from app.services.compile_cache import CompileCache
+
+
+def _disk_bytes(path):
+    return sum(p.stat().st_size for p in path.iterdir())
+
+
+def test_sidecars_count_toward_byte_bound(tmp_path):
+    cache = CompileCache(tmp_path, max_bytes=300, memory_entries=0)
+    for i in range(6):
+        cache.put(f"k{i}", b"x" * 80, page_count=1, fill_ratio=0.5)
+
+    assert _disk_bytes(tmp_path) <= 300
+    assert cache.stats()["disk_bytes"] == _disk_bytes(tmp_path)
+    assert cache.get("k5") is not None
+    assert cache.get("k0") is None
+
+
+def test_index_reload_includes_sidecars(tmp_path):
+    cache = CompileCache(tmp_path, max_bytes=10_000, memory_entries=0)
+    cache.put("a", b"x" * 100, page_count=2)
+
+    reloaded = CompileCache(tmp_path, max_bytes=10_000, memory_entries=0)
+    assert reloaded.stats()["disk_bytes"] == _disk_bytes(tmp_path)
+    assert reloaded.get("a").page_count == 2
@@ -0,0 +1,39 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+from app.services.compile_pool import WorkspacePool, sweep_stale_workspaces
+
+
+def _dead_pid() -> int:
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def test_sweep_removes_only_dead_process_workspaces(tmp_path):
+    dead = tmp_path / f"ws-{_dead_pid()}-0"
+    mine = tmp_path / f"ws-{os.getpid()}-0"
+    other = tmp_path / "unrelated"
+    for d in (dead, mine, other):
+        d.mkdir()
+
+    assert sweep_stale_workspaces(tmp_path) == 1
+    assert not dead.exists()
+    assert mine.exists() and other.exists()
+
+
+def test_pool_sweeps_on_start_and_removes_its_own(tmp_path):
+    stale = tmp_path / f"ws-{_dead_pid()}-3"
+    stale.mkdir()
+
+    async def make() -> WorkspacePool:
+        return WorkspacePool(tmp_path, 2)
+
+    pool = asyncio.run(make())
+    assert not stale.exists()
+    assert all(d.is_dir() for d in pool.dirs)
+
+    pool.remove()
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,25 @@
+from app.services.jd_digest import build_digest
+
+JD = "\n".join(
+    [
+        "We build rapid prototypes in Python and Kubernetes.",
+        "You will ship rapid iterations backed by PostgreSQL.",
+        "Experience with Terraform is required.",
+        "We are an equal opportunity employer and offer dental and vision insurance.",
+    ]
+    + [f"Filler sentence number {i} about the weekly team lunch." for i in range(40)]
+)
+
+
+def test_header_lists_whole_words_only():
+    digest = build_digest(JD, budget=120)
+    header = digest.splitlines()[0]
+    assert header.startswith("Key terms: ")
+    terms = header[len("Key terms: "):].split(", ")
+    assert "python" in terms and "rapid" in terms
+    # Substring hits: "api" inside "rapid", "sql" inside "postgresql"
+    assert "api" not in terms and "sql" not in terms
+
+
+def test_short_jd_is_sent_verbatim():
+    assert build_digest("Python role.", budget=120) == "Python role."
@@ -0,0 +1,122 @@
+import asyncio
+import sqlite3
+import time
+
+from app import jobs
+from app.jobs import JobWorkers
+from app.services.compile_pool import CompileQueueFull
+from app.services.job_store import FAILED, QUEUED, RUNNING, JobStore
+
+REQUEST = {"resume_latex": r"\resumeItem{x}", "job_description": "Python"}
+
+
+def make_store(tmp_path, **kw):
+    opts = {"lease_s": 60, "max_attempts": 3, "ttl_s": 3600, **kw}
+    return JobStore(tmp_path / "jobs.sqlite3", **opts)
+
+
+def test_claim_takes_oldest_job_once(tmp_path):
+    store = make_store(tmp_path)
+    first = store.submit(REQUEST)
+    time.sleep(0.01)
+    second = store.submit(REQUEST)
+
+    assert store.claim("w1") == (first, REQUEST)
+    assert store.claim("w2") == (second, REQUEST)
+    assert store.claim("w3") is None
+    job = store.get(first)
+    assert job["status"] == RUNNING and job["attempts"] == 1
+
+
+def test_delayed_requeue_is_not_claimed_early(tmp_path):
+    store = make_store(tmp_path)
+    job_id = store.submit(REQUEST)
+    store.claim("w")
+    store.add_pass(job_id, {"pass_index": 1})
+
+    store.requeue(job_id, "busy", delay_s=0.1, error_status=503)
+    job = store.get(job_id)
+    assert job["status"] == QUEUED and job["passes"] == [] and job["error"] == "busy"
+    assert store.claim("w") is None
+
+    time.sleep(0.15)
+    assert store.claim("w") == (job_id, REQUEST)
+
+
+def test_requeue_fails_the_job_once_out_of_attempts(tmp_path):
+    store = make_store(tmp_path, max_attempts=2)
+    job_id = store.submit(REQUEST)
+    for _ in range(2):
+        assert store.claim("w") is not None
+        store.requeue(job_id, "Compile queue full", error_status=503)
+
+    job = store.get(job_id)
+    assert job["status"] == FAILED
+    assert job["error_status"] == 503 and job["finished_at"] is not None
+    assert store.claim("w") is None
+
+
+def test_recover_stale_requeues_silent_workers(tmp_path):
+    store = make_store(tmp_path, lease_s=0.05)
+    stale = store.submit(REQUEST)
+    store.claim("dead")
+    time.sleep(0.1)
+    fresh = store.submit(REQUEST)
+    store.claim("alive")
+
+    assert store.recover_stale() == 1
+    assert store.get(stale)["status"] == QUEUED
+    assert store.get(fresh)["status"] == RUNNING
+    assert store.claim("w") == (stale, REQUEST)
+
+
+def test_old_store_gains_the_not_before_column(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    conn = sqlite3.connect(str(path))
+    conn.execute(
+        "CREATE TABLE jobs (id TEXT PRIMARY KEY, status TEXT NOT NULL, request TEXT NOT NULL, "
+        "passes TEXT NOT NULL DEFAULT '[]', response TEXT, error TEXT, error_status INTEGER, "
+        "attempts INTEGER NOT NULL DEFAULT 0, worker TEXT, created_at REAL NOT NULL, "
+        "started_at REAL, finished_at REAL, heartbeat_at REAL)"
+    )
+    conn.close()
+
+    store = JobStore(path, lease_s=60, max_attempts=3, ttl_s=3600)
+    job_id = store.submit(REQUEST)
+    assert store.claim("w") == (job_id, REQUEST)
+
+
+def test_overloaded_job_is_requeued_with_a_delay(tmp_path, monkeypatch):
+    async def overloaded(req, emit):
+        raise CompileQueueFull("Compile queue full")
+
+    monkeypatch.setattr(jobs, "run_tailor_pipeline", overloaded)
+    store = make_store(tmp_path)
+    workers = JobWorkers(store, workers=1, max_queued=10, poll_s=0.01, overload_delay_s=60)
+    job_id = store.submit(REQUEST)
+
+    asyncio.run(workers._step("w"))
+    job = store.get(job_id)
+    assert job["status"] == QUEUED and job["error"] == "Compile queue full"
+    assert store.claim("w") is None
+
+
+def test_worker_survives_store_errors(tmp_path):
+    store = make_store(tmp_path)
+    workers = JobWorkers(store, workers=1, max_queued=10, poll_s=0.01, overload_delay_s=1)
+    calls = []
+
+    def broken_claim(worker):
+        calls.append(worker)
+        raise sqlite3.OperationalError("database is locked")
+
+    store.claim = broken_claim
+
+    async def run():
+        task = asyncio.create_task(workers._work("w"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(run())
+    assert len(calls) >= 2
@@ -0,0 +1,98 @@
+"""
+The Aho-Corasick extractor must agree with the per-keyword scan it replaced,
+kept here verbatim as a reference.
+"""
+import re
+
+import pytest
+
+from app.services import keywords
+from app.services.keywords import BOOST_TERMS, STOPWORDS, KeywordEngine, load_vocabulary, normalize_token
+from app.services.matcher import AhoCorasick
+from bench.corpus import make_job_description, make_vocabulary
+
+
+def ref_extract_keywords(job_description, max_keywords=30):
+    jd = job_description.lower()
+
+    phrases = []
+    for p in [
+        "embedded linux", "device drivers", "real-time", "real time", "memory mapped",
+        "rest api", "openapi", "unit test", "integration test", "continuous integration",
+        "agile", "sprint", "jwt", "oauth", "git", "github", "docker", "postgresql",
+        "c test", "g test", "gtest", "python", "c++", "linux"
+    ]:
+        if p in jd:
+            phrases.append(p)
+
+    tokens = re.findall(r"[a-zA-Z][a-zA-Z0-9\+\#\/\.\-]{1,}", jd)
+    cleaned = []
+    for tok in tokens:
+        nt = normalize_token(tok)
+        if nt in STOPWORDS:
+            continue
+        if len(nt) < 3:
+            continue
+        cleaned.append(nt)
+
+    pool = []
+    pool.extend([normalize_token(p) for p in phrases])
+    for bt in BOOST_TERMS:
+        b = normalize_token(bt)
+        if b in cleaned or b in jd:
+            pool.append(b)
+    for t in cleaned:
+        if t not in pool:
+            pool.append(t)
+
+    seen = set()
+    out = []
+    for t in pool:
+        if t in seen:
+            continue
+        seen.add(t)
+        out.append(t)
+    return out[:max_keywords]
+
+
+HAND_WRITTEN = [
+    # Overlapping vocabulary: git/github, c/c++/gtest, rest/rest api/openapi, real-time/real time
+    "GitHub Actions and git; C, C++ and gtest; REST API over OpenAPI; real-time and real time.",
+    "Embedded Linux device drivers, memory mapped I/O, unit test and integration test suites.",
+    "Continuous integration with CI/CD, agile sprints, JWT and OAuth, PostgreSQL and SQL.",
+    "We rapidly prototype the c test and g test harnesses in Python.",
+    "",
+]
+
+
+@pytest.fixture(scope="module")
+def job_descriptions():
+    vocab = make_vocabulary(400)
+    return HAND_WRITTEN + [make_job_description(n, vocab, seed=n) for n in (20, 80, 300, 1200)]
+
+
+def test_extractor_matches_reference(job_descriptions):
+    engine = KeywordEngine(*load_vocabulary())
+    for jd in job_descriptions:
+        for limit in (5, 30, 1000):
+            assert engine.extract(jd, limit) == ref_extract_keywords(jd, limit)
+
+
+def test_memoized_extractor_matches_reference(job_descriptions):
+    keywords._keyword_memo.reset()
+    for jd in job_descriptions:
+        assert keywords.extract_keywords(jd) == ref_extract_keywords(jd)
+        assert keywords.extract_keywords(jd) == ref_extract_keywords(jd)
+
+
+def test_matcher_reports_every_overlapping_occurrence(job_descriptions):
+    patterns = ["git", "github", "c", "c++", "rest api", "api", "real time", "e", "he", "she", "hers", ""]
+    matcher = AhoCorasick(patterns)
+    for text in [jd.lower() for jd in job_descriptions] + ["ushers", "shehers"]:
+        expected = sorted(
+            (m.start() + len(p), idx)
+            for idx, p in enumerate(patterns) if p
+            for m in re.finditer("(?=" + re.escape(p) + ")", text)
+        )
+        assert sorted(matcher.iter_matches(text)) == expected
+        assert matcher.found(text) == {idx for _, idx in expected}
@@ -0,0 +1,86 @@
+from app.services.latex_doc import latex_to_plain, parse_document, splice
+
+RESUME = r"""\documentclass{article}
+\newcommand{\resumeItem}[1]{\item\small{#1}}
+\begin{document}
+\section{Experience}
+\resumeSubheading{Acme}{2020 -- 2023}{Engineer}{Remote}
+\resumeItemListStart
+  \resumeItem{Cut p99 latency by 40\% with \textbf{\emph{nested}} caching}
+  \resumeItem{Built the \href{https://x.io}{ingest} service} % not {this}
+\resumeItemListEnd
+\resumeItem{Outside any list}
+\section{Projects}
+\begin{itemize}
+  \resumeItem{Outer}
+  \begin{itemize}
+    \resumeItem{Inner}
+  \end{itemize}
+  \resumeItem{Outer again}
+\end{itemize}
+\end{document}
+"""
+
+
+def test_structure_and_plain_text():
+    doc = parse_document(RESUME)
+    assert [s.title for s in doc.sections] == ["Experience", "Projects"]
+    assert [e.fields for e in doc.entries] == [("Acme", "2020 -- 2023", "Engineer", "Remote")]
+    assert [b.plain for b in doc.bullets] == [
+        "Cut p99 latency by 40% with nested caching",
+        "Built the ingest service",
+        "Outside any list",
+        "Outer",
+        "Inner",
+        "Outer again",
+    ]
+    assert "not" not in doc.plain and "this" not in doc.plain
+    assert doc.bullets[0].body == r"Cut p99 latency by 40\% with \textbf{\emph{nested}} caching"
+    assert [b.section for b in doc.bullets] == [0, 0, 0, 1, 1, 1]
+
+
+def test_list_start_follows_the_enclosing_list():
+    doc = parse_document(RESUME)
+    first, second, outside, outer, inner, outer_again = doc.bullets
+    assert first.list_start == second.list_start == RESUME.index(r"\resumeItemListStart")
+    assert outside.list_start == -1
+    assert outer.list_start == outer_again.list_start == RESUME.index(r"\begin{itemize}")
+    assert inner.list_start == RESUME.index(r"\begin{itemize}", outer.end)
+
+
+def test_bullet_spans_cover_the_command():
+    doc = parse_document(RESUME)
+    for b in doc.bullets:
+        assert RESUME[b.start:b.end] == "\\resumeItem{" + b.body + "}"
+
+
+def test_unclosed_bullet_runs_to_the_end():
+    doc = parse_document(r"\resumeItem{never closed \textbf{bold}")
+    assert [b.plain for b in doc.bullets] == ["never closed bold"]
+
+
+def test_deep_nesting_is_not_recursive():
+    depth = 5000
+    assert latex_to_plain("{" * depth + "x" + "}" * depth) == "x"
+    doc = parse_document(r"\resumeItem{" + "{" * depth + "deep" + "}" * depth + "}")
+    assert [b.plain for b in doc.bullets] == ["deep"]
+
+
+def test_comments_and_escapes():
+    assert latex_to_plain("kept 10\\% % dropped\nnext~line") == "kept 10% next line"
+    assert latex_to_plain(r"\$5 and $x$ math") == "$5 and x math"
+
+
+def test_splice_replaces_and_drops_emptied_lines():
+    doc = parse_document(RESUME)
+    first, second = doc.bullets[:2]
+    out = splice(RESUME, [(first.start, first.end, r"\resumeItem{Shorter}"), (second.start, second.end, "")])
+    assert r"\resumeItem{Shorter}" in out
+    assert "ingest" not in out
+    # The removed bullet shared its line with a comment, so the line stays
+    assert "% not {this}" in out
+
+    third = doc.bullets[2]
+    out = splice(RESUME, [(third.start, third.end, "")])
+    assert "Outside any list" not in out
+    assert "\\resumeItemListEnd\n\\section{Projects}" in out
@@ -0,0 +1,47 @@
+import pytest
+
+from app.services.llm import LatexStreamAborted, LatexStreamGuard
+
+DOC = "\\documentclass{article}\n\\begin{document}\nHello {world}\n\\end{document}\n"
+
+
+def feed_all(text: str, size: int) -> LatexStreamGuard:
+    guard = LatexStreamGuard()
+    for i in range(0, len(text), size):
+        guard.feed(text[i:i + size])
+        if guard.done:
+            break
+    return guard
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_stops_at_end_document(size):
+    guard = feed_all("```latex\n" + DOC + "Trailing chatter ```", size)
+    assert guard.done
+    assert guard.text.endswith("\\end{document}")
+
+
+@pytest.mark.parametrize("size", [1, 5, 1000])
+def test_commented_end_document_is_ignored(size):
+    body = "\\documentclass{article}\n\\begin{document}\n% drop \\end{document} here {\nStill {going}\n"
+    guard = feed_all(body, size)
+    assert not guard.done
+
+    guard.feed("\\end{document}")
+    assert guard.done
+    assert guard.text == body + "\\end{document}"
+
+
+def test_escaped_percent_does_not_start_a_comment():
+    guard = feed_all("\\documentclass{article}\n40\\% faster \\end{document}", 4)
+    assert guard.done
+
+
+def test_unbalanced_close_brace_aborts():
+    with pytest.raises(LatexStreamAborted):
+        feed_all("\\documentclass{article}\n} and the rest of the line", 2)
+
+
+def test_open_brace_at_end_document_aborts():
+    with pytest.raises(LatexStreamAborted):
+        feed_all("\\documentclass{article}\n{\\end{document}", 2)
@@ -0,0 +1,38 @@
+from app.services.pdf_compile import LAYOUT_PROBE, inject_layout_probe, parse_layout_log
+
+# Letter paper: 792pt high, text block 648pt tall starting 72pt from the top
+PAPER, TOP, TEXT = 792.0, 72.0, 648.0
+
+
+def probe_line(used_pt: float, page: int = 1) -> str:
+    ypos_sp = int((PAPER - TOP - used_pt) * 65536)
+    return f"RLAYOUT:{ypos_sp}:{PAPER}pt:{TOP}pt:{TEXT}pt:{page}"
+
+
+def test_fill_ratio_from_probe():
+    log = "This is TeX\n(./main.tex\n" + probe_line(324.0) + "\n) Output written on main.pdf"
+    assert parse_layout_log(log) == 0.5
+
+
+def test_last_probe_line_wins_and_ratio_is_clamped():
+    log = probe_line(100.0, page=1) + "\n" + probe_line(700.0, page=2)
+    assert parse_layout_log(log) == 1.0
+    assert parse_layout_log(probe_line(-20.0)) == 0.0
+
+
+def test_no_probe_or_malformed_log_gives_none():
+    assert parse_layout_log("") is None
+    assert parse_layout_log("Output written on main.pdf (1 page).") is None
+    assert parse_layout_log("RLAYOUT:abc:792pt:72pt:648pt:1") is None
+    assert parse_layout_log(f"RLAYOUT:100:{PAPER}pt:{TOP}pt:0.0pt:1") is None
+
+
+def test_probe_goes_before_the_last_end_document():
+    latex = "\\documentclass{article}\n\\begin{document}\nHi % \\end{document}\n\\end{document}\n"
+    out = inject_layout_probe(latex)
+    assert out == latex[:latex.rindex("\\end{document}")] + LAYOUT_PROBE + "\\end{document}\n"
+
+
+def test_document_without_end_is_untouched():
+    fragment = "\\documentclass{article}\n\\begin{document}\nHi"
+    assert inject_layout_probe(fragment) == fragment
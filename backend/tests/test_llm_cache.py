@@ -0,0 +1,40 @@
+import sqlite3
+import time
+
+import pytest
+
+from app.services.llm_cache import LLMCache
+from app.services.sqlite_db import connect
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    cache = LLMCache(tmp_path / "c.sqlite3", ttl_s=0.05, max_entries=10)
+    cache.put("k", "model", "default", "content")
+    assert cache.get("k") == "content"
+
+    time.sleep(0.1)
+    assert cache.get("k") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = LLMCache(tmp_path / "c.sqlite3", ttl_s=3600, max_entries=2)
+    cache.put("a", "m", "default", "A")
+    time.sleep(0.01)
+    cache.put("b", "m", "default", "B")
+    time.sleep(0.01)
+    assert cache.get("a") == "A"  # refreshes a, leaving b as the oldest
+    time.sleep(0.01)
+    cache.put("c", "m", "default", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+
+
+def test_connections_are_closed(tmp_path):
+    cache = LLMCache(tmp_path / "c.sqlite3", ttl_s=3600, max_entries=10)
+    with connect(cache.path) as conn:
+        conn.execute("SELECT 1")
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
@@ -0,0 +1,128 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.services import llm
+from app.services.llm import LLMScheduler, OpenAIError, _retry_after, retry_delay
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({"retry-after-ms": "1500", "retry-after": "9"}, 1.5),
+        ({"retry-after": "2"}, 2.0),
+        ({"retry-after-ms": "soon", "retry-after": "3"}, 3.0),
+        ({"retry-after": "-4"}, 0.0),
+        ({"retry-after": "Wed, 21 Oct 2026 07:28:00 GMT"}, None),
+        ({}, None),
+    ],
+)
+def test_retry_after_parsing(headers, expected):
+    assert _retry_after(httpx.Response(429, headers=headers)) == expected
+
+
+def test_server_hint_is_not_capped(monkeypatch):
+    monkeypatch.setenv("OPENAI_RETRY_MAX_S", "1")
+    for _ in range(50):
+        assert 5.0 <= retry_delay(0, 5.0) <= 5.0 * 1.25
+
+
+def test_computed_backoff_is_capped(monkeypatch):
+    monkeypatch.setenv("OPENAI_RETRY_BASE_S", "0.5")
+    monkeypatch.setenv("OPENAI_RETRY_MAX_S", "3")
+    for _ in range(50):
+        assert 0.5 <= retry_delay(0, None) <= 0.5 * 1.25
+        assert 3.0 <= retry_delay(10, None) <= 3.0 * 1.25
+
+
+def test_429_pauses_every_caller(monkeypatch):
+    scheduler = LLMScheduler(rpm=0, tpm=0, concurrency=4)
+    monkeypatch.setattr(llm, "get_llm_scheduler", lambda: scheduler)
+    replies = iter([OpenAIError("rate limited", 429, retry_after=0.2), "ok"])
+
+    async def fake_chat(prompt, json_mode, usage):
+        reply = next(replies)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    monkeypatch.setattr(llm, "_openai_chat", fake_chat)
+
+    async def run():
+        t0 = time.monotonic()
+        chat = asyncio.create_task(llm._timed_chat("prompt", "default", True, {}))
+        await asyncio.sleep(0.05)
+        # Another caller arriving during the pause waits it out too
+        grant = await scheduler.acquire(0, 1)
+        waited = time.monotonic() - t0
+        scheduler.release(grant)
+        return await chat, waited
+
+    content, waited = asyncio.run(run())
+    assert content == "ok"
+    assert waited >= 0.2
+    assert scheduler.retries == 1
+
+
+def _admission_times(scheduler, calls):
+    """
+    Start (priority, tokens) calls in order, releasing each grant at once;
+    returns seconds from the first start to each admission.
+    """
+
+    async def run():
+        t0 = time.monotonic()
+
+        async def one(priority, tokens):
+            grant = await scheduler.acquire(priority, tokens)
+            scheduler.release(grant)
+            return time.monotonic() - t0
+
+        return await asyncio.gather(*(one(p, t) for p, t in calls))
+
+    return asyncio.run(run())
+
+
+def test_rpm_limit_delays_admission(monkeypatch):
+    monkeypatch.setattr(llm, "RATE_WINDOW_S", 0.2)
+    first, second, third = _admission_times(LLMScheduler(rpm=2, tpm=0, concurrency=4), [(2, 1)] * 3)
+    assert first < 0.1 and second < 0.1
+    assert third >= 0.2
+
+
+def test_tpm_limit_delays_admission(monkeypatch):
+    monkeypatch.setattr(llm, "RATE_WINDOW_S", 0.2)
+    scheduler = LLMScheduler(rpm=0, tpm=100, concurrency=4)
+    small, fits, over = _admission_times(scheduler, [(2, 40), (2, 50), (2, 30)])
+    assert small < 0.1 and fits < 0.1
+    assert over >= 0.2
+    assert scheduler.granted == 3
+
+
+def test_higher_priority_is_admitted_first():
+    scheduler = LLMScheduler(rpm=0, tpm=0, concurrency=1)
+    order = []
+
+    async def run():
+        held = await scheduler.acquire(2, 1)
+
+        async def one(name, priority):
+            grant = await scheduler.acquire(priority, 1)
+            order.append(name)
+            scheduler.release(grant)
+
+        tasks = [
+            asyncio.create_task(one("new request", 2)),
+            asyncio.create_task(one("depth pass", 1)),
+            asyncio.create_task(one("tighten", 0)),
+            asyncio.create_task(one("another new request", 2)),
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.stats()["queued"] == 4
+        scheduler.release(held)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert order == ["tighten", "depth pass", "new request", "another new request"]
@@ -0,0 +1,70 @@
+import asyncio
+
+from app.services.latex_doc import parse_document
+from app.services.local_tighten import tighten_locally
+from app.services.pdf_compile import CompileResult
+
+JD = "Backend engineer: Python, PostgreSQL, Kubernetes, latency and throughput."
+WORDS = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india", "juliet"]
+
+
+def resume(lists: list) -> str:
+    parts = ["\\documentclass{article}\n\\begin{document}\n"]
+    for n, bullets in enumerate(lists):
+        parts.append(f"\\section{{Role {n}}}\n\\resumeItemListStart\n")
+        parts.extend(f"  \\resumeItem{{{b}}}\n" for b in bullets)
+        parts.append("\\resumeItemListEnd\n")
+    parts.append("\\end{document}\n")
+    return "".join(parts)
+
+
+def distinct_bullets(tag: int, n: int) -> list:
+    return [f"Shipped {WORDS[i % 10]} {tag}{i} service in Python cutting latency {i + 2}0\\%" for i in range(n)]
+
+
+class FakeCompiler:
+    """
+    One page while the document has at most `fits` bullets, two otherwise.
+    """
+
+    def __init__(self, fits: int):
+        self.fits = fits
+        self.calls = 0
+
+    async def __call__(self, latex: str) -> CompileResult:
+        self.calls += 1
+        pages = 1 if len(parse_document(latex).bullets) <= self.fits else 2
+        return CompileResult(pdf_bytes=b"", page_count=pages)
+
+
+def test_bisection_removes_the_fewest_bullets():
+    latex = resume([distinct_bullets(k, 10) for k in range(3)])
+    compiler = FakeCompiler(fits=25)
+    result = asyncio.run(tighten_locally(latex, JD, compiler))
+
+    assert result is not None
+    assert len(result.removed) == 5
+    kept = [b.plain for b in parse_document(result.latex).bullets]
+    assert len(kept) == 25
+    assert sorted(kept + result.removed) == sorted(b.plain for b in parse_document(latex).bullets)
+    # k_max (11) once, then bisection over 0..11
+    assert result.compiles == compiler.calls == 5
+    assert result.compiled.page_count == 1
+
+
+def test_every_list_keeps_a_bullet():
+    weak = ["Worked with the team", "Helped with various tasks"]
+    latex = resume([[weak[0]], [weak[1]], distinct_bullets(0, 4)])
+    result = asyncio.run(tighten_locally(latex, JD, FakeCompiler(fits=3)))
+
+    assert result is not None
+    doc = parse_document(result.latex)
+    assert [b.plain for b in doc.bullets][:2] == weak
+    assert len({b.list_start for b in doc.bullets}) == 3
+
+
+def test_gives_up_when_the_allowed_removal_does_not_fit():
+    latex = resume([distinct_bullets(k, 10) for k in range(3)])
+    compiler = FakeCompiler(fits=10)
+    assert asyncio.run(tighten_locally(latex, JD, compiler)) is None
+    assert compiler.calls == 1
@@ -0,0 +1,176 @@
+"""
+The batched scorers must agree with the original per-bullet loops they replaced,
+kept here verbatim as references.
+"""
+import pytest
+from rapidfuzz import fuzz
+
+from app.services import metrics
+from app.services.markers import SOFT_FLUFF, TECH_MARKERS, VALIDATION_MARKERS
+from app.services.redundancy import redundancy_report
+from app.services.text_extract import extract_resume_items, strip_latex_commands
+from bench.corpus import make_resume, make_vocabulary
+
+
+def ref_keyword_alignment(resume_text, jd_keywords):
+    r = resume_text.lower()
+    matched = []
+    missing = []
+    for kw in jd_keywords:
+        k = kw.lower().strip()
+        if not k:
+            continue
+        if " " in k and k in r:
+            matched.append(kw)
+            continue
+        if fuzz.partial_ratio(k, r) >= 90:
+            matched.append(kw)
+        else:
+            missing.append(kw)
+    total = max(1, len(jd_keywords))
+    return round(len(matched) / total * 100.0, 1), matched, missing
+
+
+def ref_redundancy_average(bullets):
+    sims = []
+    for i in range(len(bullets)):
+        for j in range(i + 1, len(bullets)):
+            sims.append(fuzz.token_set_ratio(bullets[i], bullets[j]))
+    return sum(sims) / max(1, len(sims))
+
+
+def ref_redundancy_level(bullets):
+    if len(bullets) < 2:
+        return "Low"
+    avg = ref_redundancy_average(bullets)
+    if avg >= 70:
+        return "High"
+    if avg >= 55:
+        return "Med"
+    return "Low"
+
+
+def ref_technical_specificity_level(bullets):
+    if not bullets:
+        return "Low"
+    scores = []
+    for b in bullets:
+        low = b.lower()
+        tech = sum(1 for w in TECH_MARKERS if w in low)
+        val = sum(1 for w in VALIDATION_MARKERS if w in low)
+        fluff = sum(1 for w in SOFT_FLUFF if w in low)
+        scores.append(tech + val - fluff)
+    avg = sum(scores) / len(scores)
+    if avg >= 2.0:
+        return "High"
+    if avg >= 0.8:
+        return "Med"
+    return "Low"
+
+
+def ref_signal_points(b):
+    low = b.lower()
+    pts = 0
+    if any(t in low for t in TECH_MARKERS):
+        pts += 1
+    if any(ch.isdigit() for ch in low) or any(
+        x in low for x in ["latency", "throughput", "ms", "hz", "kb", "mb", "gb", "%", "ax i", "can", "ethernet", "tcp", "udp"]
+    ):
+        pts += 1
+    if any(t in low for t in VALIDATION_MARKERS):
+        pts += 1
+    if any(
+        t in low
+        for t in ["schema", "migration", "driver", "kernel", "device", "api", "rate limit", "auth",
+                  "ownership", "memory-mapped", "interrupt", "pipeline"]
+    ):
+        pts += 1
+    return min(4, pts)
+
+
+def ref_signal_density_score(bullets):
+    if not bullets:
+        return 0.0
+    total = sum(ref_signal_points(b) for b in bullets)
+    return round(total / (len(bullets) * 4) * 10.0, 1)
+
+
+HAND_WRITTEN = [
+    "Collaborated with stakeholders on cross-functional communication",
+    "Cut p99 latency to 4² ms on the memory-mapped driver",
+    "Reduced cold start by ٣x using a rate limit cache",
+    "Validated the OAuth schema migration with pytest and gtest coverage",
+    "Owned the CAN bus interrupt pipeline",
+    "Worked with the team",
+    "",
+]
+
+
+@pytest.fixture(scope="module")
+def corpora():
+    vocab = make_vocabulary(400)
+    out = [HAND_WRITTEN]
+    for seed, n in enumerate((1, 2, 15, 40, 150)):
+        items = extract_resume_items(make_resume(n, vocab, seed=seed))
+        out.append([strip_latex_commands(b) for b in items])
+    return out
+
+
+@pytest.fixture(autouse=True)
+def _no_bullet_memo(monkeypatch):
+    monkeypatch.setenv("METRICS_BULLET_CACHE_ENTRIES", "0")
+    for memo in metrics._memos.values():
+        memo.reset()
+    yield
+    for memo in metrics._memos.values():
+        memo.reset()
+
+
+def test_signal_density_matches_reference(corpora):
+    for bullets in corpora:
+        assert metrics.signal_density_score(bullets) == ref_signal_density_score(bullets)
+        assert [metrics.bullet_signal_points(b) for b in bullets] == [ref_signal_points(b) for b in bullets]
+
+
+def test_unicode_digits_count_as_constraints():
+    # str.isdigit accepts superscripts and non-ASCII digits, not just 0-9
+    for bullet in ("shipped ²", "shipped ٣", "shipped 7"):
+        assert metrics.bullet_signal_points(bullet) == ref_signal_points(bullet) == 1
+
+
+def test_specificity_matches_reference(corpora):
+    for bullets in corpora:
+        assert metrics.technical_specificity_level(bullets) == ref_technical_specificity_level(bullets)
+
+
+def test_redundancy_matches_reference(corpora):
+    dupes = HAND_WRITTEN[:4] * 3
+    for bullets in corpora + [dupes]:
+        assert metrics.redundancy_level(bullets) == ref_redundancy_level(bullets)
+        if len(bullets) >= 2:
+            assert redundancy_report(bullets).average == ref_redundancy_average(bullets)
+
+    pairs = redundancy_report(dupes).pairs
+    assert pairs and all(p.i < p.j and p.similarity == 100.0 for p in pairs)
+
+
+def test_keyword_alignment_matches_reference(corpora):
+    keywords = ["latency", "rate limit", "pytest", "kubernetes", "Memory-Mapped", " ", "c", "schem"]
+    for bullets in corpora:
+        resume = " ".join(bullets)
+        keywords += bullets[0].split()[:3] if bullets else []
+        assert metrics.keyword_alignment(resume, keywords) == ref_keyword_alignment(resume, keywords)
+
+
+def test_redundant_pairs_index_the_resume_bullets():
+    latex = (
+        "\\begin{document}\n"
+        "\\resumeItem{}\n"
+        "\\resumeItem{Cut p99 latency with a Redis cache}\n"
+        "\\resumeItem{\\vspace{2pt}}\n"
+        "\\resumeItem{Cut p99 latency with a Redis cache layer}\n"
+        "\\end{document}\n"
+    )
+    m = metrics.compute_metrics(latex, "Python Redis")
+    assert [(p["i"], p["j"]) for p in m["redundant_pairs"]] == [(1, 3)]
+    assert m["bullet_count"] == 2
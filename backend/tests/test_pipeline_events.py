@@ -0,0 +1,203 @@
+import asyncio
+
+import pytest
+
+from app.pipeline import PipelineRun
+from app.schemas import Metrics, TailorRequest, TailorResult
+from app.services.llm import LatexStreamAborted
+from app.services.pdf_compile import CompileResult
+
+
+def _result(pass_index: int, mode: str, density: float) -> tuple:
+    m = {
+        "signal_density": density,
+        "technical_specificity": "High",
+        "keyword_alignment": 90.0,
+        "redundancy": "Low",
+        "matched_keywords": [],
+        "missing_keywords": [],
+        "bullet_count": 1,
+        "avg_bullet_length": 10.0,
+    }
+    return TailorResult(pass_index=pass_index, mode=mode, tailored_resume_latex="", metrics=Metrics(**m)), m
+
+
+class FakeRun(PipelineRun):
+    """
+    Stages replaced by notify-only stubs; pass 2 is slower than pass 1.
+    """
+
+    pass_one_density = 9.0
+
+    async def predict_second_pass(self) -> bool:
+        return True
+
+    async def _pass_one(self):
+        await self.notify("pass_started", {"pass_index": 1, "mode": "default"})
+        await asyncio.sleep(0.01)
+        result, m = _result(1, "default", self.pass_one_density)
+        await self.notify("metrics_ready", {"pass_index": 1, "result": result.model_dump()})
+        return result, m
+
+    async def _pass_two(self):
+        await self.notify("pass_started", {"pass_index": 2, "mode": "increase_technical_depth"})
+        await asyncio.sleep(0.005)
+        await self.notify("llm_done", {"pass_index": 2})
+        self.pass_llm_calls().append({"pass_index": 2, "prompt_tokens": 100, "completion_tokens": 50})
+        self.pass_decision().setdefault("local_tighten", {})["pass_2"] = {"removed_bullets": [0], "compiles": 1}
+        await asyncio.sleep(0.02)
+        result, m = _result(2, "increase_technical_depth", 9.5)
+        await self.notify("metrics_ready", {"pass_index": 2, "result": result.model_dump()})
+        return result, m
+
+
+def _run(pass_one_density: float) -> list:
+    return _run_with_decision(pass_one_density)[0]
+
+
+def _run_with_decision(pass_one_density: float) -> tuple:
+    events = []
+
+    async def emit(event, data):
+        events.append((event, data.get("pass_index")))
+
+    req = TailorRequest(resume_latex="\\begin{document}\\end{document}", job_description="Python engineer")
+    run = FakeRun(req=req, emit=emit, compile_pool=None)
+    run.pass_one_density = pass_one_density
+    response = asyncio.run(run.run())
+    return events, response.decision
+
+
+def test_discarded_speculative_pass_emits_nothing():
+    events = _run(pass_one_density=9.0)
+    assert [e for e in events if e[1] == 2] == []
+    assert events[-1][0] == "best_chosen"
+
+
+def test_discarded_speculative_pass_records_nothing():
+    _, decision = _run_with_decision(pass_one_density=9.0)
+    assert "local_tighten" not in decision
+    assert decision["llm_usage"]["calls"] == []
+    discarded = decision["speculation"]["discarded_usage"]
+    assert discarded["prompt_tokens"] == 100 and discarded["completion_tokens"] == 50
+
+
+def test_adopted_speculative_pass_records_its_decisions():
+    _, decision = _run_with_decision(pass_one_density=1.0)
+    assert decision["local_tighten"] == {"pass_2": {"removed_bullets": [0], "compiles": 1}}
+    assert decision["llm_usage"]["prompt_tokens"] == 100
+    assert "discarded_usage" not in decision["speculation"]
+
+
+def test_adopted_speculative_pass_replays_events_in_order():
+    events = _run(pass_one_density=1.0)
+    assert [e for e in events[:-1] if e[1] == 2] == [
+        ("pass_started", 2),
+        ("llm_done", 2),
+        ("metrics_ready", 2),
+    ]
+    assert events.index(("metrics_ready", 1)) < events.index(("pass_started", 2))
+    assert events[-1][0] == "best_chosen"
+
+
+class AbortingRun(PipelineRun):
+    """
+    Every compile reports `pages` pages; every LLM reply is abandoned mid-stream.
+    """
+
+    pages = 2
+
+    async def compile(self, latex, pass_index):
+        return CompileResult(pdf_bytes=b"", page_count=self.pages, fill_ratio=0.5)
+
+    async def generate(self, latex, mode, pass_index, stream=None):
+        raise LatexStreamAborted("Closing brace without a matching opener.")
+
+
+def _aborting_run(pages: int) -> AbortingRun:
+    req = TailorRequest(
+        resume_latex="\\begin{document}\\end{document}", job_description="Python engineer", local_tighten=False
+    )
+    run = AbortingRun(req=req, emit=_no_events, compile_pool=None)
+    run.pages = pages
+    return run
+
+
+async def _no_events(event, data):
+    return None
+
+
+def test_abandoned_tighten_keeps_the_last_compiled_latex():
+    run = _aborting_run(pages=2)
+    latex, compiled, attempts, error = asyncio.run(run.tighten_loop("original", 1))
+    assert latex == "original" and compiled.page_count == 2
+    assert attempts == 1 and "abandoned" in error
+
+
+def test_abandoned_expand_keeps_the_input():
+    run = _aborting_run(pages=1)
+    compiled = CompileResult(pdf_bytes=b"", page_count=1, fill_ratio=0.5)
+    assert asyncio.run(run.expand_to_fill("original", compiled, 1)) == "original"
+    assert "expanded_to_fill" not in run.decision
+
+
+RESUME = (
+    "\\documentclass{article}\n\\begin{document}\n\\resumeItemListStart\n"
+    "  \\resumeItem{Worked on Python services with the team}\n"
+    "\\resumeItemListEnd\n\\end{document}\n"
+)
+
+
+class StreamRun(AbortingRun):
+    """
+    Compiles fill one page; a mode's first `aborts[mode]` streamed replies are
+    abandoned, later ones (and any unstreamed reply) return RESUME.
+    """
+
+    pages = 1
+
+    def __init__(self, *args, aborts, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.aborts = dict(aborts)
+        self.calls = []
+
+    async def compile(self, latex, pass_index):
+        return CompileResult(pdf_bytes=b"", page_count=1, fill_ratio=0.95)
+
+    async def generate(self, latex, mode, pass_index, stream=None):
+        self.calls.append((mode, stream))
+        if stream is not False and self.aborts.get(mode, 0) > 0:
+            self.aborts[mode] -= 1
+            raise LatexStreamAborted("Closing brace without a matching opener.")
+        return RESUME
+
+
+def _stream_run(aborts: dict, speculative: bool = False) -> StreamRun:
+    req = TailorRequest(
+        resume_latex=RESUME,
+        job_description="Python engineer with Kubernetes and PostgreSQL",
+        min_signal_density=10.0,
+        min_keyword_alignment=100.0,
+        speculative_second_pass=speculative,
+    )
+    return StreamRun(req=req, emit=_no_events, compile_pool=None, aborts=aborts)
+
+
+def test_abandoned_pass_one_is_retried_without_streaming():
+    run = _stream_run({"default": 1})
+    response = asyncio.run(run.run())
+    assert run.calls[:2] == [("default", None), ("default", False)]
+    assert "mid-stream" not in run.decision["reason"]
+    assert run.decision["stream_fallback"] == "Closing brace without a matching opener."
+    assert [r.pass_index for r in response.all_passes] == [1, 2]
+
+
+@pytest.mark.parametrize("speculative", [False, True])
+def test_abandoned_pass_two_keeps_pass_one(speculative):
+    run = _stream_run({"increase_technical_depth": 99}, speculative=speculative)
+    response = asyncio.run(run.run())
+    assert [r.pass_index for r in response.all_passes] == [1]
+    assert response.best.pass_index == 1
+    assert response.decision["reason"].startswith("Pass 2 skipped")
+    assert ("increase_technical_depth", False) not in run.calls
+    assert response.decision.get("speculation", {}).get("used", False) is speculative
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+class Work:
+    """
+    A factory whose runs block until `finish` is set.
+    """
+
+    def __init__(self, result="done", error=None):
+        self.result = result
+        self.error = error
+        self.runs = 0
+        self.cancelled = False
+        self.finish = asyncio.Event()
+
+    async def __call__(self):
+        self.runs += 1
+        try:
+            await self.finish.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def test_concurrent_callers_share_one_execution():
+    async def run():
+        flights, work = SingleFlight(), Work()
+        a = asyncio.create_task(flights.do("k", work))
+        b = asyncio.create_task(flights.do("k", work))
+        await asyncio.sleep(0)
+        assert flights.waiters() == 2
+        work.finish.set()
+        return await asyncio.gather(a, b), flights, work
+
+    results, flights, work = asyncio.run(run())
+    assert results == ["done", "done"]
+    assert work.runs == 1
+    assert (flights.leaders, flights.coalesced) == (1, 1)
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_error_reaches_every_waiter():
+    async def run():
+        flights, work = SingleFlight(), Work(error=RuntimeError("boom"))
+        a = asyncio.create_task(flights.do("k", work))
+        b = asyncio.create_task(flights.do("k", work))
+        await asyncio.sleep(0)
+        work.finish.set()
+        return await asyncio.gather(a, b, return_exceptions=True), work
+
+    results, work = asyncio.run(run())
+    assert work.runs == 1
+    assert all(isinstance(r, RuntimeError) and str(r) == "boom" for r in results)
+
+
+def test_cancelled_waiter_leaves_the_shared_task_running():
+    async def run():
+        flights, work = SingleFlight(), Work()
+        a = asyncio.create_task(flights.do("k", work))
+        b = asyncio.create_task(flights.do("k", work))
+        await asyncio.sleep(0)
+
+        a.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await a
+        assert flights.waiters() == 1
+        assert not work.cancelled
+
+        work.finish.set()
+        return await b, flights, work
+
+    result, flights, work = asyncio.run(run())
+    assert result == "done"
+    assert work.runs == 1 and not work.cancelled
+    assert flights.abandoned == 0
+
+
+def test_shared_task_is_cancelled_when_the_last_waiter_leaves():
+    async def run():
+        flights, work = SingleFlight(), Work()
+        a = asyncio.create_task(flights.do("k", work))
+        b = asyncio.create_task(flights.do("k", work))
+        await asyncio.sleep(0)
+
+        a.cancel()
+        await asyncio.sleep(0)
+        assert not work.cancelled
+        b.cancel()
+        await asyncio.gather(a, b, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert work.cancelled
+        assert flights.stats()["in_flight"] == 0
+
+        # The key is free again: a later call starts fresh work
+        work.finish.set()
+        return await flights.do("k", work), flights, work
+
+    result, flights, work = asyncio.run(run())
+    assert result == "done"
+    assert work.runs == 2
+    assert flights.abandoned == 1
+    assert flights.leaders == 2